@@ -0,0 +1,79 @@
+"""Measures VideoPlayer command latency as the catalog grows.
+
+Every command that takes a video_id should cost the same whether the
+library holds 5 or 5 million videos. Run from the python/ directory:
+
+    python3 -m benchmarks.player_lookup_benchmark [max_catalog_size]
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+CATALOG_SIZES = (5, 50, 500, 5_000, 50_000, 500_000, 5_000_000)
+COMMANDS_PER_SIZE = 2_000
+
+
+def write_catalog(path, size):
+    """Writes a synthetic videos.txt with `size` rows."""
+    with open(path, "w") as video_file:
+        for i in range(size):
+            video_file.write(
+                f"Video number {i} | video_{i}_id | #tag{i % 100} , #all\n")
+
+
+def time_command(command, video_ids):
+    """Returns the mean latency of `command` in microseconds."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for video_id in video_ids:
+            command(video_id)
+        elapsed = time.perf_counter() - start
+    return elapsed / len(video_ids) * 1e6
+
+
+def benchmark(size, catalog_dir):
+    path = os.path.join(catalog_dir, f"videos_{size}.txt")
+    write_catalog(path, size)
+    player = VideoPlayer(VideoLibrary(path))
+    with contextlib.redirect_stdout(io.StringIO()):
+        player.create_playlist("bench")
+
+    video_ids = [f"video_{random.randrange(size)}_id"
+                 for _ in range(COMMANDS_PER_SIZE)]
+    return {
+        "PLAY": time_command(player.play_video, video_ids),
+        "FLAG_VIDEO": time_command(player.flag_video, video_ids),
+        "ALLOW_VIDEO": time_command(player.allow_video, video_ids),
+        "ADD_TO_PLAYLIST": time_command(
+            lambda video_id: player.add_to_playlist("bench", video_id),
+            video_ids),
+        "REMOVE_FROM_PLAYLIST": time_command(
+            lambda video_id: player.remove_from_playlist("bench", video_id),
+            video_ids),
+    }
+
+
+def main(max_size):
+    sizes = [size for size in CATALOG_SIZES if size <= max_size]
+    header = None
+    with tempfile.TemporaryDirectory() as catalog_dir:
+        for size in sizes:
+            results = benchmark(size, catalog_dir)
+            if header is None:
+                header = list(results)
+                print(f"{'videos':>10}  " + "  ".join(
+                    f"{name:>20}" for name in header) + "  (us/command)")
+            print(f"{size:>10}  " + "  ".join(
+                f"{results[name]:>20.2f}" for name in header))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else CATALOG_SIZES[-1])
@@ -0,0 +1,40 @@
+"""Reports how much memory the video library needs per video.
+
+Run from the python/ directory:
+
+    python3 -m benchmarks.video_memory_benchmark [catalog_size]
+"""
+
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from src.video import Video
+from src.video_library import VideoLibrary
+
+from .player_lookup_benchmark import write_catalog
+
+DEFAULT_CATALOG_SIZE = 200_000
+
+
+def main(size):
+    with tempfile.TemporaryDirectory() as catalog_dir:
+        path = os.path.join(catalog_dir, "videos.txt")
+        write_catalog(path, size)
+
+        tracemalloc.start()
+        library = VideoLibrary(path)
+        library_bytes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    video = library.get_video("video_0_id")
+    print(f"videos:                    {len(library)}")
+    print(f"library bytes per video:   {library_bytes / size:.1f}")
+    print(f"Video object bytes:        {sys.getsizeof(video)}")
+    print(f"Video has a __dict__:      {hasattr(video, '__dict__')}")
+    print(f"Video slots:               {', '.join(Video.__slots__)}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CATALOG_SIZE)
@@ -0,0 +1,162 @@
+"""A video library backed by a memory-mapped binary catalog.
+
+Convert a videos.txt catalog to the binary format with:
+
+    python3 -m src.binary_video_library videos.txt videos.bin
+"""
+
+from .lazy_video_library import LazyVideoLibrary, id_hash
+from .video import Video
+from .video_catalog import catalog_rows
+from array import array
+import argparse
+import contextlib
+import mmap
+import os
+import struct
+
+# A binary catalog stores a header, then an array of unsigned 64 bit integers
+# and finally a table of the UTF-8 strings they refer to. The integer array
+# holds, for N videos and T tag references:
+#   - the hashes of the video ids in ascending order (N),
+#   - the record number of the video with each of those hashes (N),
+#   - one record per video, ordered by title (6N): the string table offset
+#     and length of the title, of the video id, and the position and count of
+#     the video tags in the tag references,
+#   - the string table offset and length of every tag reference (2T).
+# Identical strings are stored once in the string table, so a tag shared by
+# many videos costs one 16 byte reference per video.
+_CATALOG_MAGIC = b"YTCAT001"
+_CATALOG_HEADER = struct.Struct("<8sQQQ")
+_RECORD_SIZE = 6
+
+
+def convert_catalog(video_file_path, binary_path):
+    """Converts a videos.txt catalog into the binary catalog format.
+
+    Args:
+        video_file_path: The catalog to convert, in the videos.txt format.
+        binary_path: Where to write the binary catalog.
+    """
+    # The rows as (sort key, title, video id, tags) tuples, the last row of a
+    # video id taking the place of earlier ones, as in VideoLibrary.
+    rows = {}
+    with open(video_file_path) as video_file:
+        for title, video_id, tags in catalog_rows(video_file):
+            rows[video_id] = ((title.lower(), video_id), title, video_id, tags)
+    rows = sorted(rows.values())
+    strings = bytearray()
+    string_refs = {}
+
+    def add_string(text):
+        if text not in string_refs:
+            encoded = text.encode()
+            string_refs[text] = (len(strings), len(encoded))
+            strings.extend(encoded)
+        return string_refs[text]
+
+    records = array("Q")
+    tag_refs = array("Q")
+    for _, title, video_id, tags in rows:
+        records.extend(add_string(title))
+        records.extend(add_string(video_id))
+        records.extend((len(tag_refs) // 2, len(tags)))
+        for tag in tags:
+            tag_refs.extend(add_string(tag))
+
+    by_hash = sorted((id_hash(video_id), record)
+                     for record, (_, _, video_id, _) in enumerate(rows))
+
+    # Written next to the catalog and renamed over it, so libraries that have
+    # the old catalog mapped keep reading it rather than a truncated file.
+    temporary_path = f"{binary_path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary_path, "wb") as binary_file:
+            binary_file.write(_CATALOG_HEADER.pack(
+                _CATALOG_MAGIC, len(rows), len(tag_refs) // 2, len(strings)))
+            array("Q", (video_hash for video_hash, _ in by_hash)).tofile(
+                binary_file)
+            array("Q", (record for _, record in by_hash)).tofile(binary_file)
+            records.tofile(binary_file)
+            tag_refs.tofile(binary_file)
+            binary_file.write(strings)
+        os.replace(temporary_path, binary_path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temporary_path)
+        raise
+
+
+class BinaryVideoLibrary(LazyVideoLibrary):
+    """A read-only Video Library that reads a memory-mapped binary catalog.
+
+    Opening the library maps the file without reading it, and the pages are
+    shared between every process that opens the same catalog. Videos are
+    decoded straight from the mapping on first access and cached like in
+    LazyVideoLibrary.
+    """
+
+    def __init__(self, binary_path, cache_size=10_000,
+                 search_index_path=None):
+        """The BinaryVideoLibrary class is initialized.
+
+        Args:
+            binary_path: The catalog to open, as written by convert_catalog.
+            cache_size: The maximum number of decoded videos kept in memory,
+                not counting referenced or flagged videos.
+            search_index_path: Where to save the search index, built on the
+                first search, between runs.
+        """
+        self._init_cache(cache_size)
+        self._init_state(binary_path, search_index_path)
+        self._tags = {}
+
+        with open(binary_path, "rb") as binary_file:
+            self._catalog = mmap.mmap(
+                binary_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, tag_ref_count, strings_size = (
+            _CATALOG_HEADER.unpack_from(self._catalog))
+        if magic != _CATALOG_MAGIC:
+            raise ValueError(f"{binary_path} is not a binary video catalog")
+
+        integer_count = (2 + _RECORD_SIZE) * count + 2 * tag_ref_count
+        strings_start = _CATALOG_HEADER.size + 8 * integer_count
+        catalog = memoryview(self._catalog)
+        integers = catalog[_CATALOG_HEADER.size:strings_start].cast("Q")
+        self._hashes = integers[:count]
+        self._rows_by_hash = integers[count:2 * count]
+        self._records = integers[2 * count:(2 + _RECORD_SIZE) * count]
+        self._tag_refs = integers[(2 + _RECORD_SIZE) * count:]
+        self._rows_by_title = range(count)
+        self._strings = catalog[strings_start:strings_start + strings_size]
+
+    def _string(self, offset, length):
+        return str(self._strings[offset:offset + length], "utf-8")
+
+    def _tag(self, offset, length):
+        # Decode each distinct tag once and share the string between videos.
+        tag = self._tags.get(offset)
+        if tag is None:
+            tag = self._tags[offset] = self._string(offset, length)
+        return tag
+
+    def _read_video(self, record):
+        start = record * _RECORD_SIZE
+        (title_offset, title_length, id_offset, id_length,
+         first_tag, tag_count) = self._records[start:start + _RECORD_SIZE]
+        tag_refs = self._tag_refs[2 * first_tag:2 * (first_tag + tag_count)]
+        return Video(
+            self._string(title_offset, title_length),
+            self._string(id_offset, id_length),
+            [self._tag(tag_refs[i], tag_refs[i + 1])
+             for i in range(0, len(tag_refs), 2)],
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Converts a videos.txt catalog to the binary format.")
+    parser.add_argument("video_file", help="the videos.txt catalog to read")
+    parser.add_argument("binary_file", help="the binary catalog to write")
+    args = parser.parse_args()
+    convert_catalog(args.video_file, args.binary_file)
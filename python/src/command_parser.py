@@ -1,7 +1,6 @@
 """A command parser class."""
 
-import textwrap
-from typing import Sequence
+from typing import NamedTuple, Optional, Sequence
 
 
 class CommandException(Exception):
@@ -9,155 +8,184 @@ class CommandException(Exception):
     pass
 
 
+class Command(NamedTuple):
+    """A class used to represent a command the parser accepts.
+
+    The command calls the player method named `method` with its arguments,
+    joined into one string if `join_arguments` is set. The parser raises
+    CommandException with `error` when the number of arguments is outside
+    `min_arguments` to `max_arguments` (None for no limit). Commands without
+    an `error` ignore any arguments past `max_arguments`.
+    """
+    method: str
+    arguments: str
+    help: str
+    min_arguments: int = 0
+    max_arguments: Optional[int] = 0
+    error: str = ""
+    join_arguments: bool = False
+
+
+COMMANDS = {
+    "NUMBER_OF_VIDEOS": Command(
+        "number_of_videos", "",
+        "Shows how many videos are in the library."),
+    "SHOW_ALL_VIDEOS": Command(
+        "show_all_videos", "[<page_size> [<page_token>]]",
+        "Lists all videos from the library, or page_size of them followed "
+        "by the command showing the next page.",
+        0, 2, "Please enter SHOW_ALL_VIDEOS command optionally followed by "
+              "a page size and a page token."),
+    "PLAY": Command(
+        "play_video", "<video_id>",
+        "Plays specified video.",
+        1, 1, "Please enter PLAY command followed by video_id."),
+    "PLAY_RANDOM": Command(
+        "play_random_video", "",
+        "Plays a random video from the library."),
+    "STOP": Command(
+        "stop_video", "",
+        "Stop the current video."),
+    "PAUSE": Command(
+        "pause_video", "",
+        "Pause the current video."),
+    "CONTINUE": Command(
+        "continue_video", "",
+        "Resume the current paused video."),
+    "SHOW_PLAYING": Command(
+        "show_playing", "",
+        "Displays the title, url and paused status of the video that is "
+        "currently playing (or paused)."),
+    "CREATE_PLAYLIST": Command(
+        "create_playlist", "<playlist_name>",
+        "Creates a new (empty) playlist with the provided name.",
+        1, 1, "Please enter CREATE_PLAYLIST command followed by a "
+              "playlist name."),
+    "ADD_TO_PLAYLIST": Command(
+        "add_to_playlist", "<playlist_name> <video_id>",
+        "Adds the requested video to the playlist.",
+        2, 2, "Please enter ADD_TO_PLAYLIST command followed by a "
+              "playlist name and video_id to add."),
+    "ADD_MANY_TO_PLAYLIST": Command(
+        "add_many_to_playlist", "<playlist_name> <video_id> [<video_id> ...]",
+        "Adds all the requested videos to the playlist, or none if any of "
+        "them cannot be added.",
+        2, None, "Please enter ADD_MANY_TO_PLAYLIST command followed by a "
+                 "playlist name and the video_ids to add."),
+    "REMOVE_FROM_PLAYLIST": Command(
+        "remove_from_playlist", "<playlist_name> <video_id>",
+        "Removes the specified video from the specified playlist",
+        2, 2, "Please enter REMOVE_FROM_PLAYLIST command followed by a "
+              "playlist name and video_id to remove."),
+    "REMOVE_MANY_FROM_PLAYLIST": Command(
+        "remove_many_from_playlist",
+        "<playlist_name> <video_id> [<video_id> ...]",
+        "Removes all the specified videos from the playlist, or none if any "
+        "of them cannot be removed.",
+        2, None, "Please enter REMOVE_MANY_FROM_PLAYLIST command followed by "
+                 "a playlist name and the video_ids to remove."),
+    "CLEAR_PLAYLIST": Command(
+        "clear_playlist", "<playlist_name>",
+        "Removes all the videos from the playlist.",
+        1, 1, "Please enter CLEAR_PLAYLIST command followed by a "
+              "playlist name."),
+    "DELETE_PLAYLIST": Command(
+        "delete_playlist", "<playlist_name>",
+        "Deletes the playlist.",
+        1, 1, "Please enter DELETE_PLAYLIST command followed by a "
+              "playlist name."),
+    "SHOW_PLAYLIST": Command(
+        "show_playlist", "<playlist_name> [<page_size> [<page_token>]]",
+        "List all the videos in this playlist, or page_size of them "
+        "followed by the command showing the next page.",
+        1, 3, "Please enter SHOW_PLAYLIST command followed by a "
+              "playlist name."),
+    "SHOW_ALL_PLAYLISTS": Command(
+        "show_all_playlists", "",
+        "Display all the available playlists."),
+    "SEARCH_VIDEOS": Command(
+        "search_videos", "<search_term>",
+        "Display all the videos whose titles contain the search_term.",
+        1, 1, "Please enter SEARCH_VIDEOS command followed by a "
+              "search term."),
+    "SEARCH_VIDEOS_WITH_TAG": Command(
+        "search_videos_tag", "<tag_name>",
+        "Display all videos whose tags contains the provided tag.",
+        1, 1, "Please enter SEARCH_VIDEOS_WITH_TAG command followed by a "
+              "video tag."),
+    "SEARCH_VIDEOS_WITH_TAGS": Command(
+        "search_videos_with_tags", "<tag_expression>",
+        "Display all videos, including flagged ones, matching tags combined "
+        "with AND, OR, NOT and parentheses, e.g. #cat AND #animal AND NOT "
+        "#dog.",
+        1, None, "Please enter SEARCH_VIDEOS_WITH_TAGS command followed by "
+                 "a tag expression.",
+        join_arguments=True),
+    "FLAG_VIDEO": Command(
+        "flag_video", "<video_id> <flag_reason>",
+        "Mark a video as flagged.",
+        1, 2, "Please enter FLAG_VIDEO command followed by a "
+              "video_id and an optional flag reason."),
+    "ALLOW_VIDEO": Command(
+        "allow_video", "<video_id>",
+        "Removes a flag from a video.",
+        1, 1, "Please enter ALLOW_VIDEO command followed by a "
+              "video_id."),
+}
+
+
 class CommandParser:
     """A class used to parse and execute a user Command."""
 
     def __init__(self, video_player):
         self._player = video_player
+        self._output = video_player.output
+        # Bind every handler once so executing a command is a single lookup.
+        self._handlers = {
+            name: (getattr(video_player, command.method), command)
+            for name, command in COMMANDS.items()
+        }
+        self._handlers["HELP"] = (self._get_help, Command("", "", ""))
 
     def execute_command(self, command: Sequence[str]):
         """Executes the user command. Expects the command to be upper case.
            Raises CommandException if a command cannot be parsed.
+
+           After a search that asked which video to play, the next command
+           is taken as the answer instead.
         """
+        if self._player.pendingSelection is not None:
+            self._player.select_search_result(" ".join(command))
+            return
+
         if not command:
             raise CommandException(
                 "Please enter a valid command, "
                 "type HELP for a list of available commands.")
 
-        if command[0].upper() == "NUMBER_OF_VIDEOS":
-            self._player.number_of_videos()
-
-        elif command[0].upper() == "SHOW_ALL_VIDEOS":
-            self._player.show_all_videos()
-
-        elif command[0].upper() == "PLAY":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter PLAY command followed by video_id.")
-            self._player.play_video(command[1])
-
-        elif command[0].upper() == "PLAY_RANDOM":
-            self._player.play_random_video()
-
-        elif command[0].upper() == "STOP":
-            self._player.stop_video()
-
-        elif command[0].upper() == "PAUSE":
-            self._player.pause_video()
-
-        elif command[0].upper() == "CONTINUE":
-            self._player.continue_video()
-
-        elif command[0].upper() == "SHOW_PLAYING":
-            self._player.show_playing()
-
-        elif command[0].upper() == "CREATE_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter CREATE_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.create_playlist(command[1])
-
-        elif command[0].upper() == "ADD_TO_PLAYLIST":
-            if len(command) != 3:
-                raise CommandException(
-                    "Please enter ADD_TO_PLAYLIST command followed by a "
-                    "playlist name and video_id to add.")
-            self._player.add_to_playlist(command[1], command[2])
-
-        elif command[0].upper() == "REMOVE_FROM_PLAYLIST":
-            if len(command) != 3:
-                raise CommandException(
-                    "Please enter REMOVE_FROM_PLAYLIST command followed by a "
-                    "playlist name and video_id to remove.")
-            self._player.remove_from_playlist(command[1], command[2])
-
-        elif command[0].upper() == "CLEAR_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter CLEAR_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.clear_playlist(command[1])
-
-        elif command[0].upper() == "DELETE_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter DELETE_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.delete_playlist(command[1])
-
-        elif command[0].upper() == "SHOW_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter SHOW_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.show_playlist(command[1])
-
-        elif command[0].upper() == "SHOW_ALL_PLAYLISTS":
-            self._player.show_all_playlists()
-
-        elif command[0].upper() == "SEARCH_VIDEOS":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter SEARCH_VIDEOS command followed by a "
-                    "search term.")
-            self._player.search_videos(command[1])
-
-        elif command[0].upper() == "SEARCH_VIDEOS_WITH_TAG":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter SEARCH_VIDEOS_WITH_TAG command followed by a "
-                    "video tag.")
-            self._player.search_videos_tag(command[1])
-
-        elif command[0].upper() == "FLAG_VIDEO":
-            if len(command) == 3:
-                self._player.flag_video(command[1], command[2])
-            elif len(command) == 2:
-                self._player.flag_video(command[1])
-            else:
-                raise CommandException(
-                    "Please enter FLAG_VIDEO command followed by a "
-                    "video_id and an optional flag reason.")
-
-        elif command[0].upper() == "ALLOW_VIDEO":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter ALLOW_VIDEO command followed by a "
-                    "video_id.")
-            self._player.allow_video(command[1])
-
-        elif command[0].upper() == "HELP":
-            self._get_help()
-        else:
-            print(
+        handler, spec = self._handlers.get(command[0].upper(), (None, None))
+        if handler is None:
+            self._output.write(
                 "Please enter a valid command, type HELP for a list of "
                 "available commands.")
+            return
+
+        arguments = command[1:]
+        if spec.error and (len(arguments) < spec.min_arguments or (
+                spec.max_arguments is not None
+                and len(arguments) > spec.max_arguments)):
+            raise CommandException(spec.error)
+        if spec.join_arguments:
+            arguments = [" ".join(arguments)]
+        handler(*arguments[:spec.max_arguments])
 
     def _get_help(self):
         """Displays all available commands to the user."""
-        help_text = textwrap.dedent("""
-        Available commands:
-            NUMBER_OF_VIDEOS - Shows how many videos are in the library.
-            SHOW_ALL_VIDEOS - Lists all videos from the library.
-            PLAY <video_id> - Plays specified video.
-            PLAY_RANDOM - Plays a random video from the library.
-            STOP - Stop the current video.
-            PAUSE - Pause the current video.
-            CONTINUE - Resume the current paused video.
-            SHOW_PLAYING - Displays the title, url and paused status of the video that is currently playing (or paused).
-            CREATE_PLAYLIST <playlist_name> - Creates a new (empty) playlist with the provided name.
-            ADD_TO_PLAYLIST <playlist_name> <video_id> - Adds the requested video to the playlist.
-            REMOVE_FROM_PLAYLIST <playlist_name> <video_id> - Removes the specified video from the specified playlist
-            CLEAR_PLAYLIST <playlist_name> - Removes all the videos from the playlist.
-            DELETE_PLAYLIST <playlist_name> - Deletes the playlist.
-            SHOW_PLAYLIST <playlist_name> - List all the videos in this playlist.
-            SHOW_ALL_PLAYLISTS - Display all the available playlists.
-            SEARCH_VIDEOS <search_term> - Display all the videos whose titles contain the search_term.
-            SEARCH_VIDEOS_WITH_TAG <tag_name> -Display all videos whose tags contains the provided tag.
-            FLAG_VIDEO <video_id> <flag_reason> - Mark a video as flagged.
-            ALLOW_VIDEO <video_id> - Removes a flag from a video.
-            HELP - Displays help.
-            EXIT - Terminates the program execution.
-        """)
-        print(help_text)
+        lines = ["", "Available commands:"]
+        for name, command in COMMANDS.items():
+            usage = f"{name} {command.arguments}".rstrip()
+            lines.append(f"    {usage} - {command.help}")
+        lines.append("    HELP - Displays help.")
+        lines.append("    EXIT - Terminates the program execution.")
+        lines.append("")
+        self._output.write("\n".join(lines))
@@ -0,0 +1,238 @@
+"""A video library that reads videos from disk on demand."""
+
+from .video_cache import VideoCacheMixin
+from .video_catalog import catalog_rows, position_after, video_from_row
+from .video_library import (VideoLibrary, DEFAULT_VIDEO_FILE,
+                            ReadOnlyLibraryError)
+from array import array
+from collections.abc import Sequence
+import bisect
+import contextlib
+import hashlib
+import mmap
+import os
+import struct
+
+# The offset index stores a header followed by three arrays of N unsigned
+# 64 bit integers: the hashes of the video ids in ascending order, the catalog
+# offset of the row for each of those hashes, and the catalog offsets of all
+# rows ordered by title.
+_INDEX_MAGIC = b"YTIDX001"
+_INDEX_HEADER = struct.Struct("<8sQQQ")
+
+
+def id_hash(video_id):
+    """Returns the hash the offset index, and the binary catalog, order
+    video ids by.
+    """
+    return int.from_bytes(
+        hashlib.blake2b(video_id.encode(), digest_size=8).digest(), "little")
+
+
+def _video_from_line(line):
+    row = next(catalog_rows([line.rstrip(b"\r\n").decode()]))
+    return video_from_row(row)
+
+
+def build_offset_index(video_file_path, index_path):
+    """Scans a videos.txt catalog and writes its offset index.
+
+    Rows repeating an earlier video id replace it, as in VideoLibrary. The
+    index is written to a temporary file and renamed into place, so another
+    process never maps a partly written index.
+
+    Args:
+        video_file_path: The catalog, in the videos.txt format.
+        index_path: Where to write the index.
+    """
+    rows = {}
+    with open(video_file_path, "rb") as video_file:
+        # Stamped before reading, so a catalog rewritten meanwhile does not
+        # look current.
+        stat = os.fstat(video_file.fileno())
+        offset = 0
+        for line in video_file:
+            if line.strip():
+                video = _video_from_line(line)
+                rows[video.video_id] = (
+                    offset, (video.title.lower(), video.video_id))
+            offset += len(line)
+
+    by_hash = sorted((id_hash(video_id), offset)
+                     for video_id, (offset, _) in rows.items())
+    by_title = sorted(rows.values(), key=lambda row: row[1])
+
+    temporary_path = f"{index_path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary_path, "wb") as index_file:
+            index_file.write(_INDEX_HEADER.pack(
+                _INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, len(rows)))
+            array("Q", (video_hash for video_hash, _ in by_hash)).tofile(
+                index_file)
+            array("Q", (offset for _, offset in by_hash)).tofile(index_file)
+            array("Q", (offset for offset, _ in by_title)).tofile(index_file)
+        os.replace(temporary_path, index_path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temporary_path)
+        raise
+
+
+def _index_is_current(video_file_path, index_path):
+    try:
+        with open(index_path, "rb") as index_file:
+            header = index_file.read(_INDEX_HEADER.size)
+            index_size = os.fstat(index_file.fileno()).st_size
+    except FileNotFoundError:
+        return False
+    if len(header) != _INDEX_HEADER.size:
+        return False
+    magic, size, mtime_ns, count = _INDEX_HEADER.unpack(header)
+    stat = os.stat(video_file_path)
+    return (magic == _INDEX_MAGIC and size == stat.st_size
+            and mtime_ns == stat.st_mtime_ns
+            and index_size == _INDEX_HEADER.size + 3 * 8 * count)
+
+
+class _SortedVideos(Sequence):
+    """A read-only sequence of the library videos ordered by title."""
+
+    def __init__(self, library):
+        self._library = library
+
+    def __len__(self):
+        return len(self._library)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        rows = self._library._rows_by_title
+        return self._library._video_at(rows[position])
+
+
+class LazyVideoLibrary(VideoCacheMixin, VideoLibrary):
+    """A read-only Video Library that parses catalog rows on first access.
+
+    Opening the library only maps the catalog and its offset index, so it
+    takes the same time whatever the catalog size. The index is written next
+    to the catalog the first time it is opened, and again whenever the
+    catalog changes. Parsed videos are cached by catalog offset, see
+    VideoCacheMixin, so every lookup of an id returns the same Video object.
+    """
+
+    def __init__(self, video_file_path=None, index_path=None,
+                 cache_size=10_000, search_index_path=None):
+        """The LazyVideoLibrary class is initialized.
+
+        Args:
+            video_file_path: The catalog to load, in the videos.txt format.
+                Defaults to the videos.txt shipped next to this module.
+            index_path: Where to keep the offset index. Defaults to the
+                catalog path with an extra ".idx" suffix.
+            cache_size: The maximum number of parsed videos kept in memory,
+                not counting referenced or flagged videos.
+            search_index_path: Where to save the search index, built on the
+                first search, between runs.
+        """
+        if video_file_path is None:
+            video_file_path = DEFAULT_VIDEO_FILE
+        if index_path is None:
+            index_path = f"{video_file_path}.idx"
+        if not _index_is_current(video_file_path, index_path):
+            build_offset_index(video_file_path, index_path)
+
+        self._init_cache(cache_size)
+        self._init_state(video_file_path, search_index_path)
+
+        with open(index_path, "rb") as index_file:
+            self._index = mmap.mmap(
+                index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        _, _, _, count = _INDEX_HEADER.unpack_from(self._index)
+        integers = memoryview(self._index)[_INDEX_HEADER.size:].cast("Q")
+        self._hashes = integers[:count]
+        self._rows_by_hash = integers[count:2 * count]
+        self._rows_by_title = integers[2 * count:3 * count]
+
+        self._catalog = None
+        if count:
+            with open(video_file_path, "rb") as video_file:
+                self._catalog = mmap.mmap(
+                    video_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        """Returns the number of videos in the video library."""
+        return len(self._hashes)
+
+    def _read_video(self, offset):
+        """Parses the catalog row starting at `offset` into a new Video."""
+        end = self._catalog.find(b"\n", offset)
+        if end == -1:
+            end = len(self._catalog)
+        return _video_from_line(self._catalog[offset:end])
+
+    def get_video(self, video_id):
+        """Returns the video object (title, url, tags) from the video library.
+
+        Args:
+            video_id: The video url.
+
+        Returns:
+            The Video object for the requested video_id. None if the video
+            does not exist.
+        """
+        # The cache is keyed by row, so a cached video is found through the
+        # offset index too, only without parsing its row.
+        video_hash = id_hash(video_id)
+        position = bisect.bisect_left(self._hashes, video_hash)
+        while (position < len(self._hashes)
+               and self._hashes[position] == video_hash):
+            video = self._video_at(self._rows_by_hash[position])
+            if video.video_id == video_id:
+                return video
+            position += 1
+        return None
+
+    def get_all_videos(self):
+        """Returns all available video information from the video library."""
+        return list(self.get_sorted_videos())
+
+    def get_sorted_videos(self):
+        """Returns all videos sorted by title, ignoring case.
+
+        The sequence reads each video from disk when it is accessed.
+        """
+        return _SortedVideos(self)
+
+    def iter_sorted_videos(self, after=None):
+        """Yields the videos in the order of get_sorted_videos.
+
+        Finding where to start is a binary search that reads a few rows.
+
+        Args:
+            after: The (title, video_id) of the last video already seen.
+                Iteration starts right after it, whether or not that video is
+                still in the library. None starts at the first video.
+        """
+        videos = self.get_sorted_videos()
+        start = 0
+        if after is not None:
+            title, video_id = after
+            start = position_after(videos, (title.lower(), video_id))
+        for position in range(start, len(videos)):
+            yield videos[position]
+
+    def add_video(self, video):
+        """Fails, the library only changes with its catalog file.
+
+        Raises:
+            ReadOnlyLibraryError: Always.
+        """
+        raise ReadOnlyLibraryError(f"{type(self).__name__} is read-only")
+
+    def remove_video(self, video_id):
+        """Fails, the library only changes with its catalog file.
+
+        Raises:
+            ReadOnlyLibraryError: Always.
+        """
+        raise ReadOnlyLibraryError(f"{type(self).__name__} is read-only")
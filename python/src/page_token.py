@@ -0,0 +1,39 @@
+"""Resume tokens for listings shown a page at a time."""
+
+import base64
+import binascii
+
+
+class PageTokenError(Exception):
+    """A class used to represent a malformed resume token."""
+    pass
+
+
+def encode_page_token(*fields):
+    """Returns a resume token holding the given strings.
+
+    The token is a single word of URL-safe characters, so it can be passed
+    back as a command argument.
+    """
+    data = "\0".join(fields).encode("utf-8")
+    return base64.urlsafe_b64encode(data).decode("ascii").rstrip("=")
+
+
+def decode_page_token(token, field_count):
+    """Returns the strings held by a resume token.
+
+    Args:
+        token: A token made by encode_page_token.
+        field_count: The number of strings the token must hold.
+
+    Raises:
+        PageTokenError: If the token is malformed.
+    """
+    try:
+        data = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        fields = tuple(data.decode("utf-8").split("\0"))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise PageTokenError("Invalid page token") from None
+    if len(fields) != field_count:
+        raise PageTokenError("Invalid page token")
+    return fields
@@ -0,0 +1,179 @@
+"""A journal that keeps the playlists and flags of a player across runs."""
+
+import json
+import os
+import threading
+
+_SNAPSHOT_VERSION = 1
+
+
+class PlayerJournal:
+    """A class used to represent the saved playlists and flags of a player.
+
+    Every change is appended to a journal file as one JSON line, numbered in
+    sequence. Once `snapshot_every` changes have been appended, the whole
+    state is written to a snapshot file next to the journal and the journal
+    starts over, so recovering never replays more than `snapshot_every`
+    changes however long the player has run.
+
+    The journal keeps its own copy of the state, by video id, so writing a
+    snapshot does not need the player. Players in several threads can share
+    a journal: each change is recorded whole, one at a time.
+    """
+
+    def __init__(self, path, snapshot_every=10_000, sync=False):
+        """The PlayerJournal class is initialized.
+
+        Args:
+            path: The journal file. The snapshot is kept in
+                `path + ".snapshot"`.
+            snapshot_every: How many changes to append before compacting
+                them into a snapshot.
+            sync: Whether to fsync the journal after every change, so changes
+                also survive a crash of the machine and not only of the
+                player. Makes every change wait for the disk.
+        """
+        self._path = os.fspath(path)
+        self._snapshot_path = self._path + ".snapshot"
+        self._snapshot_every = snapshot_every
+        self._sync = sync
+        # Casefolded playlist name -> (name, {video_id: None}).
+        self._playlists = {}
+        self._flags = {}
+        self._sequence = 0
+        self._appended = 0
+        self._journal_file = None
+        self._lock = threading.Lock()
+
+    def recover(self):
+        """Loads the saved state and opens the journal for new changes.
+
+        Changes the snapshot already holds are skipped, so a crash between
+        writing a snapshot and emptying the journal loses nothing. A last
+        line cut short by a crash is dropped.
+
+        Returns:
+            The playlists as (name, video_ids) pairs, and a dict from flagged
+            video id to flag reason.
+        """
+        try:
+            with open(self._snapshot_path) as snapshot_file:
+                snapshot = json.load(snapshot_file)
+        except FileNotFoundError:
+            snapshot = None
+        if snapshot is not None:
+            if snapshot["version"] != _SNAPSHOT_VERSION:
+                raise ValueError(
+                    f"Unknown snapshot version {snapshot['version']}")
+            self._sequence = snapshot["sequence"]
+            for name, video_ids in snapshot["playlists"]:
+                self._playlists[name.casefold()] = (
+                    name, dict.fromkeys(video_ids))
+            self._flags = dict(snapshot["flags"])
+
+        valid_size = 0
+        try:
+            with open(self._path, "rb") as journal_file:
+                for line in journal_file:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        sequence, change, *arguments = json.loads(line)
+                    except ValueError:
+                        break
+                    valid_size += len(line)
+                    self._appended += 1
+                    if sequence > self._sequence:
+                        self._sequence = sequence
+                        self._apply(change, arguments)
+        except FileNotFoundError:
+            pass
+
+        self._journal_file = open(self._path, "ab")
+        self._journal_file.truncate(valid_size)
+        if self._appended >= self._snapshot_every:
+            self.snapshot()
+
+        playlists = [(name, list(video_ids))
+                     for name, video_ids in self._playlists.values()]
+        return playlists, dict(self._flags)
+
+    def _apply(self, change, arguments):
+        if change == "create":
+            name, = arguments
+            self._playlists.setdefault(name.casefold(), (name, {}))
+        elif change == "delete":
+            name, = arguments
+            self._playlists.pop(name.casefold(), None)
+        elif change == "add":
+            name, video_ids = arguments
+            self._playlists[name.casefold()][1].update(
+                dict.fromkeys(video_ids))
+        elif change == "remove":
+            name, video_ids = arguments
+            playlist = self._playlists[name.casefold()][1]
+            for video_id in video_ids:
+                playlist.pop(video_id, None)
+        elif change == "clear":
+            name, = arguments
+            self._playlists[name.casefold()][1].clear()
+        elif change == "flag":
+            video_id, reason = arguments
+            self._flags[video_id] = reason
+        elif change == "allow":
+            video_id, = arguments
+            self._flags.pop(video_id, None)
+        else:
+            raise ValueError(f"Unknown journal change {change!r}")
+
+    def record(self, change, *arguments):
+        """Appends a change to the journal and applies it to the state.
+
+        Args:
+            change: One of "create" and "delete" (a playlist name), "add" and
+                "remove" (a playlist name and a list of video ids), "clear"
+                (a playlist name), "flag" (a video id and reason) or "allow"
+                (a video id).
+        """
+        with self._lock:
+            self._apply(change, arguments)
+            self._sequence += 1
+            line = json.dumps([self._sequence, change, *arguments])
+            self._journal_file.write(line.encode() + b"\n")
+            self._journal_file.flush()
+            if self._sync:
+                os.fsync(self._journal_file.fileno())
+            self._appended += 1
+            if self._appended >= self._snapshot_every:
+                self._write_snapshot()
+
+    def snapshot(self):
+        """Writes the whole state to the snapshot file and empties the
+        journal.
+        """
+        with self._lock:
+            self._write_snapshot()
+
+    def _write_snapshot(self):
+        snapshot = {
+            "version": _SNAPSHOT_VERSION,
+            "sequence": self._sequence,
+            "playlists": [[name, list(video_ids)]
+                          for name, video_ids in self._playlists.values()],
+            "flags": list(self._flags.items()),
+        }
+        temporary_path = self._snapshot_path + ".tmp"
+        with open(temporary_path, "w") as snapshot_file:
+            json.dump(snapshot, snapshot_file)
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(temporary_path, self._snapshot_path)
+        self._journal_file.truncate(0)
+        self._appended = 0
+
+    def close(self):
+        """Closes the journal file."""
+        with self._lock:
+            if self._journal_file is not None:
+                self._journal_file.close()
+                self._journal_file = None
@@ -0,0 +1,203 @@
+"""Serves the player command language to many users over one library.
+
+The library is loaded once and shared by every session. Each connection
+gets a PlayerSession of its own, holding only its playback state and
+playlists. Flags belong to the shared videos, so every session sees them.
+
+start_server serves the sessions on an asyncio event loop, and
+ThreadingPlayerServer runs each one in a thread of its own.
+"""
+
+from .command_parser import CommandException, CommandParser
+from .video_output import DeferredSink, StreamSink
+from .video_player import VideoPlayer
+import asyncio
+import socket
+import socketserver
+
+WELCOME = ("Hello and welcome to YouTube, what would you like to do?\n"
+           "    Enter HELP for list of available commands or EXIT to "
+           "terminate.")
+GOODBYE = "YouTube has now terminated its execution. Thank you and goodbye!"
+PROMPT = "YT> "
+# The most output queued for a client before its session stops rendering
+# until the client catches up, and the size of the pieces it is rendered in.
+WRITE_BUFFER_LIMIT = 1 << 16
+
+# The longest command line accepted, in bytes.
+LINE_LIMIT = 1 << 16
+
+
+class PlayerSession:
+    """A class used to represent the state of one user of a shared library.
+
+    The session is a VideoPlayer and its CommandParser, so it costs a few
+    kilobytes whatever the size of the library.
+    """
+
+    __slots__ = ("player", "_parser", "_output")
+
+    def __init__(self, video_library, output):
+        """The PlayerSession class is initialized.
+
+        Args:
+            video_library: The library shared by all sessions.
+            output: The sink the session output is written to.
+        """
+        self.player = VideoPlayer(video_library, output)
+        self._parser = CommandParser(self.player)
+        self._output = output
+
+    def execute(self, line):
+        """Executes one command line, writing errors to the output.
+
+        Returns:
+            False if the line is EXIT and the session should end, else True.
+        """
+        command = line.split()
+        if len(command) == 1 and command[0].upper() == "EXIT":
+            return False
+        try:
+            self._parser.execute_command(command)
+        except CommandException as e:
+            self._output.write(str(e))
+        return True
+
+
+def parse_address(address):
+    """Returns the socket family and address for "HOST:PORT" or a path.
+
+    Anything containing a "/" is taken as a Unix socket path.
+    """
+    if "/" in address:
+        return socket.AF_UNIX, address
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+
+class _SessionHandler(socketserver.StreamRequestHandler):
+    """Runs one PlayerSession over a connection, a line per command."""
+
+    def handle(self):
+        # Separate text files for each direction: writing to a read-write
+        # text file would drop the lines it has read ahead.
+        reader = self.connection.makefile("r", encoding="utf-8", newline="\n")
+        writer = self.connection.makefile("w", encoding="utf-8", newline="\n")
+        output = StreamSink(writer)
+        session = PlayerSession(self.server.video_library, output)
+        output.write(WELCOME)
+        while True:
+            output.flush()
+            writer.write(PROMPT)
+            writer.flush()
+            line = reader.readline()
+            if not line or not session.execute(line):
+                break
+        output.write(GOODBYE)
+        output.flush()
+
+
+class ThreadingPlayerServer(socketserver.ThreadingMixIn,
+                            socketserver.TCPServer):
+    """A server running each connection's session in its own thread."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, video_library):
+        """The ThreadingPlayerServer class is initialized.
+
+        Args:
+            address: "HOST:PORT" to listen on TCP, or a Unix socket path.
+            video_library: The library shared by all sessions.
+        """
+        self.address_family, server_address = parse_address(address)
+        self.video_library = video_library
+        super().__init__(server_address, _SessionHandler)
+
+
+class _AsyncConnection:
+    """Runs one PlayerSession over an asyncio stream, a line per command.
+
+    Commands run in a worker thread, so a long listing or search does not
+    hold up the other connections on the event loop. Their output is
+    rendered in worker threads too, WRITE_BUFFER_LIMIT characters at a time,
+    and each piece is only rendered once the client took the one before it.
+    A client that reads slowly waits on the event loop, never in a worker,
+    so it only slows its own session and its output never piles up in
+    memory. A search that asks which video to play takes the next line as
+    the answer.
+    """
+
+    def __init__(self, reader, writer, video_library):
+        self._reader = reader
+        self._writer = writer
+        self._loop = asyncio.get_running_loop()
+        self._output = DeferredSink()
+        self._session = PlayerSession(video_library, self._output)
+
+    def _execute(self, line):
+        """Executes a command line and renders the first piece of its output.
+
+        Returns:
+            What PlayerSession.execute returned, and the piece rendered.
+        """
+        running = self._session.execute(line)
+        return running, self._output.take(WRITE_BUFFER_LIMIT)
+
+    async def _send(self, text, end):
+        """Sends the text and the rest of the output, then `end`."""
+        while self._output.pending:
+            if text:
+                self._writer.write(text.encode())
+                await self._writer.drain()
+            text = await self._loop.run_in_executor(
+                None, self._output.take, WRITE_BUFFER_LIMIT)
+        self._writer.write((text + end).encode())
+        await self._writer.drain()
+
+    async def run(self):
+        text = WELCOME + "\n"
+        while True:
+            await self._send(text, PROMPT)
+            try:
+                line = await self._reader.readline()
+            except ValueError:
+                text = "Command is too long\n"
+                break
+            if not line:
+                text = ""
+                break
+            running, text = await self._loop.run_in_executor(
+                None, self._execute, line.decode(errors="replace"))
+            if not running:
+                break
+        await self._send(text, GOODBYE + "\n")
+
+
+async def start_server(address, video_library):
+    """Starts serving a session per connection on the running event loop.
+
+    Args:
+        address: "HOST:PORT" to listen on TCP, or a Unix socket path.
+        video_library: The library shared by all sessions.
+
+    Returns:
+        The asyncio.Server, already accepting connections.
+    """
+    async def serve_connection(reader, writer):
+        writer.transport.set_write_buffer_limits(high=WRITE_BUFFER_LIMIT)
+        try:
+            await _AsyncConnection(reader, writer, video_library).run()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    family, server_address = parse_address(address)
+    if family == socket.AF_UNIX:
+        return await asyncio.start_unix_server(
+            serve_connection, server_address, limit=LINE_LIMIT)
+    host, port = server_address
+    return await asyncio.start_server(
+        serve_connection, host, port, limit=LINE_LIMIT)
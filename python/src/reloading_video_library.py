@@ -0,0 +1,177 @@
+"""A video library that follows changes to its catalog file."""
+
+from .video_catalog import catalog_stamp
+from .video_library import (DEFAULT_VIDEO_FILE, ReadOnlyLibraryError,
+                            VideoLibrary)
+import csv
+import sys
+import threading
+
+
+class ReloadingVideoLibrary:
+    """A class used to represent a Video Library that loads its catalog again
+    whenever the file changes, without restarting the player.
+
+    It has the methods of VideoLibrary. The videos are held in a VideoLibrary
+    snapshot that is never changed: a reload reads the catalog and builds its
+    search index into a new snapshot, in a background thread when watching,
+    then puts it in place of the old one with a single assignment. Each call
+    uses the snapshot current when it starts, so a search or a listing under
+    way when the catalog is swapped finishes against the old catalog.
+
+    Videos whose row did not change are the same Video objects in both
+    snapshots, so they keep their flags and their places in playlists. An
+    edited video is a new object with the flag its old version had when the
+    new catalog was read.
+    """
+
+    def __init__(self, video_file_path=None, search_index_path=None):
+        """The ReloadingVideoLibrary class is initialized.
+
+        Args:
+            video_file_path: The catalog to load and follow, in the
+                videos.txt format. Defaults to the videos.txt shipped next to
+                this module.
+            search_index_path: Where to save the search index between runs
+                and reloads. By default the index is rebuilt every time.
+        """
+        if video_file_path is None:
+            video_file_path = DEFAULT_VIDEO_FILE
+
+        self._catalog_path = video_file_path
+        self._search_index_path = search_index_path
+        self._stamp = catalog_stamp(video_file_path)
+        self._snapshot = VideoLibrary(video_file_path, search_index_path)
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+
+    @property
+    def snapshot(self):
+        """Returns the current VideoLibrary, for callers that need several
+        calls to see the same catalog.
+        """
+        return self._snapshot
+
+    def reload(self):
+        """Loads the catalog again if the file changed since the last load.
+
+        A catalog that changes again while it is being read is left for the
+        next reload, so a half-written file is never swapped in.
+
+        Returns:
+            True if a new snapshot took the place of the old one.
+
+        Raises:
+            OSError, ValueError, csv.Error: If the catalog cannot be read.
+                The current snapshot is kept, and the catalog is not read
+                again until it changes.
+        """
+        with self._reload_lock:
+            stamp = catalog_stamp(self._catalog_path)
+            if stamp == self._stamp:
+                return False
+            # The search index the new library saves is stamped with the
+            # catalog as it was before reading, so if the file changes
+            # meanwhile the next reload does not take that index as current.
+            try:
+                snapshot = VideoLibrary(
+                    self._catalog_path, self._search_index_path,
+                    previous=self._snapshot)
+            except (OSError, ValueError, csv.Error):
+                self._stamp = stamp
+                raise
+            if catalog_stamp(self._catalog_path) != stamp:
+                return False
+            self._stamp = stamp
+            self._snapshot = snapshot
+            return True
+
+    def start_watching(self, interval=1.0):
+        """Reloads the catalog from a background thread whenever it changes.
+
+        Args:
+            interval: How many seconds to wait between checks of the file.
+        """
+        if self._watcher is None:
+            self._stop.clear()
+            self._watcher = threading.Thread(
+                target=self._watch, args=(interval,), daemon=True)
+            self._watcher.start()
+
+    def stop_watching(self):
+        """Stops the thread started by start_watching."""
+        if self._watcher is not None:
+            self._stop.set()
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                if self.reload():
+                    print(f"Reloaded {self._catalog_path}: "
+                          f"{len(self._snapshot)} videos", file=sys.stderr)
+            except (OSError, ValueError, csv.Error) as e:
+                print(f"Cannot reload {self._catalog_path}: {e}",
+                      file=sys.stderr)
+
+    def __len__(self):
+        """Returns the number of videos in the video library."""
+        return len(self._snapshot)
+
+    def get_all_videos(self):
+        """Returns all available video information from the video library."""
+        return self._snapshot.get_all_videos()
+
+    def get_sorted_videos(self):
+        """Returns all videos sorted by title, ignoring case."""
+        return self._snapshot.get_sorted_videos()
+
+    def iter_sorted_videos(self, after=None):
+        """Yields the videos in the order of get_sorted_videos, all from the
+        snapshot current when iteration starts.
+        """
+        return self._snapshot.iter_sorted_videos(after)
+
+    def get_video(self, video_id):
+        """Returns the video object (title, url, tags) from the video library.
+
+        Args:
+            video_id: The video url.
+
+        Returns:
+            The Video object for the requested video_id. None if the video
+            does not exist.
+        """
+        return self._snapshot.get_video(video_id)
+
+    def search_videos(self, search_term):
+        """Returns the videos whose titles contain the search term."""
+        return self._snapshot.search_videos(search_term)
+
+    def search_videos_with_tag(self, video_tag):
+        """Returns the videos with the given tag, sorted by title."""
+        return self._snapshot.search_videos_with_tag(video_tag)
+
+    def search_videos_with_tag_query(self, tag_query):
+        """Returns the videos matching a boolean tag query, sorted by title."""
+        return self._snapshot.search_videos_with_tag_query(tag_query)
+
+    def add_video(self, video):
+        """Fails, the library only changes with its catalog file.
+
+        Raises:
+            ReadOnlyLibraryError: Always.
+        """
+        raise ReadOnlyLibraryError(
+            "ReloadingVideoLibrary follows its catalog file")
+
+    def remove_video(self, video_id):
+        """Fails, the library only changes with its catalog file.
+
+        Raises:
+            ReadOnlyLibraryError: Always.
+        """
+        raise ReadOnlyLibraryError(
+            "ReloadingVideoLibrary follows its catalog file")
@@ -0,0 +1,268 @@
+"""Renders player command results as the text shown to the user."""
+
+from typing import Iterable
+
+from .video_result import Action, ErrorCode, Result
+
+
+def _flagged(result):
+    return f"Video is currently flagged (reason: {result.video.flagReason})"
+
+
+def _stopped(result):
+    return [f"Stopping video: {video.title}" for video in result.stopped]
+
+
+def _number_of_videos(result):
+    return [f"{result.count} videos in the library"]
+
+
+def _page_error(result):
+    if result.error is ErrorCode.INVALID_PAGE_SIZE:
+        return "Invalid page size"
+    return "Invalid page token"
+
+
+def _show_all_videos(result):
+    if result.error is not None:
+        yield f"Cannot show videos: {_page_error(result)}"
+        return
+    yield "Here's a list of all available videos:"
+    for video in result.videos:
+        yield str(video)
+    if result.next_page is not None:
+        yield (f"Next page: SHOW_ALL_VIDEOS {result.page_size} "
+               f"{result.next_page}")
+
+
+def _play(result):
+    if result.error is ErrorCode.VIDEO_NOT_FOUND:
+        return ["Cannot play video: Video does not exist"]
+    if result.error is ErrorCode.VIDEO_FLAGGED:
+        return [f"Cannot play video: {_flagged(result)}"]
+    if result.error is ErrorCode.NO_VIDEOS_AVAILABLE:
+        return ["No videos available"]
+    return _stopped(result) + [f"Playing video: {result.video.title}"]
+
+
+def _stop(result):
+    if result.error is ErrorCode.NOTHING_PLAYING:
+        return ["Cannot stop video: No video is currently playing"]
+    if result.video is None:
+        return []
+    return [f"Stopping video: {result.video.title}"]
+
+
+def _pause(result):
+    if result.error is ErrorCode.ALREADY_PAUSED:
+        return [f"Video already paused: {result.video.title}"]
+    if result.error is ErrorCode.NOTHING_PLAYING:
+        return ["Cannot pause video: No video is currently playing"]
+    return [f"Pausing video: {result.video.title}"]
+
+
+def _continue(result):
+    if result.error is ErrorCode.NOT_PAUSED:
+        return ["Cannot continue video: Video is not paused"]
+    if result.error is ErrorCode.NOTHING_PLAYING:
+        return ["Cannot continue video: No video is currently playing"]
+    return [f"Continuing video: {result.video.title}"]
+
+
+def _show_playing(result):
+    if result.error is ErrorCode.NOTHING_PLAYING:
+        return ["No video is currently playing"]
+    if result.paused:
+        return [f"Currently playing: {result.video} - PAUSED"]
+    return [f"Currently playing: {result.video}"]
+
+
+def _create_playlist(result):
+    if result.error is ErrorCode.PLAYLIST_EXISTS:
+        return ["Cannot create playlist: A playlist with the same name "
+                "already exists"]
+    return [f"Successfully created new playlist: {result.playlist}"]
+
+
+def _add_to_playlist(result):
+    prefix = f"Cannot add video to {result.playlist}"
+    if result.error is ErrorCode.PLAYLIST_NOT_FOUND:
+        return [f"{prefix}: Playlist does not exist"]
+    if result.error is ErrorCode.VIDEO_NOT_FOUND:
+        return [f"{prefix}: Video does not exist"]
+    if result.error is ErrorCode.VIDEO_FLAGGED:
+        return [f"{prefix}: {_flagged(result)}"]
+    if result.error is ErrorCode.VIDEO_ALREADY_IN_PLAYLIST:
+        return [f"{prefix}: Video already added"]
+    return [f"Added video to {result.playlist}: {result.video.title}"]
+
+
+def _remove_from_playlist(result):
+    prefix = f"Cannot remove video from {result.playlist}"
+    if result.error is ErrorCode.PLAYLIST_NOT_FOUND:
+        return [f"{prefix}: Playlist does not exist"]
+    if result.error is ErrorCode.VIDEO_NOT_FOUND:
+        return [f"{prefix}: Video does not exist"]
+    if result.error is ErrorCode.VIDEO_NOT_IN_PLAYLIST:
+        return [f"{prefix}: Video is not in playlist"]
+    return [f"Removed video from {result.playlist}: {result.video.title}"]
+
+
+def _rejection(rejection):
+    if rejection.error is ErrorCode.VIDEO_NOT_FOUND:
+        reason = "Video does not exist"
+    elif rejection.error is ErrorCode.VIDEO_FLAGGED:
+        reason = ("Video is currently flagged "
+                  f"(reason: {rejection.video.flagReason})")
+    elif rejection.error is ErrorCode.VIDEO_ALREADY_IN_PLAYLIST:
+        reason = "Video already added"
+    elif rejection.error is ErrorCode.VIDEO_NOT_IN_PLAYLIST:
+        reason = "Video is not in playlist"
+    else:
+        reason = "Video is listed more than once"
+    return f"  {rejection.video_id}: {reason}"
+
+
+def _bulk_error(result, prefix):
+    if result.error is ErrorCode.PLAYLIST_NOT_FOUND:
+        return [f"{prefix}: Playlist does not exist"]
+    return ([f"{prefix}: {len(result.rejected)} of {result.count} videos "
+             "are invalid, no video was changed"]
+            + [_rejection(rejection) for rejection in result.rejected])
+
+
+def _add_many_to_playlist(result):
+    if result.error is not None:
+        return _bulk_error(result, f"Cannot add videos to {result.playlist}")
+    return [f"Added {len(result.videos)} videos to {result.playlist}"]
+
+
+def _remove_many_from_playlist(result):
+    if result.error is not None:
+        return _bulk_error(
+            result, f"Cannot remove videos from {result.playlist}")
+    return [f"Removed {len(result.videos)} videos from {result.playlist}"]
+
+
+def _clear_playlist(result):
+    if result.error is ErrorCode.PLAYLIST_NOT_FOUND:
+        return [f"Cannot clear playlist {result.playlist}: Playlist does not "
+                "exist"]
+    return [f"Successfully removed all videos from {result.playlist}"]
+
+
+def _delete_playlist(result):
+    if result.error is ErrorCode.PLAYLIST_NOT_FOUND:
+        return [f"Cannot delete playlist {result.playlist}: Playlist does "
+                "not exist"]
+    return [f"Deleted playlist: {result.playlist}"]
+
+
+def _show_playlist(result):
+    if result.error is ErrorCode.PLAYLIST_NOT_FOUND:
+        yield (f"Cannot show playlist {result.playlist}: Playlist does not "
+               "exist")
+        return
+    if result.error is not None:
+        yield f"Cannot show playlist {result.playlist}: {_page_error(result)}"
+        return
+    yield f"Showing playlist: {result.playlist}"
+    if not result.videos:
+        yield " No videos here yet"
+    for video in result.videos:
+        yield f"  {video}"
+    if result.next_page is not None:
+        yield (f"Next page: SHOW_PLAYLIST {result.playlist} "
+               f"{result.page_size} {result.next_page}")
+
+
+def _show_all_playlists(result):
+    if not result.playlists:
+        return ["No playlists exist yet"]
+    return ["Showing all playlists: "] + list(result.playlists)
+
+
+def _search_results(result):
+    if not result.videos:
+        return [f"No search results for {result.query}"]
+    return ([f"Here are the results for {result.query}:"]
+            + [f"  {index}) {video}"
+               for index, video in enumerate(result.videos, 1)])
+
+
+def _search_videos(result):
+    lines = _search_results(result)
+    if result.videos:
+        lines.append("Would you like to play any of the above? If yes, "
+                     "specify the number of the video.")
+        lines.append("If your answer is not a valid number, we will assume "
+                     "it's a no.")
+    return lines
+
+
+def _search_videos_with_tags(result):
+    if result.error is ErrorCode.INVALID_QUERY:
+        return [f"Cannot search videos: {result.reason}"]
+    return _search_results(result)
+
+
+def _play_search_result(result):
+    if result.video is None:
+        return []
+    return [f"Playing video: {result.video.title}"]
+
+
+def _flag_video(result):
+    lines = _stopped(result)
+    if result.error is ErrorCode.VIDEO_NOT_FOUND:
+        lines.append("Cannot flag video: Video does not exist")
+    elif result.error is ErrorCode.VIDEO_ALREADY_FLAGGED:
+        lines.append("Cannot flag video: Video is already flagged")
+    else:
+        lines.append(f"Successfully flagged video: {result.video.title} "
+                     f"(reason: {result.reason})")
+    return lines
+
+
+def _allow_video(result):
+    if result.error is ErrorCode.VIDEO_NOT_FOUND:
+        return ["Cannot remove flag from video: Video does not exist"]
+    if result.error is ErrorCode.VIDEO_NOT_FLAGGED:
+        return ["Cannot remove flag from video: Video is not flagged"]
+    return [f"Successfully removed flag from video: {result.video.title}"]
+
+
+_RENDERERS = {
+    Action.NUMBER_OF_VIDEOS: _number_of_videos,
+    Action.SHOW_ALL_VIDEOS: _show_all_videos,
+    Action.PLAY: _play,
+    Action.PLAY_RANDOM: _play,
+    Action.STOP: _stop,
+    Action.PAUSE: _pause,
+    Action.CONTINUE: _continue,
+    Action.SHOW_PLAYING: _show_playing,
+    Action.CREATE_PLAYLIST: _create_playlist,
+    Action.ADD_TO_PLAYLIST: _add_to_playlist,
+    Action.ADD_MANY_TO_PLAYLIST: _add_many_to_playlist,
+    Action.REMOVE_FROM_PLAYLIST: _remove_from_playlist,
+    Action.REMOVE_MANY_FROM_PLAYLIST: _remove_many_from_playlist,
+    Action.CLEAR_PLAYLIST: _clear_playlist,
+    Action.DELETE_PLAYLIST: _delete_playlist,
+    Action.SHOW_PLAYLIST: _show_playlist,
+    Action.SHOW_ALL_PLAYLISTS: _show_all_playlists,
+    Action.SEARCH_VIDEOS: _search_videos,
+    Action.SEARCH_VIDEOS_WITH_TAG: _search_videos,
+    Action.SEARCH_VIDEOS_WITH_TAGS: _search_videos_with_tags,
+    Action.PLAY_SEARCH_RESULT: _play_search_result,
+    Action.FLAG_VIDEO: _flag_video,
+    Action.ALLOW_VIDEO: _allow_video,
+}
+
+
+def render(result: Result) -> Iterable[str]:
+    """Returns the lines of text describing a command result.
+
+    Listings are rendered one line at a time as they are consumed, so
+    showing a whole catalog does not build all of its text at once.
+    """
+    return _RENDERERS[result.action](result)
@@ -1,21 +1,149 @@
-"""A youtube terminal simulator."""
+"""A youtube terminal simulator.
+
+Run without arguments for an interactive session, or replay a file of
+commands, one per line, with `--script FILE` (`--script -` reads stdin).
+Playlists and flags are kept across runs in a journal when `--state FILE`
+is given, and start empty otherwise. `--serve ADDRESS` instead serves any
+number of sessions over TCP ("HOST:PORT") or a Unix socket (a path), all
+sharing one library. With `--watch`, changes to the catalog are loaded while running.
+"""
+from .reloading_video_library import ReloadingVideoLibrary
+from .video_library import DEFAULT_VIDEO_FILE, VideoLibrary
+from .video_output import StreamSink
+from .player_journal import PlayerJournal
+from .player_server import (GOODBYE, PROMPT, WELCOME, ThreadingPlayerServer,
+                            start_server)
 from .video_player import VideoPlayer
 from .command_parser import CommandException
 from .command_parser import CommandParser
+import argparse
+import asyncio
+import contextlib
+import sys
+import time
 
+# Script output is written in chunks of this many characters instead of per
+# line.
+SCRIPT_OUTPUT_BUFFER_SIZE = 1 << 20
 
-if __name__ == "__main__":
-    print("""Hello and welcome to YouTube, what would you like to do?
-    Enter HELP for list of available commands or EXIT to terminate.""")
-    video_player = VideoPlayer()
-    parser = CommandParser(video_player)
+
+def run_interactive(parser):
+    """Reads commands from the terminal until the user enters EXIT."""
+    print(WELCOME)
     while True:
-        command = input("YT> ")
+        command = input(PROMPT)
         if command.upper() == "EXIT":
             break
         try:
             parser.execute_command(command.split())
         except CommandException as e:
             print(e)
-    print("YouTube has now terminated its execution. "
-          "Thank you and goodbye!")
+    print(GOODBYE)
+
+
+def run_script(parser, script, output):
+    """Executes the commands of a script until its end or an EXIT line.
+
+    Args:
+        parser: The CommandParser to execute the commands with.
+        script: A text stream with one command per line.
+        output: The sink of the player, which also gets command errors.
+
+    Returns:
+        The number of commands executed.
+    """
+    executed = 0
+    for line in iter(script.readline, ""):
+        command = line.rstrip("\r\n")
+        if command.upper() == "EXIT":
+            break
+        try:
+            parser.execute_command(command.split())
+        except CommandException as e:
+            output.write(str(e))
+        executed += 1
+    return executed
+
+
+async def serve(address, video_library):
+    """Serves sessions on an asyncio event loop until cancelled."""
+    server = await start_server(address, video_library)
+    print(f"Serving on {address}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument(
+        "--script", metavar="FILE",
+        help="execute the commands in FILE ('-' for stdin) without prompting "
+             "and report the throughput on stderr")
+    arg_parser.add_argument(
+        "--serve", metavar="ADDRESS",
+        help="serve a session per connection on HOST:PORT or a Unix socket "
+             "path; sessions keep their playlists while connected")
+    arg_parser.add_argument(
+        "--threads", action="store_true",
+        help="with --serve, run each session in its own thread instead of "
+             "on one asyncio event loop")
+    arg_parser.add_argument(
+        "--watch", action="store_true",
+        help="reload the catalog whenever it changes, without restarting")
+    arg_parser.add_argument(
+        "--state", metavar="FILE",
+        help="keep playlists and flags across runs in FILE; by default they "
+             "are kept in memory only, so every run starts the same")
+    args = arg_parser.parse_args()
+    if args.threads and args.serve is None:
+        arg_parser.error("--threads needs --serve")
+    if args.state is not None and args.serve is not None:
+        arg_parser.error("--state cannot be used with --serve, sessions "
+                         "only keep their playlists while connected")
+
+    search_index_path = f"{DEFAULT_VIDEO_FILE}.search"
+    if args.watch:
+        video_library = ReloadingVideoLibrary(DEFAULT_VIDEO_FILE,
+                                              search_index_path)
+        video_library.start_watching()
+    else:
+        video_library = VideoLibrary(DEFAULT_VIDEO_FILE, search_index_path)
+    if args.serve is not None:
+        try:
+            if not args.threads:
+                asyncio.run(serve(args.serve, video_library))
+                return
+            with ThreadingPlayerServer(args.serve, video_library) as server:
+                print(f"Serving on {args.serve}", file=sys.stderr)
+                server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return
+
+    with contextlib.ExitStack() as stack:
+        journal = None
+        if args.state is not None:
+            journal = PlayerJournal(args.state)
+            stack.callback(journal.close)
+        if args.script is None:
+            run_interactive(
+                CommandParser(VideoPlayer(video_library, journal=journal)))
+            return
+
+        script = sys.stdin
+        if args.script != "-":
+            script = stack.enter_context(open(args.script))
+        output = StreamSink(sys.stdout, SCRIPT_OUTPUT_BUFFER_SIZE)
+        parser = CommandParser(VideoPlayer(video_library, output, journal))
+        start = time.perf_counter()
+        executed = run_script(parser, script, output)
+        output.flush()
+        elapsed = time.perf_counter() - start
+
+    print(f"Executed {executed} commands in {elapsed:.3f}s "
+          f"({executed / max(elapsed, 1e-9):.0f} commands/sec)",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
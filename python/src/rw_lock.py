@@ -0,0 +1,51 @@
+"""A lock letting many readers, or one writer, in at a time."""
+
+import contextlib
+import threading
+
+
+class ReadWriteLock:
+    """A class used to represent a readers-writer lock.
+
+    Any number of threads can hold the lock for reading at once, while a
+    thread holding it for writing excludes everyone else. A waiting writer
+    stops new readers from coming in, so a stream of reads cannot starve
+    writes. The lock is not reentrant.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writing = False
+        self._waiting_writers = 0
+
+    @contextlib.contextmanager
+    def read(self):
+        """Holds the lock for reading for the duration of a with block."""
+        with self._condition:
+            while self._writing or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def write(self):
+        """Holds the lock for writing for the duration of a with block."""
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writing or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
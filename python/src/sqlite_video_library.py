@@ -0,0 +1,567 @@
+"""A video library, playlists and flags kept in an SQLite database."""
+
+from collections.abc import Sequence
+import contextlib
+from .tag_query import parse_tag_query
+from .video import Video
+from .video_cache import VideoCacheMixin
+from .video_catalog import catalog_rows
+import os
+import sqlite3
+import threading
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog (
+    path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY, title TEXT NOT NULL, tags TEXT NOT NULL,
+    sort_title TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS videos_by_title ON videos (sort_title, video_id);
+CREATE TABLE IF NOT EXISTS video_tags (
+    tag TEXT NOT NULL, video_id TEXT NOT NULL,
+    PRIMARY KEY (tag, video_id)) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS video_tags_by_video ON video_tags (video_id);
+CREATE TABLE IF NOT EXISTS flags (
+    video_id TEXT PRIMARY KEY, reason TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS playlists (
+    playlist_id INTEGER PRIMARY KEY, name_key TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS playlist_videos (
+    playlist_id INTEGER NOT NULL, video_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (playlist_id, video_id)) WITHOUT ROWID;
+CREATE UNIQUE INDEX IF NOT EXISTS playlist_videos_by_position
+    ON playlist_videos (playlist_id, position);
+"""
+
+_VIDEO_COLUMNS = "video_id, title, tags"
+_ORDER_BY_TITLE = "ORDER BY sort_title, video_id"
+
+# Sorted listings are read this many rows per query.
+_BATCH_SIZE = 1000
+
+
+def _video_row(video):
+    return (video.video_id, video.title, ",".join(video.tags),
+            video.title.lower())
+
+
+def _tag_rows(video):
+    return [(tag.casefold(), video.video_id) for tag in video.tags]
+
+
+def _catalog_rows(video_file):
+    """Yields the videos table row and the tags of every catalog row,
+    without making Video objects.
+    """
+    for title, video_id, tags in catalog_rows(video_file):
+        yield (video_id, title, ",".join(tags), title.lower()), tags
+
+
+def _tag_query_sql(query, parameters):
+    """Returns a SELECT of the ids of the videos matching a parsed tag query,
+    adding its parameters to `parameters`.
+    """
+    kind, operand = query
+    if kind == "tag":
+        parameters.append(operand.casefold())
+        return "SELECT video_id FROM video_tags WHERE tag = ?"
+    if kind == "not":
+        return ("SELECT video_id FROM videos EXCEPT SELECT video_id FROM "
+                f"({_tag_query_sql(operand, parameters)})")
+    operator = " INTERSECT " if kind == "and" else " UNION "
+    return operator.join(
+        f"SELECT video_id FROM ({_tag_query_sql(term, parameters)})"
+        for term in operand)
+
+
+class _SqliteSortedVideos(Sequence):
+    """A read-only sequence of the library videos ordered by title."""
+
+    def __init__(self, library):
+        self._library = library
+
+    def __len__(self):
+        return len(self._library)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            start, stop, step = position.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return self._library._query_videos(
+                f"SELECT {_VIDEO_COLUMNS} FROM videos {_ORDER_BY_TITLE} "
+                "LIMIT ? OFFSET ?", (max(stop - start, 0), start))
+        if position < 0:
+            position += len(self)
+        videos = self[position:position + 1]
+        if not videos:
+            raise IndexError("video position out of range")
+        return videos[0]
+
+    def __iter__(self):
+        return self._library.iter_sorted_videos()
+
+
+class SqliteVideoLibrary(VideoCacheMixin):
+    """A Video Library kept in an SQLite database.
+
+    It has the methods of VideoLibrary. Videos are indexed by id, by
+    lower-cased title and by tag, so lookups, searches and pages of the
+    sorted listing read only the rows they return. Parsed videos are cached
+    by id, see VideoCacheMixin, and every lookup of an id returns the same
+    Video object while it is in use.
+
+    The statements are fixed strings with parameters, so the sqlite3 module
+    prepares each one once per connection and reuses it.
+
+    The library, and the playlists and flags kept with it, can be shared by
+    threads. They use one connection, which runs one statement or
+    transaction at a time, while lookups of cached videos need no query.
+    """
+
+    def __init__(self, database_path, video_file_path=None, cache_size=10_000):
+        """The SqliteVideoLibrary class is initialized.
+
+        Args:
+            database_path: The SQLite database, created if missing.
+            video_file_path: A catalog in the videos.txt format to import.
+                The database is only refilled from it when the catalog
+                changed since the last import. By default the videos already
+                in the database are used.
+            cache_size: The maximum number of parsed videos kept in memory,
+                not counting referenced or flagged videos.
+        """
+        self._init_cache(cache_size)
+        self._catalog_path = video_file_path
+        self._connection = sqlite3.connect(database_path,
+                                           cached_statements=256,
+                                           check_same_thread=False)
+        # Reentrant, so a transaction can run queries of its own.
+        self._connection_lock = threading.RLock()
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        with self._connection:
+            self._connection.executescript(_SCHEMA)
+        if video_file_path is not None:
+            self._import_catalog(video_file_path)
+        self._count, = self._connection.execute(
+            "SELECT count(*) FROM videos").fetchone()
+
+    def _import_catalog(self, video_file_path):
+        """Replaces the videos with the catalog ones, in one transaction,
+        unless the catalog is the one imported last.
+        """
+        stat = os.stat(video_file_path)
+        path = os.path.abspath(video_file_path)
+        stamp = self._connection.execute(
+            "SELECT size, mtime_ns FROM catalog WHERE path = ?",
+            (path,)).fetchone()
+        if stamp == (stat.st_size, stat.st_mtime_ns):
+            return
+
+        # The rows go straight from the file to the database, in two passes
+        # so neither holds the catalog in memory. A row repeating a video id
+        # replaces the earlier one, and only its tags are kept.
+        with open(video_file_path) as video_file, self._connection:
+            self._connection.execute("DELETE FROM videos")
+            self._connection.execute("DELETE FROM video_tags")
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO videos VALUES (?, ?, ?, ?)",
+                (row for row, _ in _catalog_rows(video_file)))
+            video_file.seek(0)
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO video_tags SELECT ?, video_id "
+                "FROM videos WHERE video_id = ? AND tags = ?",
+                ((tag.casefold(), row[0], row[2])
+                 for row, tags in _catalog_rows(video_file) for tag in tags))
+            self._connection.execute("DELETE FROM catalog")
+            self._connection.execute(
+                "INSERT INTO catalog VALUES (?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns))
+
+    def close(self):
+        """Closes the database."""
+        with self._connection_lock:
+            self._connection.close()
+
+    def __len__(self):
+        """Returns the number of videos in the video library."""
+        return self._count
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        """Runs a with block as one transaction, holding the connection."""
+        with self._connection_lock, self._connection:
+            yield self._connection
+
+    def _execute(self, sql, parameters=()):
+        """Runs a query and returns all its rows."""
+        with self._connection_lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    @staticmethod
+    def _row_key(row):
+        """Returns the key the video of a row is cached under: its id, so
+        lookups by id need no query.
+        """
+        return row[0]
+
+    def _read_video(self, row):
+        """Makes a new Video from a (video_id, title, tags) row."""
+        video_id, title, tags = row
+        return Video(title, video_id, tags.split(",") if tags else [])
+
+    def _query_videos(self, sql, parameters=()):
+        return [self._video_at(row) for row in self._execute(sql, parameters)]
+
+    def get_video(self, video_id):
+        """Returns the video object (title, url, tags) from the video library.
+
+        Args:
+            video_id: The video url.
+
+        Returns:
+            The Video object for the requested video_id. None if the video
+            does not exist.
+        """
+        video = self._cached_video(video_id)
+        if video is not None:
+            return video
+
+        rows = self._execute(
+            f"SELECT {_VIDEO_COLUMNS} FROM videos WHERE video_id = ?",
+            (video_id,))
+        return self._video_at(rows[0]) if rows else None
+
+    def get_all_videos(self):
+        """Returns all available video information from the video library."""
+        return list(self.iter_sorted_videos())
+
+    def get_sorted_videos(self):
+        """Returns all videos sorted by title, ignoring case.
+
+        The sequence reads the videos from the database as they are accessed.
+        """
+        return _SqliteSortedVideos(self)
+
+    def iter_sorted_videos(self, after=None):
+        """Yields the videos in the order of get_sorted_videos.
+
+        The videos are read a batch at a time, each batch starting from the
+        title index where the previous one ended.
+
+        Args:
+            after: The (title, video_id) of the last video already seen.
+                Iteration starts right after it, whether or not that video is
+                still in the library. None starts at the first video.
+        """
+        key, operator = ("", ""), ">="
+        if after is not None:
+            key, operator = (after[0].lower(), after[1]), ">"
+        while True:
+            videos = self._query_videos(
+                f"SELECT {_VIDEO_COLUMNS} FROM videos "
+                f"WHERE (sort_title, video_id) {operator} (?, ?) "
+                f"{_ORDER_BY_TITLE} LIMIT ?", (*key, _BATCH_SIZE))
+            yield from videos
+            if len(videos) < _BATCH_SIZE:
+                return
+            last = videos[-1]
+            key, operator = (last.title.lower(), last.video_id), ">"
+
+    def add_video(self, video):
+        """Adds a video to the library, replacing any video with the same id.
+
+        Args:
+            video: The Video object to add.
+        """
+        with self._transaction() as connection:
+            replaced = self._delete_video(video.video_id)
+            connection.execute(
+                "INSERT INTO videos VALUES (?, ?, ?, ?)", _video_row(video))
+            connection.executemany(
+                "INSERT OR IGNORE INTO video_tags VALUES (?, ?)",
+                _tag_rows(video))
+            self._count += 1 - replaced
+            self._remember(video.video_id, video)
+
+    def _delete_video(self, video_id):
+        deleted = self._connection.execute(
+            "DELETE FROM videos WHERE video_id = ?", (video_id,)).rowcount
+        self._connection.execute(
+            "DELETE FROM video_tags WHERE video_id = ?", (video_id,))
+        self._forget(video_id)
+        return deleted
+
+    def remove_video(self, video_id):
+        """Removes a video from the library.
+
+        Args:
+            video_id: The video url.
+
+        Returns:
+            The removed Video object. None if the video does not exist.
+        """
+        with self._connection_lock:
+            video = self.get_video(video_id)
+            if video is not None:
+                with self._transaction():
+                    self._delete_video(video_id)
+                self._count -= 1
+        return video
+
+    def search_videos(self, search_term):
+        """Returns the videos whose titles contain the search term.
+
+        The search ignores case and the videos are sorted by title.
+
+        Args:
+            search_term: The query to be used in search.
+        """
+        return self._query_videos(
+            f"SELECT {_VIDEO_COLUMNS} FROM videos "
+            f"WHERE instr(sort_title, ?) {_ORDER_BY_TITLE}",
+            (search_term.lower(),))
+
+    def search_videos_with_tag(self, video_tag):
+        """Returns the videos with the given tag, sorted by title.
+
+        Args:
+            video_tag: The video tag to be used in search, ignoring case.
+        """
+        return self._query_videos(
+            f"SELECT {_VIDEO_COLUMNS} FROM videos WHERE video_id IN "
+            f"(SELECT video_id FROM video_tags WHERE tag = ?) "
+            f"{_ORDER_BY_TITLE}", (video_tag.casefold(),))
+
+    def search_videos_with_tag_query(self, tag_query):
+        """Returns the videos matching a boolean tag query, sorted by title.
+
+        Args:
+            tag_query: The query, e.g. "#cat AND #animal AND NOT #dog".
+
+        Raises:
+            TagQueryError: If the query cannot be parsed.
+        """
+        parameters = []
+        matches = _tag_query_sql(parse_tag_query(tag_query), parameters)
+        return self._query_videos(
+            f"SELECT {_VIDEO_COLUMNS} FROM videos WHERE video_id IN "
+            f"({matches}) {_ORDER_BY_TITLE}", parameters)
+
+
+class _SqlitePlaylistVideos:
+    """A live view of the videos of a playlist, in the order they were
+    added.
+    """
+
+    def __init__(self, playlist):
+        self._playlist = playlist
+
+    def __len__(self):
+        return len(self._playlist)
+
+    def __iter__(self):
+        return (video for _, video in self._playlist.iter_after())
+
+
+class SqlitePlaylist:
+    """A class used to represent a Playlist kept in the database.
+
+    It has the methods of Playlist. Videos no longer in the library are left
+    out of the playlist.
+    """
+
+    def __init__(self, library, playlist_id, name):
+        self._library = library
+        self._playlist_id = playlist_id
+        self.name = name
+
+    def __len__(self):
+        """Returns the number of videos in the playlist."""
+        (count,), = self._library._execute(
+            "SELECT count(*) FROM playlist_videos WHERE playlist_id = ?",
+            (self._playlist_id,))
+        return count
+
+    def __contains__(self, video_id):
+        return self.get(video_id) is not None
+
+    def get(self, video_id):
+        """Returns the video with the given id, None if it is not listed."""
+        rows = self._library._execute(
+            "SELECT 1 FROM playlist_videos "
+            "WHERE playlist_id = ? AND video_id = ?",
+            (self._playlist_id, video_id))
+        return self._library.get_video(video_id) if rows else None
+
+    def addToPlaylist(self, video: Video):
+        self.addManyToPlaylist([video])
+
+    def addManyToPlaylist(self, videos):
+        """Adds videos in order, in one transaction. The caller checks none
+        is listed yet.
+        """
+        with self._library._transaction() as connection:
+            last, = connection.execute(
+                "SELECT coalesce(max(position), -1) FROM playlist_videos "
+                "WHERE playlist_id = ?", (self._playlist_id,)).fetchone()
+            connection.executemany(
+                "INSERT OR IGNORE INTO playlist_videos VALUES (?, ?, ?)",
+                ((self._playlist_id, video.video_id, position)
+                 for position, video in enumerate(videos, last + 1)))
+
+    def removeFromPlaylist(self, video: Video):
+        self.removeManyFromPlaylist([video])
+
+    def removeManyFromPlaylist(self, videos):
+        """Removes videos, in one transaction."""
+        with self._library._transaction() as connection:
+            connection.executemany(
+                "DELETE FROM playlist_videos "
+                "WHERE playlist_id = ? AND video_id = ?",
+                ((self._playlist_id, video.video_id) for video in videos))
+
+    def clearPlaylist(self):
+        with self._library._transaction() as connection:
+            connection.execute(
+                "DELETE FROM playlist_videos WHERE playlist_id = ?",
+                (self._playlist_id,))
+
+    def getPlayList(self):
+        """Returns a live view of the videos, in the order they were added."""
+        return _SqlitePlaylistVideos(self)
+
+    def iter_after(self, sequence=None):
+        """Yields (position, video) pairs in the order the videos were added,
+        as Playlist.iter_after does, reading them a batch at a time.
+
+        Args:
+            sequence: The position of the last video already seen. None
+                starts at the first video.
+        """
+        position = -1 if sequence is None else sequence
+        while True:
+            rows = self._library._execute(
+                "SELECT video_id, position FROM playlist_videos "
+                "WHERE playlist_id = ? AND position > ? "
+                "ORDER BY position LIMIT ?",
+                (self._playlist_id, position, _BATCH_SIZE))
+            for video_id, position in rows:
+                video = self._library.get_video(video_id)
+                if video is not None:
+                    yield position, video
+            if len(rows) < _BATCH_SIZE:
+                return
+
+    @property
+    def title(self) -> str:
+        """Returns the name of the playlist."""
+        return self.name
+
+
+class SqlitePlaylistRegistry:
+    """A class used to represent the playlists of a player, kept in the
+    database of a SqliteVideoLibrary.
+
+    It has the methods of PlaylistRegistry.
+    """
+
+    def __init__(self, library):
+        self._library = library
+
+    def __len__(self):
+        """Returns the number of playlists."""
+        (count,), = self._library._execute("SELECT count(*) FROM playlists")
+        return count
+
+    def __contains__(self, playlist_name):
+        return self.get(playlist_name) is not None
+
+    def get(self, playlist_name):
+        """Returns the playlist with the given name, ignoring case.
+
+        Returns:
+            The SqlitePlaylist, None if there is no such playlist.
+        """
+        rows = self._library._execute(
+            "SELECT playlist_id, name FROM playlists WHERE name_key = ?",
+            (playlist_name.casefold(),))
+        return SqlitePlaylist(self._library, *rows[0]) if rows else None
+
+    def create(self, playlist_name):
+        """Creates an empty playlist.
+
+        Args:
+            playlist_name: The name of the playlist, as it should be shown.
+
+        Returns:
+            The new SqlitePlaylist, None if a playlist with that name exists.
+        """
+        with self._library._transaction() as connection:
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO playlists (name_key, name) "
+                "VALUES (?, ?)", (playlist_name.casefold(), playlist_name))
+        if cursor.rowcount == 0:
+            return None
+        return SqlitePlaylist(self._library, cursor.lastrowid, playlist_name)
+
+    def remove(self, playlist_name):
+        """Deletes the playlist with the given name, ignoring case.
+
+        Returns:
+            The removed SqlitePlaylist, None if there is no such playlist.
+        """
+        with self._library._transaction() as connection:
+            playList = self.get(playlist_name)
+            if playList is not None:
+                connection.execute(
+                    "DELETE FROM playlist_videos WHERE playlist_id = ?",
+                    (playList._playlist_id,))
+                connection.execute(
+                    "DELETE FROM playlists WHERE playlist_id = ?",
+                    (playList._playlist_id,))
+        return playList
+
+    def names(self):
+        """Returns the names of all playlists, sorted ignoring case."""
+        return [name for name, in self._library._execute(
+            "SELECT name FROM playlists ORDER BY name_key")]
+
+
+class SqlitePlayerStore:
+    """Keeps the playlists and flags of a player in the database of a
+    SqliteVideoLibrary.
+
+    Pass `playlists` as the player playlists and the store itself as its
+    journal: the playlists are written to the database as they change, and
+    the flags as the player records them.
+    """
+
+    def __init__(self, library):
+        self._library = library
+        self.playlists = SqlitePlaylistRegistry(library)
+
+    def recover(self):
+        """Returns the saved state, as PlayerJournal.recover does.
+
+        The playlists are read from the database as they are used, so only
+        the flags are returned.
+        """
+        return [], dict(self._library._execute(
+            "SELECT video_id, reason FROM flags"))
+
+    def record(self, change, *arguments):
+        """Saves a flag change. Playlist changes are already saved."""
+        if change == "flag":
+            with self._library._transaction() as connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO flags VALUES (?, ?)", arguments)
+        elif change == "allow":
+            with self._library._transaction() as connection:
+                connection.execute(
+                    "DELETE FROM flags WHERE video_id = ?", arguments)
+
+    def close(self):
+        pass
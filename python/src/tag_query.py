@@ -0,0 +1,78 @@
+"""A parser for boolean tag queries such as "#cat AND #animal AND NOT #dog"."""
+
+import re
+
+_TOKEN = re.compile(r"\(|\)|[^\s()]+")
+
+
+class TagQueryError(Exception):
+    """A class used to represent an invalid tag query."""
+    pass
+
+
+def parse_tag_query(text):
+    """Parses a boolean tag query.
+
+    The query combines tags with AND, OR and NOT, which bind in the usual
+    order (NOT first, OR last), and parentheses. The operators ignore case.
+
+    Args:
+        text: The query, e.g. "#cat AND (#animal OR #pet) AND NOT #dog".
+
+    Returns:
+        The query as nested tuples: ("tag", tag), ("not", query),
+        ("and", [query, ...]) or ("or", [query, ...]).
+
+    Raises:
+        TagQueryError: If the query is empty or malformed.
+    """
+    tokens = _TOKEN.findall(text)
+    if not tokens:
+        raise TagQueryError("Query is empty")
+    query, position = _parse_or(tokens, 0)
+    if position != len(tokens):
+        raise TagQueryError(f"Unexpected '{tokens[position]}'")
+    return query
+
+
+def _is_keyword(tokens, position, keyword):
+    return position < len(tokens) and tokens[position].upper() == keyword
+
+
+def _parse_or(tokens, position):
+    terms = []
+    while True:
+        term, position = _parse_and(tokens, position)
+        terms.append(term)
+        if not _is_keyword(tokens, position, "OR"):
+            break
+        position += 1
+    return (terms[0] if len(terms) == 1 else ("or", terms)), position
+
+
+def _parse_and(tokens, position):
+    factors = []
+    while True:
+        factor, position = _parse_not(tokens, position)
+        factors.append(factor)
+        if not _is_keyword(tokens, position, "AND"):
+            break
+        position += 1
+    return (factors[0] if len(factors) == 1 else ("and", factors)), position
+
+
+def _parse_not(tokens, position):
+    if position == len(tokens):
+        raise TagQueryError("Query ends unexpectedly")
+    token = tokens[position]
+    if token.upper() == "NOT":
+        factor, position = _parse_not(tokens, position + 1)
+        return ("not", factor), position
+    if token == "(":
+        query, position = _parse_or(tokens, position + 1)
+        if position == len(tokens) or tokens[position] != ")":
+            raise TagQueryError("Missing ')'")
+        return query, position + 1
+    if token == ")" or token.upper() in ("AND", "OR"):
+        raise TagQueryError(f"Unexpected '{token}'")
+    return ("tag", token), position + 1
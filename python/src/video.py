@@ -1,39 +1,86 @@
 """A video class."""
 
 from typing import Sequence
+import sys
+import threading
+
+# Tag tuples shared by every video with the same tags. Catalogs reuse a small
+# set of tags, so most videos point at one of a few tuples of interned strings.
+_tag_tuples = {}
+
+
+def _shared_tags(video_tags):
+    tags = tuple(sys.intern(tag) for tag in video_tags)
+    return _tag_tuples.setdefault(tags, tags)
+
+
+# Held while a flag is checked and changed. Flags change rarely, so one lock
+# for every video costs less than a lock per video.
+_flag_lock = threading.Lock()
 
 
 class Video:
     """A class used to represent a Video."""
 
+    # No per-instance __dict__, catalogs hold millions of videos.
+    __slots__ = ("_title", "_video_id", "_flag", "_tags", "_line",
+                 "__weakref__")
+
     def __init__(self, video_title: str, video_id: str, video_tags: Sequence[str]):
         """Video constructor."""
         self._title = video_title
         self._video_id = video_id
-        self._flagged = False
-        self._flagReason = ""
+        # None, or the reason the video is flagged. Flagging assigns this
+        # one attribute, so other threads see either the old or the new
+        # flag, never a mix of the two.
+        self._flag = None
 
         # Turn the tags into a tuple here so it's unmodifiable,
         # in case the caller changes the 'video_tags' they passed to us
-        self._tags = tuple(video_tags)
+        self._tags = _shared_tags(video_tags)
+
+        # The (flag, line) last rendered by __str__. Listings render each
+        # video once, and a line rendered for an older flag is ignored.
+        self._line = (None, None)
 
     def flagVideo(self, reason):
-        self._flagged = True
-        self._flagReason = reason
+        """Flags the video, unless it is flagged already.
+
+        Returns:
+            True if this call flagged the video.
+        """
+        with _flag_lock:
+            if self._flag is not None:
+                return False
+            self._flag = reason
+            return True
 
     def allowVideo(self):
-        self._flagged = False
-        self._flagReason = ""
+        """Removes the flag of the video, if it has one.
 
-    def __str__(self) -> str:
-        listOfTags = []
-        for tag in self.tags:
-            listOfTags.append(tag)
+        Returns:
+            True if this call removed the flag.
+        """
+        with _flag_lock:
+            if self._flag is None:
+                return False
+            self._flag = None
+            return True
 
-        if (self._flagged):
-            return f"{self.title} ({self.video_id}) [{' '.join(listOfTags)}] - FLAGGED (reason: {self._flagReason})"
+    def _render(self, flag) -> str:
+        tags = " ".join(self._tags)
+        if flag is not None:
+            return f"{self._title} ({self._video_id}) [{tags}] - FLAGGED (reason: {flag})"
 
-        return f"{self.title} ({self.video_id}) [{' '.join(listOfTags)}]"
+        return f"{self._title} ({self._video_id}) [{tags}]"
+
+    def __str__(self) -> str:
+        flag = self._flag
+        rendered_flag, line = self._line
+        if line is None or rendered_flag is not flag:
+            line = self._render(flag)
+            self._line = (flag, line)
+        return line
 
     @property
     def title(self) -> str:
@@ -41,14 +88,15 @@ class Video:
         return self._title
 
     @property
-    def flagged(self) -> str:
+    def flagged(self) -> bool:
         """Returns the flag status of a video."""
-        return self._flagged
+        return self._flag is not None
 
     @property
     def flagReason(self) -> str:
         """Returns the flag reason of a video."""
-        return self._flagReason
+        flag = self._flag
+        return "" if flag is None else flag
 
     @property
     def video_id(self) -> str:
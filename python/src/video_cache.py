@@ -0,0 +1,83 @@
+"""The cache of parsed videos shared by the libraries that read on demand."""
+
+from collections import OrderedDict
+import threading
+import weakref
+
+
+class VideoCacheMixin:
+    """Caches the videos a library makes from the rows it reads.
+
+    The library calls _init_cache, implements _read_video to make a new
+    Video of a row, and gets the video of a row with _video_at. Parsed videos
+    are kept in an LRU cache of at most `cache_size` entries. Videos still
+    referenced elsewhere (by a playlist or the player) and flagged videos
+    stay available after leaving the cache, so every read of a row returns
+    the same Video object. The cache has a lock of its own, so this holds
+    for reads from many threads too.
+    """
+
+    def _init_cache(self, cache_size):
+        # The caches are keyed by _row_key, so a row already parsed is found
+        # without reading it again. Reentrant, as _video_at holds it around
+        # _cached_video and _remember.
+        self._cache_lock = threading.RLock()
+        self._cache_size = cache_size
+        self._cache = OrderedDict()
+        self._referenced = weakref.WeakValueDictionary()
+        self._flagged = {}
+
+    def _remember(self, key, video):
+        with self._cache_lock:
+            self._cache[key] = video
+            self._referenced[key] = video
+            while len(self._cache) > self._cache_size:
+                evicted_key, evicted = self._cache.popitem(last=False)
+                if evicted.flagged:
+                    self._flagged[evicted_key] = evicted
+            return video
+
+    def _cached_video(self, key):
+        with self._cache_lock:
+            video = self._cache.get(key)
+            if video is not None:
+                self._cache.move_to_end(key)
+                return video
+
+            video = self._referenced.get(key)
+            if video is None:
+                video = self._flagged.get(key)
+            if video is not None:
+                if not video.flagged:
+                    self._flagged.pop(key, None)
+                self._remember(key, video)
+            return video
+
+    def _forget(self, key):
+        """Drops the video cached under `key`, flagged or not."""
+        with self._cache_lock:
+            self._cache.pop(key, None)
+            self._referenced.pop(key, None)
+            self._flagged.pop(key, None)
+
+    @staticmethod
+    def _row_key(row):
+        """Returns the key the video of a row is cached under. By default
+        the row itself, e.g. its position in the catalog.
+        """
+        return row
+
+    def _read_video(self, row):
+        """Makes a new Video of a row."""
+        raise NotImplementedError
+
+    def _video_at(self, row):
+        key = self._row_key(row)
+        video = self._cached_video(key)
+        if video is not None:
+            return video
+        video = self._read_video(row)
+        # Checked again and filled in one go, so two threads reading the
+        # same row end up with the same Video.
+        with self._cache_lock:
+            return self._cached_video(key) or self._remember(key, video)
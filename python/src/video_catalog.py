@@ -0,0 +1,64 @@
+"""The videos.txt catalog format, and the order libraries list videos in."""
+
+from .video import Video
+import csv
+import os
+
+
+def catalog_stamp(catalog_path):
+    """Returns the (size, mtime_ns) of a catalog file, which changes whenever
+    the file is rewritten.
+    """
+    stat = os.stat(catalog_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+# Helper Wrapper around CSV reader to strip whitespace from around
+# each item.
+def _csv_reader_with_strip(reader):
+    yield from ((item.strip() for item in line) for line in reader)
+
+
+def catalog_rows(video_file):
+    """Yields the rows of a catalog in the videos.txt format.
+
+    Args:
+        video_file: The catalog lines, e.g. the catalog opened as text.
+
+    Returns:
+        An iterator of (title, video_id, tags) tuples, with the whitespace
+        around every field and tag stripped. The tags are a list.
+
+    Raises:
+        ValueError: If a row does not have three fields.
+    """
+    reader = _csv_reader_with_strip(csv.reader(video_file, delimiter="|"))
+    for title, video_id, tags in reader:
+        yield (title, video_id,
+               [tag.strip() for tag in tags.split(",")] if tags else [])
+
+
+def video_from_row(row):
+    """Returns a new Video of a (title, video_id, tags) catalog row."""
+    title, video_id, tags = row
+    return Video(title, video_id, tags)
+
+
+def sort_key(video):
+    """Orders videos by title ignoring case, breaking ties on the video id."""
+    return (video.title.lower(), video.video_id)
+
+
+def position_after(videos, key):
+    """Returns the position in the sorted `videos` right after the sort key
+    `key`. Like bisect_right with a key function, which older Pythons do not
+    have.
+    """
+    low, high = 0, len(videos)
+    while low < high:
+        middle = (low + high) // 2
+        if key < sort_key(videos[middle]):
+            high = middle
+        else:
+            low = middle + 1
+    return low
@@ -0,0 +1,355 @@
+"""A video search index class."""
+
+from array import array
+import bisect
+import contextlib
+import hashlib
+import json
+import os
+import struct
+
+# Titles are indexed by every run of this many characters, so a search term
+# at least this long can be answered from the postings alone.
+GRAM_SIZE = 3
+
+
+# A saved index is plain data: this header (magic, the catalog size and
+# mtime, the length of the JSON that follows), a JSON list of the video ids,
+# title n-grams and tags, then as arrays the digest of every video, the length
+# of every posting (title n-grams first, then tags) and all the postings one
+# after another. The magic changes whenever the layout does.
+_SAVED_INDEX_MAGIC = b"YTSRCH02"
+_SAVED_INDEX_HEADER = struct.Struct("<8sqqQ")
+
+
+def _digest(video):
+    """Returns a stable hash of everything the index reads from a video."""
+    text = "\0".join((video.title, *video.tags))
+    return int.from_bytes(
+        hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+
+
+def _grams(text):
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+def _gallop(posting, ordinal, low):
+    """Returns the first position from `low` on holding at least `ordinal`.
+
+    Probes 1, 2, 4... entries ahead before the binary search, so walking a
+    long posting in step with a short one skips most of it.
+    """
+    high = low
+    step = 1
+    while high < len(posting) and posting[high] < ordinal:
+        low = high + 1
+        high += step
+        step *= 2
+    return bisect.bisect_left(posting, ordinal, low, min(high, len(posting)))
+
+
+def _intersect_two(small, large):
+    matches = array("I")
+    position = 0
+    for ordinal in small:
+        position = _gallop(large, ordinal, position)
+        if position == len(large):
+            break
+        if large[position] == ordinal:
+            matches.append(ordinal)
+    return matches
+
+
+def _intersect(postings):
+    """Returns the ordinals found in every one of the sorted `postings`."""
+    postings = sorted(postings, key=len)
+    matches = postings[0]
+    for other in postings[1:]:
+        if not matches:
+            break
+        matches = _intersect_two(matches, other)
+    return matches
+
+
+def _subtract(posting, removed):
+    """Returns the ordinals of the sorted `posting` missing from `removed`."""
+    matches = array("I")
+    position = 0
+    for ordinal in posting:
+        position = _gallop(removed, ordinal, position)
+        if position == len(removed) or removed[position] != ordinal:
+            matches.append(ordinal)
+    return matches
+
+
+def _union(postings):
+    return array("I", sorted(set().union(*postings)))
+
+
+class VideoIndex:
+    """An inverted index from title n-grams and tags to the videos.
+
+    Every indexed video gets an ordinal, handed out in increasing order, so
+    appending an ordinal to a posting keeps it sorted. Removed videos leave
+    their ordinal behind in the postings and are skipped on lookup, until
+    they outnumber the indexed videos and the ordinals are handed out again.
+    """
+
+    def __init__(self):
+        self._video_ids = []
+        self._ordinals = {}
+        self._title_postings = {}
+        self._tag_postings = {}
+        self._digests = {}
+
+    @classmethod
+    def build(cls, videos):
+        """Returns a new index of the given videos."""
+        index = cls()
+        for video in videos:
+            index.add(video)
+        return index
+
+    @classmethod
+    def load(cls, path, catalog_stamp):
+        """Loads an index saved by save().
+
+        Args:
+            path: The saved index.
+            catalog_stamp: The (size, mtime_ns) of the catalog as it was
+                read, taken before reading it.
+
+        Returns:
+            A tuple of the index, or None if there is no readable index at
+            `path`, and whether it was saved for that same catalog.
+        """
+        try:
+            with open(path, "rb") as index_file:
+                data = index_file.read()
+            index, stamp = cls._from_saved(data)
+        except (OSError, ValueError, TypeError, KeyError, IndexError,
+                struct.error):
+            # Anything unreadable only costs a rebuild.
+            return None, False
+        return index, stamp == tuple(catalog_stamp)
+
+    @classmethod
+    def _from_saved(cls, data):
+        magic, size, mtime_ns, strings_size = (
+            _SAVED_INDEX_HEADER.unpack_from(data))
+        if magic != _SAVED_INDEX_MAGIC:
+            raise ValueError("not a saved video index")
+        offset = _SAVED_INDEX_HEADER.size
+        video_ids, title_keys, tag_keys = json.loads(
+            data[offset:offset + strings_size])
+        offset += strings_size
+
+        def read_array(typecode, count):
+            nonlocal offset
+            values = array(typecode)
+            values.frombytes(data[offset:offset + count * values.itemsize])
+            if len(values) != count:
+                raise ValueError("saved video index is cut short")
+            offset += count * values.itemsize
+            return values
+
+        digests = read_array("Q", len(video_ids))
+        lengths = read_array("I", len(title_keys) + len(tag_keys))
+        postings = read_array("I", sum(lengths))
+        if offset != len(data) or (postings
+                                   and max(postings) >= len(video_ids)):
+            raise ValueError("saved video index is corrupt")
+
+        index = cls()
+        index._video_ids = video_ids
+        for ordinal, video_id in enumerate(video_ids):
+            if video_id is not None:
+                index._ordinals[video_id] = ordinal
+                index._digests[video_id] = digests[ordinal]
+        start = 0
+        for position, key in enumerate((*title_keys, *tag_keys)):
+            end = start + lengths[position]
+            target = (index._title_postings if position < len(title_keys)
+                      else index._tag_postings)
+            target[key] = postings[start:end]
+            start = end
+        return index, (size, mtime_ns)
+
+    def save(self, path, catalog_stamp):
+        """Saves the index, stamped with the size and mtime of its catalog.
+
+        The index is written to a temporary file first and then renamed, so
+        no one ever loads a partly written index.
+
+        Args:
+            path: Where to save the index.
+            catalog_stamp: The (size, mtime_ns) of the catalog the index was
+                built from, taken before reading it. A catalog rewritten
+                while it was read then does not match the saved index.
+        """
+        strings = json.dumps([self._video_ids, list(self._title_postings),
+                              list(self._tag_postings)]).encode()
+        postings = [*self._title_postings.values(),
+                    *self._tag_postings.values()]
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temporary_path, "wb") as index_file:
+                index_file.write(_SAVED_INDEX_HEADER.pack(
+                    _SAVED_INDEX_MAGIC, *catalog_stamp, len(strings)))
+                index_file.write(strings)
+                digests = array("Q", (self._digests.get(video_id, 0)
+                                      for video_id in self._video_ids))
+                digests.tofile(index_file)
+                array("I", map(len, postings)).tofile(index_file)
+                for posting in postings:
+                    posting.tofile(index_file)
+            os.replace(temporary_path, path)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(temporary_path)
+            raise
+
+    def update(self, videos, max_changes):
+        """Re-indexes only the videos that differ from the indexed ones.
+
+        Args:
+            videos: All the videos the index should hold.
+            max_changes: The most added, changed and removed videos to patch
+                in place. Past that a fresh index is smaller and as quick to
+                build, since every patched video leaves a stale ordinal.
+
+        Returns:
+            True if the index was patched, False if it was left untouched
+            because more than `max_changes` videos differ, or because the
+            stale ordinals would then outnumber the videos.
+        """
+        changed = []
+        current_ids = set()
+        for video in videos:
+            current_ids.add(video.video_id)
+            if self._digests.get(video.video_id) != _digest(video):
+                changed.append(video)
+                if len(changed) > max_changes:
+                    return False
+        removed = self._ordinals.keys() - current_ids
+        if len(changed) + len(removed) > max_changes:
+            return False
+        # Saved and patched again on every start, the stale ordinals would
+        # otherwise pile up for good.
+        if len(self._video_ids) + len(changed) > 2 * len(current_ids):
+            return False
+
+        for video_id in removed:
+            self.remove(video_id)
+        for video in changed:
+            self.add(video)
+        return True
+
+    def add(self, video):
+        """Indexes a video, replacing any indexed video with the same id."""
+        self.remove(video.video_id)
+        ordinal = len(self._video_ids)
+        self._video_ids.append(video.video_id)
+        self._ordinals[video.video_id] = ordinal
+        self._digests[video.video_id] = _digest(video)
+        for gram in _grams(video.title.lower()):
+            self._title_postings.setdefault(gram, array("I")).append(ordinal)
+        for tag in {tag.casefold() for tag in video.tags}:
+            self._tag_postings.setdefault(tag, array("I")).append(ordinal)
+
+    def remove(self, video_id):
+        """Removes a video from the index, if it is indexed."""
+        ordinal = self._ordinals.pop(video_id, None)
+        if ordinal is not None:
+            self._video_ids[ordinal] = None
+            del self._digests[video_id]
+            if len(self._video_ids) > 2 * len(self._ordinals):
+                self._compact()
+
+    def _compact(self):
+        """Hands out the ordinals again, dropping those of removed videos.
+
+        The indexed videos keep their order, so the postings stay sorted.
+        """
+        renumbered = {}
+        video_ids = []
+        for ordinal, video_id in enumerate(self._video_ids):
+            if video_id is not None:
+                renumbered[ordinal] = len(video_ids)
+                video_ids.append(video_id)
+        self._video_ids = video_ids
+        self._ordinals = {video_id: ordinal
+                          for ordinal, video_id in enumerate(video_ids)}
+        for postings in (self._title_postings, self._tag_postings):
+            for key, posting in list(postings.items()):
+                posting = array("I", (renumbered[ordinal]
+                                      for ordinal in posting
+                                      if ordinal in renumbered))
+                if posting:
+                    postings[key] = posting
+                else:
+                    del postings[key]
+
+    def _video_ids_for(self, ordinals):
+        video_ids = (self._video_ids[ordinal] for ordinal in ordinals)
+        return [video_id for video_id in video_ids if video_id is not None]
+
+    def title_candidates(self, search_term):
+        """Returns the ids of the videos whose titles may contain the term.
+
+        Every video whose lower-cased title contains the lower-cased term is
+        included, along with some that only share its n-grams, so callers
+        must check the titles of the candidates.
+
+        Args:
+            search_term: The query to be used in search.
+
+        Returns:
+            A list of video ids, or None if the term is shorter than
+            GRAM_SIZE and cannot be answered from the index.
+        """
+        grams = _grams(search_term.lower())
+        if not grams:
+            return None
+        postings = [self._title_postings.get(gram, ()) for gram in grams]
+        return self._video_ids_for(_intersect(postings))
+
+    def tag_video_ids(self, video_tag):
+        """Returns the ids of the videos with the given tag, ignoring case.
+
+        Args:
+            video_tag: The video tag to be used in search.
+        """
+        return self._video_ids_for(
+            self._tag_postings.get(video_tag.casefold(), ()))
+
+    def _evaluate(self, query):
+        kind, operand = query
+        if kind == "tag":
+            return self._tag_postings.get(operand.casefold(), array("I"))
+        if kind == "or":
+            return _union([self._evaluate(term) for term in operand])
+        if kind == "not":
+            return _subtract(range(len(self._video_ids)),
+                             self._evaluate(operand))
+
+        # Intersect the plain terms first, then drop the negated ones from
+        # the (usually much shorter) result instead of building complements.
+        included = [self._evaluate(term)
+                    for term in operand if term[0] != "not"]
+        excluded = [self._evaluate(term[1])
+                    for term in operand if term[0] == "not"]
+        matches = (_intersect(included) if included
+                   else range(len(self._video_ids)))
+        for posting in excluded:
+            matches = _subtract(matches, posting)
+        return matches
+
+    def tag_query_video_ids(self, query):
+        """Returns the ids of the videos matching a boolean tag query.
+
+        Args:
+            query: A query returned by tag_query.parse_tag_query. Tags are
+                matched ignoring case.
+        """
+        return self._video_ids_for(self._evaluate(query))
@@ -1,50 +1,182 @@
 """A video library class."""
 
-from .video import Video
+from .rw_lock import ReadWriteLock
+from .video_catalog import (catalog_rows, catalog_stamp, sort_key,
+                            video_from_row)
+from .video_index import VideoIndex
+from .tag_query import parse_tag_query
 from pathlib import Path
-import csv
+import bisect
 
+DEFAULT_VIDEO_FILE = Path(__file__).parent / "videos.txt"
 
-# Helper Wrapper around CSV reader to strip whitespace from around
-# each item.
-def _csv_reader_with_strip(reader):
-    yield from ((item.strip() for item in line) for line in reader)
+
+class ReadOnlyLibraryError(Exception):
+    """A class used to represent a change to a library that cannot be
+    changed.
+    """
+    pass
+
+
+# The video of an older library when its catalog row did not change, so it
+# keeps its flag and stays the object playlists hold. A changed video takes
+# over the flag of the one it replaces.
+def _carry_over(video, previous):
+    old = previous.get_video(video.video_id)
+    if old is None:
+        return video
+    if old.title == video.title and old.tags == video.tags:
+        return old
+    if old.flagged:
+        video.flagVideo(old.flagReason)
+    return video
 
 
 class VideoLibrary:
-    """A class used to represent a Video Library."""
+    """A class used to represent a Video Library.
+
+    A library can be shared by many threads. Searches hold its lock for
+    reading, so any number of them run at once, while add_video and
+    remove_video hold it for writing. The sorted video list is replaced
+    rather than changed in place, so a list already handed out stays a
+    consistent snapshot.
+    """
+
+    def __init__(self, video_file_path=None, search_index_path=None,
+                 previous=None):
+        """The VideoLibrary class is initialized.
+
+        Args:
+            video_file_path: The catalog to load, in the videos.txt format.
+                Defaults to the videos.txt shipped next to this module.
+            search_index_path: Where to save the search index between runs.
+                By default the index is rebuilt every time.
+            previous: A library loaded from an earlier version of the
+                catalog. Videos whose row did not change are taken from it,
+                flags included, instead of being made anew.
+        """
+        if video_file_path is None:
+            video_file_path = DEFAULT_VIDEO_FILE
 
-    def __init__(self):
-        """The VideoLibrary class is initialized."""
+        self._init_state(video_file_path, search_index_path)
         self._videos = {}
-        with open(Path(__file__).parent / "videos.txt") as video_file:
-            reader = _csv_reader_with_strip(
-                csv.reader(video_file, delimiter="|"))
-            for video_info in reader:
-                title, url, tags = video_info
-                self._videos[url] = Video(
-                    title,
-                    url,
-                    [tag.strip() for tag in tags.split(",")] if tags else [],
-                )
+        # The videos sorted by title and their sort keys, side by side.
+        # Replaced as a pair on every change, never modified.
+        self._sorted = None
+        with open(video_file_path) as video_file:
+            for row in catalog_rows(video_file):
+                video = video_from_row(row)
+                if previous is not None:
+                    video = _carry_over(video, previous)
+                self._videos[video.video_id] = video
+
+        self._video_index = self._open_search_index()
+
+    def _init_state(self, catalog_path, search_index_path):
+        """Sets up the state every library shares, however it holds its
+        videos: the lock, and the search index, opened on the first search
+        unless the subclass opens it sooner.
+
+        Args:
+            catalog_path: The file the videos are read from.
+            search_index_path: Where to save the search index, or None.
+        """
+        self._catalog_path = catalog_path
+        # Taken before reading, so a catalog rewritten meanwhile is not
+        # mistaken for the one the saved search index was built from.
+        self._catalog_stamp = catalog_stamp(catalog_path)
+        self._search_index_path = search_index_path
+        self._lock = ReadWriteLock()
+        self._video_index = None
+
+    def __len__(self):
+        """Returns the number of videos in the video library."""
+        return len(self._videos)
 
     def get_all_videos(self):
         """Returns all available video information from the video library."""
-        return list(self._videos.values())
+        with self._lock.read():
+            return list(self._videos.values())
 
     def get_sorted_videos(self):
-        listOfTitles = []
-        listOfSortedVideos = []
+        """Returns all videos sorted by title, ignoring case.
 
-        for video in self.get_all_videos():
-            listOfTitles.append(video.title)
+        Videos sharing a title are ordered by video id. The list is built once
+        and replaced by add_video and remove_video, so callers must treat it
+        as read-only, and it does not change while they use it.
+        """
+        return self._sorted_snapshot()[0]
+
+    def _sorted_snapshot(self):
+        snapshot = self._sorted
+        if snapshot is None:
+            with self._lock.write():
+                if self._sorted is None:
+                    videos = sorted(self._videos.values(), key=sort_key)
+                    self._sorted = (
+                        videos, [sort_key(video) for video in videos])
+                snapshot = self._sorted
+        return snapshot
+
+    def iter_sorted_videos(self, after=None):
+        """Yields the videos in the order of get_sorted_videos.
+
+        Finding where to start takes a binary search, so a page from the
+        middle of the catalog costs as much as one from the start.
+
+        Args:
+            after: The (title, video_id) of the last video already seen.
+                Iteration starts right after it, whether or not that video is
+                still in the library. None starts at the first video.
+        """
+        videos, keys = self._sorted_snapshot()
+        start = 0
+        if after is not None:
+            title, video_id = after
+            start = bisect.bisect_right(keys, (title.lower(), video_id))
+        for position in range(start, len(videos)):
+            yield videos[position]
 
-        for word in sorted(listOfTitles, key=str.lower):
-            for video in self.get_all_videos():
-                if word == video.title:
-                    listOfSortedVideos.append(video)
+    def add_video(self, video):
+        """Adds a video to the library, replacing any video with the same id.
 
-        return listOfSortedVideos
+        Args:
+            video: The Video object to add.
+        """
+        with self._lock.write():
+            self._remove_video(video.video_id)
+            self._videos[video.video_id] = video
+            if self._video_index is not None:
+                self._video_index.add(video)
+            if self._sorted is not None:
+                videos, keys = self._sorted
+                key = sort_key(video)
+                position = bisect.bisect_left(keys, key)
+                self._sorted = (videos[:position] + [video] + videos[position:],
+                                keys[:position] + [key] + keys[position:])
+
+    def remove_video(self, video_id):
+        """Removes a video from the library.
+
+        Args:
+            video_id: The video url.
+
+        Returns:
+            The removed Video object. None if the video does not exist.
+        """
+        with self._lock.write():
+            return self._remove_video(video_id)
+
+    def _remove_video(self, video_id):
+        video = self._videos.pop(video_id, None)
+        if video is not None and self._video_index is not None:
+            self._video_index.remove(video_id)
+        if video is not None and self._sorted is not None:
+            videos, keys = self._sorted
+            position = bisect.bisect_left(keys, sort_key(video))
+            self._sorted = (videos[:position] + videos[position + 1:],
+                            keys[:position] + keys[position + 1:])
+        return video
 
     def get_video(self, video_id):
         """Returns the video object (title, url, tags) from the video library.
@@ -56,4 +188,93 @@ class VideoLibrary:
             The Video object for the requested video_id. None if the video
             does not exist.
         """
+        # A single dict lookup, safe without the lock.
         return self._videos.get(video_id, None)
+
+    def _open_search_index(self):
+        """Builds the search index, starting from the saved one if any.
+
+        A saved index is used as is while the catalog is unchanged, and
+        patched when less than a tenth of the videos differ.
+        """
+        videos = self.get_sorted_videos()
+        if self._search_index_path is None:
+            return VideoIndex.build(videos)
+
+        index, unchanged = VideoIndex.load(
+            self._search_index_path, self._catalog_stamp)
+        if unchanged:
+            return index
+        if index is None or not index.update(videos, len(videos) // 10):
+            index = VideoIndex.build(videos)
+        try:
+            index.save(self._search_index_path, self._catalog_stamp)
+        except OSError:
+            # Not being able to save only costs the next start a rebuild.
+            pass
+        return index
+
+    def _search_index(self):
+        index = self._video_index
+        if index is None:
+            with self._lock.write():
+                if self._video_index is None:
+                    self._video_index = self._open_search_index()
+                index = self._video_index
+        return index
+
+    def _videos_by_id(self, video_ids):
+        """Yields the videos with the given ids, skipping any the library
+        does not have, should the search index not match the catalog.
+        """
+        for video_id in video_ids:
+            video = self.get_video(video_id)
+            if video is not None:
+                yield video
+
+    def search_videos(self, search_term):
+        """Returns the videos whose titles contain the search term.
+
+        The search ignores case and the videos are sorted by title.
+
+        Args:
+            search_term: The query to be used in search.
+        """
+        term = search_term.lower()
+        index = self._search_index()
+        with self._lock.read():
+            video_ids = index.title_candidates(search_term)
+            if video_ids is None:
+                return [video for video in self.get_sorted_videos()
+                        if term in video.title.lower()]
+
+            videos = self._videos_by_id(video_ids)
+            return sorted(
+                (video for video in videos if term in video.title.lower()),
+                key=sort_key)
+
+    def search_videos_with_tag(self, video_tag):
+        """Returns the videos with the given tag, sorted by title.
+
+        Args:
+            video_tag: The video tag to be used in search, ignoring case.
+        """
+        index = self._search_index()
+        with self._lock.read():
+            video_ids = index.tag_video_ids(video_tag)
+            return sorted(self._videos_by_id(video_ids), key=sort_key)
+
+    def search_videos_with_tag_query(self, tag_query):
+        """Returns the videos matching a boolean tag query, sorted by title.
+
+        Args:
+            tag_query: The query, e.g. "#cat AND #animal AND NOT #dog".
+
+        Raises:
+            TagQueryError: If the query cannot be parsed.
+        """
+        query = parse_tag_query(tag_query)
+        index = self._search_index()
+        with self._lock.read():
+            video_ids = index.tag_query_video_ids(query)
+            return sorted(self._videos_by_id(video_ids), key=sort_key)
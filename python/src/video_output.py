@@ -0,0 +1,131 @@
+"""Output sinks the video player writes its messages to."""
+
+from collections import deque
+import sys
+
+
+class StdoutSink:
+    """Prints every line to the current sys.stdout straight away."""
+
+    def write(self, line):
+        print(line)
+
+    def flush(self):
+        sys.stdout.flush()
+
+
+class StreamSink:
+    """Writes lines to a text stream in chunks of at least `buffer_size`
+    characters, so long listings do not cost one write per line.
+    """
+
+    def __init__(self, stream, buffer_size=1 << 16):
+        self._stream = stream
+        self._buffer_size = buffer_size
+        self._buffer = []
+        self._buffered = 0
+
+    def write(self, line):
+        self._buffer.append(line)
+        self._buffered += len(line) + 1
+        if self._buffered >= self._buffer_size:
+            self._write_buffer()
+
+    def _write_buffer(self):
+        if self._buffer:
+            self._buffer.append("")
+            self._stream.write("\n".join(self._buffer))
+            self._buffer.clear()
+            self._buffered = 0
+
+    def flush(self):
+        self._write_buffer()
+        self._stream.flush()
+
+
+class ListSink:
+    """Collects the lines in a list, for callers that embed the player."""
+
+    def __init__(self):
+        self.lines = []
+
+    def write(self, line):
+        self.lines.append(line)
+
+    def flush(self):
+        pass
+
+
+class CallbackSink:
+    """Passes every line to a callback as soon as it is written."""
+
+    def __init__(self, callback):
+        self._callback = callback
+
+    def write(self, line):
+        self._callback(line)
+
+    def flush(self):
+        pass
+
+
+class DeferredSink:
+    """Holds the lines written to it until they are taken. A player writing
+    to a DeferredSink hands over its results unrendered, and they are only
+    rendered as they are taken, so a caller can send a long listing a piece
+    at a time without ever holding all of its text.
+    """
+
+    def __init__(self):
+        # Iterators over the lines not taken yet, in the order written.
+        self._pending = deque()
+
+    def write(self, line):
+        self._pending.append(iter((line,)))
+
+    def write_lines(self, lines):
+        """Holds the lines of an iterable, without consuming it yet."""
+        self._pending.append(iter(lines))
+
+    def flush(self):
+        pass
+
+    @property
+    def pending(self):
+        """Returns whether lines may be waiting to be taken."""
+        return bool(self._pending)
+
+    def take(self, size):
+        """Takes the lines waiting, up to the first that brings their length
+        to `size` characters.
+
+        Returns:
+            The lines taken, each followed by a newline. An empty string if
+            none were waiting.
+        """
+        lines = []
+        length = 0
+        while self._pending and length < size:
+            for line in self._pending[0]:
+                lines.append(line)
+                length += len(line) + 1
+                if length >= size:
+                    break
+            else:
+                self._pending.popleft()
+        if not lines:
+            return ""
+        lines.append("")
+        return "\n".join(lines)
+
+
+class NullSink:
+    """Discards everything. A player writing to a NullSink does not even
+    render its results, for callers that only use the returned results.
+    """
+
+    def write(self, line):
+        pass
+
+    def flush(self):
+        pass
@@ -1,35 +1,158 @@
 """A video player class."""
 
-from .video_playlist import Playlist
+from .video_playlist import PlaylistRegistry
 from .video_library import VideoLibrary
+from .tag_query import TagQueryError
+from .page_token import PageTokenError, decode_page_token, encode_page_token
+from .video_output import DeferredSink, NullSink, StdoutSink
+from .video_result import Action, ErrorCode, Rejection, Result
+from .result_renderer import render
 from random import randint
+import itertools
+
+
+def _page_size(page_size):
+    """Returns a page size given as a command argument.
+
+    Raises:
+        ValueError: If it is not a positive number.
+    """
+    page_size = int(page_size)
+    if page_size < 1:
+        raise ValueError(page_size)
+    return page_size
 
 
 class VideoPlayer:
-    """A class used to represent a Video Player."""
+    """A class used to represent a Video Player.
 
-    def __init__(self):
-        self._video_library = VideoLibrary()
-        self.calledFromFlagged = False
-        self.currentlyPlaying = ""
-        self.currentlyPaused = ""
-        self.playListNames = []
-        self.playLists = []
+    Every command returns a Result describing what happened, and writes the
+    rendered text of that result to the output sink.
+    """
 
-        self.videos = self._video_library.get_sorted_videos()
+    def __init__(self, video_library=None, output=None, journal=None,
+                 playlists=None):
+        """The VideoPlayer class is initialized.
+
+        Args:
+            video_library: The library to play from. Defaults to a
+                VideoLibrary of the videos.txt shipped with the player.
+            output: The sink every message is written to, see video_output.
+                Defaults to printing to stdout. With a NullSink the results
+                are not rendered at all, and with a DeferredSink they are
+                rendered as the sink's lines are taken.
+            journal: A PlayerJournal to restore the playlists and flags from
+                and to record their changes to. By default they are lost
+                when the player goes away.
+            playlists: Where to keep the playlists, a PlaylistRegistry or an
+                object with the same methods. Defaults to a new, empty
+                PlaylistRegistry.
+        """
+        if video_library is None:
+            video_library = VideoLibrary()
+        if output is None:
+            output = StdoutSink()
+        self._video_library = video_library
+        self._output = output
+        self._render = not isinstance(output, NullSink)
+        self._defer_render = isinstance(output, DeferredSink)
+        self.calledFromFlagged = False
+        self.currentlyPlaying = None
+        self.currentlyPaused = None
+        if playlists is None:
+            playlists = PlaylistRegistry()
+        self.playLists = playlists
+        self._journal = journal
+        # The videos of the last search, until the user says which to play.
+        self.pendingSelection = None
+        if journal is not None:
+            self._restore(*journal.recover())
+
+    def _restore(self, playlists, flags):
+        """Restores the playlists and flags recovered from the journal.
+
+        Videos no longer in the library are left out.
+        """
+        for video_id, reason in flags.items():
+            video = self._video_library.get_video(video_id)
+            if video is not None:
+                video.flagVideo(reason)
+        for name, video_ids in playlists:
+            videos = (self._video_library.get_video(video_id)
+                      for video_id in video_ids)
+            self.playLists.create(name).addManyToPlaylist(
+                video for video in videos if video is not None)
+
+    def _record(self, change, *arguments):
+        if self._journal is not None:
+            self._journal.record(change, *arguments)
+
+    @property
+    def output(self):
+        """Returns the sink the player writes its messages to."""
+        return self._output
+
+    @property
+    def videos(self):
+        """Returns the videos of the library sorted by title."""
+        return self._video_library.get_sorted_videos()
+
+    def _emit(self, result):
+        if self._defer_render:
+            self._output.write_lines(render(result))
+        elif self._render:
+            for line in render(result):
+                self._output.write(line)
+        return result
+
+    @staticmethod
+    def _page(videos, page_size):
+        """Takes a page off an iterator of videos, or of other entries.
+
+        Returns:
+            The entries of the page, and whether more entries follow it.
+        """
+        page = list(itertools.islice(videos, page_size + 1))
+        return page[:page_size], len(page) > page_size
 
     def number_of_videos(self):
         '''Returns the number of videos.'''
+        return self._emit(Result(Action.NUMBER_OF_VIDEOS,
+                                 count=len(self._video_library)))
 
-        num_videos = len(self.videos)
-        print(f"{num_videos} videos in the library")
-
-    def show_all_videos(self):
-        """Returns all videos."""
+    def show_all_videos(self, page_size=None, page_token=None):
+        """Returns all videos, or one page of them.
 
-        print("Here's a list of all available videos:")
-        for video in self.videos:
-            print(video)
+        Args:
+            page_size: The number of videos to show. By default all of them.
+            page_token: The token given with the previous page, to show the
+                videos following it.
+        """
+        if page_size is None:
+            return self._emit(
+                Result(Action.SHOW_ALL_VIDEOS, videos=self.videos))
+
+        try:
+            page_size = _page_size(page_size)
+        except ValueError:
+            return self._emit(Result(Action.SHOW_ALL_VIDEOS,
+                                     ErrorCode.INVALID_PAGE_SIZE))
+        try:
+            after = None
+            if page_token is not None:
+                after = decode_page_token(page_token, 2)
+        except PageTokenError:
+            return self._emit(Result(Action.SHOW_ALL_VIDEOS,
+                                     ErrorCode.INVALID_PAGE_TOKEN))
+
+        videos, more = self._page(
+            self._video_library.iter_sorted_videos(after), page_size)
+        next_page = None
+        if more:
+            next_page = encode_page_token(videos[-1].title,
+                                          videos[-1].video_id)
+        return self._emit(Result(Action.SHOW_ALL_VIDEOS, videos=videos,
+                                 page_size=page_size, next_page=next_page))
 
     def play_video(self, video_id):
         """Plays the respective video.
@@ -37,42 +160,38 @@ class VideoPlayer:
         Args:
             video_id: The video_id to be played.
         """
+        video = self._video_library.get_video(video_id)
+        if video is None:
+            return self._emit(
+                Result(Action.PLAY, ErrorCode.VIDEO_NOT_FOUND))
+
+        if video.flagged:
+            return self._emit(
+                Result(Action.PLAY, ErrorCode.VIDEO_FLAGGED, video=video))
+
+        stopped = [current for current in (self.currentlyPlaying,
+                                           self.currentlyPaused)
+                   if current is not None]
+        self.currentlyPlaying = video
+        return self._emit(Result(Action.PLAY, video=video, stopped=stopped))
+
+    def _stop(self):
+        if self.currentlyPlaying is not None:
+            video, self.currentlyPlaying = self.currentlyPlaying, None
+            return Result(Action.STOP, video=video)
+
+        if self.currentlyPaused is not None:
+            video, self.currentlyPaused = self.currentlyPaused, None
+            return Result(Action.STOP, video=video)
 
-        for video in self.videos:
-            if (video.video_id == video_id):
-                if video.flagged:
-                    print(
-                        f"Cannot play video: Video is currently flagged (reason: {video.flagReason})")
-                    return
-
-                if self.currentlyPlaying != "":
-                    print(f"Stopping video: {self.currentlyPlaying}")
-
-                if self.currentlyPaused != "":
-                    print(f"Stopping video: {self.currentlyPaused}")
-
-                print(f"Playing video: {video.title}")
-                self.currentlyPlaying = video.title
-                return
-
-        print("Cannot play video: Video does not exist")
+        if (self.calledFromFlagged):
+            self.calledFromFlagged = False
+            return Result(Action.STOP)
+        return Result(Action.STOP, ErrorCode.NOTHING_PLAYING)
 
     def stop_video(self):
         """Stops the current video."""
-        if self.currentlyPlaying != "":
-            print(f"Stopping video: {self.currentlyPlaying}")
-            self.currentlyPlaying = ""
-            return
-
-        if self.currentlyPaused != "":
-            print(f"Stopping video: {self.currentlyPaused}")
-            self.currentlyPaused = ""
-            return
-
-        if (self.calledFromFlagged):
-            self.calledFromFlagged = False
-        else:
-            print("Cannot stop video: No video is currently playing")
+        return self._emit(self._stop())
 
     def play_random_video(self):
         """Plays a random video from the video library."""
@@ -83,65 +202,63 @@ class VideoPlayer:
                 listOfAvailableVideos.append(video)
 
         if listOfAvailableVideos == []:
-            print("No videos available")
-            return
+            return self._emit(
+                Result(Action.PLAY_RANDOM, ErrorCode.NO_VIDEOS_AVAILABLE))
 
         randomNumber = randint(
             0, (len(listOfAvailableVideos) - 1))
-        randomVideo = listOfAvailableVideos[randomNumber].title
+        randomVideo = listOfAvailableVideos[randomNumber]
 
-        if self.currentlyPlaying != "":
-            print(f"Stopping video: {self.currentlyPlaying}")
+        stopped = []
+        if self.currentlyPlaying is not None:
+            stopped.append(self.currentlyPlaying)
 
         self.currentlyPlaying = randomVideo
-        print(f"Playing video: {randomVideo}")
+        return self._emit(
+            Result(Action.PLAY_RANDOM, video=randomVideo, stopped=stopped))
 
     def pause_video(self):
         """Pauses the current video."""
 
-        if self.currentlyPaused != "":
-            print(f"Video already paused: {self.currentlyPaused}")
-            return
+        if self.currentlyPaused is not None:
+            return self._emit(Result(Action.PAUSE, ErrorCode.ALREADY_PAUSED,
+                                     video=self.currentlyPaused))
 
-        if self.currentlyPlaying != "":
+        if self.currentlyPlaying is not None:
             self.currentlyPaused = self.currentlyPlaying
-            self.currentlyPlaying = ""
-
-            print(f"Pausing video: {self.currentlyPaused}")
-            return
+            self.currentlyPlaying = None
+            return self._emit(
+                Result(Action.PAUSE, video=self.currentlyPaused))
 
-        print("Cannot pause video: No video is currently playing")
+        return self._emit(Result(Action.PAUSE, ErrorCode.NOTHING_PLAYING))
 
     def continue_video(self):
         """Resumes playing the current video."""
-        if self.currentlyPlaying != "":
-            print("Cannot continue video: Video is not paused")
-            return
+        if self.currentlyPlaying is not None:
+            return self._emit(Result(Action.CONTINUE, ErrorCode.NOT_PAUSED,
+                                     video=self.currentlyPlaying))
 
-        if self.currentlyPaused != "":
-            print(f"Continuing video: {self.currentlyPaused}")
+        if self.currentlyPaused is not None:
             self.currentlyPlaying = self.currentlyPaused
-            self.currentlyPaused = ""
-            return
+            self.currentlyPaused = None
+            return self._emit(
+                Result(Action.CONTINUE, video=self.currentlyPlaying))
 
-        print("Cannot continue video: No video is currently playing")
+        return self._emit(Result(Action.CONTINUE, ErrorCode.NOTHING_PLAYING))
 
     def show_playing(self):
         """Displays video currently playing."""
 
-        if (self.currentlyPaused != "") or (self.currentlyPlaying != ""):
-            for video in self.videos:
-                if (video.title == self.currentlyPlaying) or (video.title == self.currentlyPaused):
-                    if self.currentlyPlaying != "":
-                        print(
-                            f"Currently playing: {video}")
-                        return
-                    if self.currentlyPaused != "":
-                        print(
-                            f"Currently playing: {video} - PAUSED")
-                        return
+        if self.currentlyPlaying is not None:
+            return self._emit(
+                Result(Action.SHOW_PLAYING, video=self.currentlyPlaying))
 
-        print("No video is currently playing")
+        if self.currentlyPaused is not None:
+            return self._emit(Result(Action.SHOW_PLAYING,
+                                     video=self.currentlyPaused, paused=True))
+
+        return self._emit(
+            Result(Action.SHOW_PLAYING, ErrorCode.NOTHING_PLAYING))
 
     def create_playlist(self, playlist_name):
         """Creates a playlist with a given name.
@@ -149,17 +266,14 @@ class VideoPlayer:
         Args:
             playlist_name: The playlist name.
         """
-        modified_playlist_name = playlist_name.lower()
-        for playList in self.playLists:
-            if playList.title == modified_playlist_name:
-                print(
-                    "Cannot create playlist: A playlist with the same name already exists")
-                return
-
-        self.playLists.append(Playlist(modified_playlist_name))
-        self.playListNames.append(playlist_name)
+        if self.playLists.create(playlist_name) is None:
+            return self._emit(Result(Action.CREATE_PLAYLIST,
+                                     ErrorCode.PLAYLIST_EXISTS,
+                                     playlist=playlist_name))
 
-        print(f"Successfully created new playlist: {playlist_name}")
+        self._record("create", playlist_name)
+        return self._emit(
+            Result(Action.CREATE_PLAYLIST, playlist=playlist_name))
 
     def add_to_playlist(self, playlist_name, video_id):
         """Adds a video to a playlist with a given name.
@@ -168,69 +282,139 @@ class VideoPlayer:
             playlist_name: The playlist name.
             video_id: The video_id to be added.
         """
-        modified_playlist_name = playlist_name.lower()
-
-        for playList in self.playLists:
-            if playList.title == modified_playlist_name:
-                for video in playList.getPlayList():
-                    if video.video_id == video_id:
-                        if video.flagged:
-                            print(
-                                f"Cannot add video to {playlist_name}: Video is currently flagged (reason: {video.flagReason})")
-                            return
-
-                        print(
-                            f"Cannot add video to {playlist_name}: Video already added")
-                        return
-
-                for video in self.videos:
-                    if video.video_id == video_id:
-                        if video.flagged:
-                            print(
-                                f"Cannot add video to {playlist_name}: Video is currently flagged (reason: {video.flagReason})")
-                            return
-
-                        playList.addToPlaylist(video)
-                        print(f"Added video to {playlist_name}: {video.title}")
-                        return
-
-                print(
-                    f"Cannot add video to {playlist_name}: Video does not exist")
-                return
-
-        print(f"Cannot add video to {playlist_name}: Playlist does not exist")
+        playList = self.playLists.get(playlist_name)
+        if playList is None:
+            return self._emit(Result(Action.ADD_TO_PLAYLIST,
+                                     ErrorCode.PLAYLIST_NOT_FOUND,
+                                     playlist=playlist_name))
+
+        video = playList.get(video_id)
+        if video is not None:
+            error = (ErrorCode.VIDEO_FLAGGED if video.flagged
+                     else ErrorCode.VIDEO_ALREADY_IN_PLAYLIST)
+            return self._emit(Result(Action.ADD_TO_PLAYLIST, error,
+                                     video=video, playlist=playlist_name))
+
+        video = self._video_library.get_video(video_id)
+        if video is None:
+            return self._emit(Result(Action.ADD_TO_PLAYLIST,
+                                     ErrorCode.VIDEO_NOT_FOUND,
+                                     playlist=playlist_name))
+
+        if video.flagged:
+            return self._emit(Result(Action.ADD_TO_PLAYLIST,
+                                     ErrorCode.VIDEO_FLAGGED,
+                                     video=video, playlist=playlist_name))
+
+        playList.addToPlaylist(video)
+        self._record("add", playlist_name, [video_id])
+        return self._emit(Result(Action.ADD_TO_PLAYLIST,
+                                 video=video, playlist=playlist_name))
+
+    def add_many_to_playlist(self, playlist_name, *video_ids):
+        """Adds videos to a playlist with a given name, all or none.
+
+        Every id is checked first, as add_to_playlist would check it. If any
+        cannot be added, or is given twice, the playlist is left unchanged.
+
+        Args:
+            playlist_name: The playlist name.
+            video_ids: The video_ids to be added, in order.
+        """
+        playList = self.playLists.get(playlist_name)
+        if playList is None:
+            return self._emit(Result(Action.ADD_MANY_TO_PLAYLIST,
+                                     ErrorCode.PLAYLIST_NOT_FOUND,
+                                     playlist=playlist_name))
+
+        videos = []
+        rejected = []
+        seen = set()
+        for video_id in video_ids:
+            video = playList.get(video_id)
+            if video is not None:
+                error = (ErrorCode.VIDEO_FLAGGED if video.flagged
+                         else ErrorCode.VIDEO_ALREADY_IN_PLAYLIST)
+            elif video_id in seen:
+                error = ErrorCode.VIDEO_LISTED_TWICE
+            else:
+                video = self._video_library.get_video(video_id)
+                if video is None:
+                    error = ErrorCode.VIDEO_NOT_FOUND
+                elif video.flagged:
+                    error = ErrorCode.VIDEO_FLAGGED
+                else:
+                    seen.add(video_id)
+                    videos.append(video)
+                    continue
+            rejected.append(Rejection(video_id, error, video))
+
+        if rejected:
+            return self._emit(Result(Action.ADD_MANY_TO_PLAYLIST,
+                                     ErrorCode.VIDEOS_REJECTED,
+                                     playlist=playlist_name,
+                                     rejected=rejected, count=len(video_ids)))
+
+        playList.addManyToPlaylist(videos)
+        self._record("add", playlist_name, list(video_ids))
+        return self._emit(Result(Action.ADD_MANY_TO_PLAYLIST,
+                                 playlist=playlist_name, videos=videos,
+                                 count=len(video_ids)))
 
     def show_all_playlists(self):
         """Display all playlists."""
-        if self.playListNames == []:
-            print("No playlists exist yet")
-            return
-
-        print("Showing all playlists: ")
-        for playList in sorted(self.playListNames, key=str.lower):
-            print(playList)
+        return self._emit(Result(
+            Action.SHOW_ALL_PLAYLISTS,
+            playlists=self.playLists.names()))
 
-    def show_playlist(self, playlist_name):
-        """Display all videos in a playlist with a given name.
+    def show_playlist(self, playlist_name, page_size=None, page_token=None):
+        """Display all videos in a playlist with a given name, or one page.
 
         Args:
             playlist_name: The playlist name.
+            page_size: The number of videos to show. By default all of them.
+            page_token: The token given with the previous page, to show the
+                videos following it.
         """
-        modified_playlist_name = playlist_name.lower()
-        for playList in self.playLists:
-            if modified_playlist_name == playList.title:
-                if playList.getPlayList() == []:
-                    print(f"Showing playlist: {playlist_name}")
-                    print(" No videos here yet")
-                    return
-
-                print(f"Showing playlist: {playlist_name}")
-                for video in playList.getPlayList():
-                    print(
-                        f"  {video}")
-                return
-
-        print(f"Cannot show playlist {playlist_name}: Playlist does not exist")
+        playList = self.playLists.get(playlist_name)
+        if playList is None:
+            return self._emit(Result(Action.SHOW_PLAYLIST,
+                                     ErrorCode.PLAYLIST_NOT_FOUND,
+                                     playlist=playlist_name))
+
+        if page_size is None:
+            return self._emit(Result(Action.SHOW_PLAYLIST,
+                                     playlist=playlist_name,
+                                     videos=list(playList.getPlayList())))
+
+        try:
+            page_size = _page_size(page_size)
+        except ValueError:
+            return self._emit(Result(Action.SHOW_PLAYLIST,
+                                     ErrorCode.INVALID_PAGE_SIZE,
+                                     playlist=playlist_name))
+        try:
+            after = None
+            if page_token is not None:
+                after, = decode_page_token(page_token, 1)
+                after = int(after)
+                if after < 0:
+                    raise ValueError(after)
+        except (PageTokenError, ValueError):
+            return self._emit(Result(Action.SHOW_PLAYLIST,
+                                     ErrorCode.INVALID_PAGE_TOKEN,
+                                     playlist=playlist_name))
+
+        # Tokens carry the sequence number of the last video shown, so the
+        # next page starts there, even if videos were added or removed.
+        entries, more = self._page(playList.iter_after(after), page_size)
+        videos = [video for _, video in entries]
+        next_page = None
+        if more:
+            next_page = encode_page_token(str(entries[-1][0]))
+        return self._emit(Result(Action.SHOW_PLAYLIST, playlist=playlist_name,
+                                 videos=videos, page_size=page_size,
+                                 next_page=next_page))
 
     def remove_from_playlist(self, playlist_name, video_id):
         """Removes a video to a playlist with a given name.
@@ -239,49 +423,89 @@ class VideoPlayer:
             playlist_name: The playlist name.
             video_id: The video_id to be removed.
         """
-        videoExists = False
-        modified_playlist_name = playlist_name.lower()
+        if self._video_library.get_video(video_id) is None:
+            return self._emit(Result(Action.REMOVE_FROM_PLAYLIST,
+                                     ErrorCode.VIDEO_NOT_FOUND,
+                                     playlist=playlist_name))
+
+        playList = self.playLists.get(playlist_name)
+        if playList is None:
+            return self._emit(Result(Action.REMOVE_FROM_PLAYLIST,
+                                     ErrorCode.PLAYLIST_NOT_FOUND,
+                                     playlist=playlist_name))
+
+        video = playList.get(video_id)
+        if video is None:
+            return self._emit(Result(Action.REMOVE_FROM_PLAYLIST,
+                                     ErrorCode.VIDEO_NOT_IN_PLAYLIST,
+                                     playlist=playlist_name))
+
+        playList.removeFromPlaylist(video)
+        self._record("remove", playlist_name, [video_id])
+        return self._emit(Result(Action.REMOVE_FROM_PLAYLIST,
+                                 video=video, playlist=playlist_name))
+
+    def remove_many_from_playlist(self, playlist_name, *video_ids):
+        """Removes videos from a playlist with a given name, all or none.
+
+        Every id is checked first, as remove_from_playlist would check it.
+        If any cannot be removed, or is given twice, the playlist is left
+        unchanged.
 
-        for video in self.videos:
-            if video.video_id == video_id:
-                videoExists = True
-
-        if videoExists == False:
-            print(
-                f"Cannot remove video from {playlist_name}: Video does not exist")
-            return
-
-        for playList in self.playLists:
-            if playList.title == modified_playlist_name:
-                for video in playList.getPlayList():
-                    if video.video_id == video_id:
-                        print(
-                            f"Removed video from {playlist_name}: {video.title}")
-                        playList.removeFromPlaylist(video)
-                        return
-
-                print(
-                    f"Cannot remove video from {playlist_name}: Video is not in playlist")
-                return
-
-        print(
-            f"Cannot remove video from {playlist_name}: Playlist does not exist")
+        Args:
+            playlist_name: The playlist name.
+            video_ids: The video_ids to be removed.
+        """
+        playList = self.playLists.get(playlist_name)
+        if playList is None:
+            return self._emit(Result(Action.REMOVE_MANY_FROM_PLAYLIST,
+                                     ErrorCode.PLAYLIST_NOT_FOUND,
+                                     playlist=playlist_name))
+
+        videos = []
+        rejected = []
+        seen = set()
+        for video_id in video_ids:
+            video = playList.get(video_id)
+            if video_id in seen:
+                error = ErrorCode.VIDEO_LISTED_TWICE
+            elif video is not None:
+                seen.add(video_id)
+                videos.append(video)
+                continue
+            elif self._video_library.get_video(video_id) is None:
+                error = ErrorCode.VIDEO_NOT_FOUND
+            else:
+                error = ErrorCode.VIDEO_NOT_IN_PLAYLIST
+            rejected.append(Rejection(video_id, error, video))
+
+        if rejected:
+            return self._emit(Result(Action.REMOVE_MANY_FROM_PLAYLIST,
+                                     ErrorCode.VIDEOS_REJECTED,
+                                     playlist=playlist_name,
+                                     rejected=rejected, count=len(video_ids)))
+
+        playList.removeManyFromPlaylist(videos)
+        self._record("remove", playlist_name, list(video_ids))
+        return self._emit(Result(Action.REMOVE_MANY_FROM_PLAYLIST,
+                                 playlist=playlist_name, videos=videos,
+                                 count=len(video_ids)))
 
     def clear_playlist(self, playlist_name):
         """Removes all videos from a playlist with a given name.
         Args:
             playlist_name: The playlist name.
         """
-        modified_playlist_name = playlist_name.lower()
+        playList = self.playLists.get(playlist_name)
+        if playList is None:
+            return self._emit(Result(Action.CLEAR_PLAYLIST,
+                                     ErrorCode.PLAYLIST_NOT_FOUND,
+                                     playlist=playlist_name))
 
-        for playList in self.playLists:
-            if playList.title == modified_playlist_name:
-                print(f"Successfully removed all videos from {playlist_name}")
-                playList.clearPlaylist()
-                return
-
-        print(
-            f"Cannot clear playlist {playlist_name}: Playlist does not exist")
+        playList.clearPlaylist()
+        self._record("clear", playlist_name)
+        return self._emit(
+            Result(Action.CLEAR_PLAYLIST, playlist=playlist_name))
 
     def delete_playlist(self, playlist_name):
         """Deletes a playlist with a given name.
@@ -289,16 +513,48 @@ class VideoPlayer:
         Args:
             playlist_name: The playlist name.
         """
-        modified_playlist_name = playlist_name.lower()
+        if self.playLists.remove(playlist_name) is None:
+            return self._emit(Result(Action.DELETE_PLAYLIST,
+                                     ErrorCode.PLAYLIST_NOT_FOUND,
+                                     playlist=playlist_name))
+
+        self._record("delete", playlist_name)
+        return self._emit(
+            Result(Action.DELETE_PLAYLIST, playlist=playlist_name))
 
-        for playList in self.playLists:
-            if playList.title == modified_playlist_name:
-                print(f"Deleted playlist: {playlist_name}")
-                self.playLists.remove(playList)
-                return
+    def _ask_to_play(self, result):
+        """Shows search results and asks the user which one to play.
 
-        print(
-            f"Cannot delete playlist {playlist_name}: Playlist does not exist")
+        The search does not wait for the answer: the results are kept until
+        select_search_result receives it.
+
+        Returns:
+            The search result.
+        """
+        self._emit(result)
+        self.pendingSelection = list(result.videos) or None
+        return result
+
+    def select_search_result(self, answer):
+        """Plays the video picked from the results of the last search.
+
+        Args:
+            answer: The number of the video in the search results. Anything
+                else is taken as a no.
+
+        Returns:
+            The result. Its `video` is the video played, None if the answer
+            was a no.
+        """
+        videos, self.pendingSelection = self.pendingSelection, None
+        try:
+            option = int(answer)
+        except ValueError:
+            option = None
+        video = None
+        if videos and option is not None and 1 <= option <= len(videos):
+            video = videos[option - 1]
+        return self._emit(Result(Action.PLAY_SEARCH_RESULT, video=video))
 
     def search_videos(self, search_term):
         """Display all the videos whose titles contain the search_term.
@@ -306,38 +562,11 @@ class VideoPlayer:
         Args:
             search_term: The query to be used in search.
         """
-        index = 1
-        listOfMatchesVideos = []
-
-        for video in self.videos:
-            if ((search_term.lower()) in (video.title.lower())):
-                if (video.flagged):
-                    continue
-
-                if index == 1:
-                    print(f"Here are the results for {search_term}:")
-                print(f"  {index}) {video}")
-                listOfMatchesVideos.append(video)
-                index += 1
-
-        if listOfMatchesVideos != []:
-            print(
-                "Would you like to play any of the above? If yes, specify the number of the video.")
-            print("If your answer is not a valid number, we will assume it's a no.")
-            option = input()
-            try:
-                option = int(option)
-                if option <= len(listOfMatchesVideos):
-                    video = listOfMatchesVideos[option - 1]
-                    print(
-                        f"Playing video: {video.title}")
-                    return
-                else:
-                    raise ValueError
-            except ValueError:
-                return
-
-        print(f"No search results for {search_term}")
+        videos = [video
+                  for video in self._video_library.search_videos(search_term)
+                  if not video.flagged]
+        return self._ask_to_play(Result(Action.SEARCH_VIDEOS,
+                                        videos=videos, query=search_term))
 
     def search_videos_tag(self, video_tag):
         """Display all videos whose tags contains the provided tag.
@@ -345,43 +574,29 @@ class VideoPlayer:
         Args:
             video_tag: The video tag to be used in search.
         """
-        index = 1
-        listOfMatchesVideos = []
+        videos = [video for video
+                  in self._video_library.search_videos_with_tag(video_tag)
+                  if not video.flagged]
+        return self._ask_to_play(Result(Action.SEARCH_VIDEOS_WITH_TAG,
+                                        videos=videos, query=video_tag))
 
-        for video in self.videos:
-            listOfLowerTags = []
-            for tag in video.tags:
-                listOfLowerTags.append(tag.lower())
-
-            if video_tag.lower() in listOfLowerTags:
-                if (video.flagged):
-                    continue
+    def search_videos_with_tags(self, tag_query):
+        """Display all videos, flagged ones included, matching a tag query.
 
-                if index == 1:
-                    print(f"Here are the results for {video_tag}:")
-                print(
-                    f"  {index}) {video}")
-                listOfMatchesVideos.append(video)
-                index += 1
-
-        if listOfMatchesVideos != []:
-            print(
-                "Would you like to play any of the above? If yes, specify the number of the video.")
-            print("If your answer is not a valid number, we will assume it's a no.")
-            option = input()
-            try:
-                option = int(option)
-                if option <= len(listOfMatchesVideos):
-                    video = listOfMatchesVideos[option - 1]
-                    print(
-                        f"Playing video: {video.title}")
-                    return
-                else:
-                    raise ValueError
-            except ValueError:
-                return
+        Args:
+            tag_query: Tags combined with AND, OR, NOT and parentheses,
+                e.g. "#cat AND #animal AND NOT #dog".
+        """
+        try:
+            videos = self._video_library.search_videos_with_tag_query(
+                tag_query)
+        except TagQueryError as e:
+            return self._emit(Result(Action.SEARCH_VIDEOS_WITH_TAGS,
+                                     ErrorCode.INVALID_QUERY,
+                                     query=tag_query, reason=str(e)))
 
-        print(f"No search results for {video_tag}")
+        return self._emit(Result(Action.SEARCH_VIDEOS_WITH_TAGS,
+                                 videos=videos, query=tag_query))
 
     def flag_video(self, video_id, flag_reason="Not supplied"):
         """Mark a video as flagged.
@@ -390,22 +605,26 @@ class VideoPlayer:
             video_id: The video_id to be flagged.
             flag_reason: Reason for flagging the video.
         """
-        for video in self.videos:
-            if video.video_id == video_id:
-                if (self.currentlyPaused == video.title) or (self.currentlyPlaying == video.title):
-                    self.calledFromFlagged = True
-                    self.stop_video()
-
-                if video.flagged == True:
-                    print("Cannot flag video: Video is already flagged")
-                    return
-                else:
-                    print(
-                        f"Successfully flagged video: {video.title} (reason: {flag_reason})")
-                    video.flagVideo(flag_reason)
-                    return
-
-        print("Cannot flag video: Video does not exist")
+        video = self._video_library.get_video(video_id)
+        if video is None:
+            return self._emit(
+                Result(Action.FLAG_VIDEO, ErrorCode.VIDEO_NOT_FOUND))
+
+        stopped = []
+        if (self.currentlyPaused is video) or (self.currentlyPlaying is video):
+            self.calledFromFlagged = True
+            stopped.append(self._stop().video)
+
+        # Checked and flagged in one step, so of two sessions flagging the
+        # same video only one succeeds.
+        if not video.flagVideo(flag_reason):
+            return self._emit(Result(Action.FLAG_VIDEO,
+                                     ErrorCode.VIDEO_ALREADY_FLAGGED,
+                                     video=video, stopped=stopped))
+
+        self._record("flag", video_id, flag_reason)
+        return self._emit(Result(Action.FLAG_VIDEO, video=video,
+                                 stopped=stopped, reason=flag_reason))
 
     def allow_video(self, video_id):
         """Removes a flag from a video.
@@ -413,15 +632,14 @@ class VideoPlayer:
         Args:
             video_id: The video_id to be allowed again.
         """
-        for video in self.videos:
-            if video.video_id == video_id:
-                if video.flagged:
-                    video.allowVideo()
-                    print(
-                        f"Successfully removed flag from video: {video.title}")
-                    return
-                else:
-                    print(f"Cannot remove flag from video: Video is not flagged")
-                    return
+        video = self._video_library.get_video(video_id)
+        if video is None:
+            return self._emit(
+                Result(Action.ALLOW_VIDEO, ErrorCode.VIDEO_NOT_FOUND))
+
+        if not video.allowVideo():
+            return self._emit(Result(Action.ALLOW_VIDEO,
+                                     ErrorCode.VIDEO_NOT_FLAGGED, video=video))
 
-        print("Cannot remove flag from video: Video does not exist")
+        self._record("allow", video_id)
+        return self._emit(Result(Action.ALLOW_VIDEO, video=video))
@@ -1,27 +1,151 @@
 """A video playlist class."""
 from .video import Video
+from typing import Iterable
+import bisect
 
 
 class Playlist:
-    """A class used to represent a Playlist."""
+    """A class used to represent a Playlist.
+
+    The videos are kept in a dict by video id, which keeps them in the order
+    they were added while making membership, adding and removing O(1).
+
+    Every added video also gets a sequence number, higher than any before,
+    kept in a list in the order of the dict, so a page of the playlist can
+    start right after the last video of the previous one without walking the
+    videos before it. Removed videos leave their entry in that list until
+    more than half of it is stale.
+    """
 
     def __init__(self, playListName) -> None:
         self.name = playListName
-        self.playList = []
+        self.playList = {}
+        self._sequences = {}
+        # (sequence, video_id) pairs, sorted, including stale ones.
+        self._order = []
+        self._next_sequence = 0
+
+    def __len__(self):
+        """Returns the number of videos in the playlist."""
+        return len(self.playList)
+
+    def __contains__(self, video_id):
+        return video_id in self.playList
+
+    def get(self, video_id):
+        """Returns the video with the given id, None if it is not listed."""
+        return self.playList.get(video_id)
 
     def addToPlaylist(self, video: Video):
-        self.playList.append(video)
+        self.addManyToPlaylist([video])
+
+    def addManyToPlaylist(self, videos: Iterable[Video]):
+        """Adds videos in order. The caller checks none is listed yet."""
+        for video in videos:
+            self.playList[video.video_id] = video
+            self._sequences[video.video_id] = self._next_sequence
+            self._order.append((self._next_sequence, video.video_id))
+            self._next_sequence += 1
 
     def removeFromPlaylist(self, video: Video):
-        self.playList.remove(video)
+        self.removeManyFromPlaylist([video])
+
+    def removeManyFromPlaylist(self, videos: Iterable[Video]):
+        """Removes videos. The caller checks they are all listed."""
+        for video in videos:
+            del self.playList[video.video_id]
+            del self._sequences[video.video_id]
+        if len(self._order) > 2 * len(self.playList):
+            self._order = [(sequence, video_id) for video_id, sequence
+                           in self._sequences.items()]
 
     def clearPlaylist(self):
         self.playList.clear()
+        self._sequences.clear()
+        self._order.clear()
 
     def getPlayList(self):
-        return self.playList
+        """Returns a live view of the videos, in the order they were added."""
+        return self.playList.values()
+
+    def iter_after(self, sequence=None):
+        """Yields (sequence, video) pairs in the order the videos were added.
+
+        Args:
+            sequence: The sequence number of the last video already seen.
+                Iteration starts right after it, whether or not that video is
+                still listed. None starts at the first video.
+        """
+        order = self._order
+        position = 0
+        if sequence is not None:
+            position = bisect.bisect_left(order, (sequence + 1,))
+        for position in range(position, len(order)):
+            sequence, video_id = order[position]
+            if self._sequences.get(video_id) == sequence:
+                yield sequence, self.playList[video_id]
 
     @property
     def title(self) -> str:
-        """Returns the title of a video."""
+        """Returns the name of the playlist."""
         return self.name
+
+
+class PlaylistRegistry:
+    """A class used to represent the playlists of a player.
+
+    Playlist names ignore case: the playlists are kept by casefolded name,
+    each with the name it was created with. The names are also kept in
+    sorted order as playlists come and go, so listing them needs no sort.
+    """
+
+    def __init__(self):
+        self._playlists = {}
+        self._sorted_keys = []
+
+    def __len__(self):
+        """Returns the number of playlists."""
+        return len(self._playlists)
+
+    def __contains__(self, playlist_name):
+        return playlist_name.casefold() in self._playlists
+
+    def get(self, playlist_name):
+        """Returns the playlist with the given name, ignoring case.
+
+        Returns:
+            The Playlist, None if there is no such playlist.
+        """
+        return self._playlists.get(playlist_name.casefold())
+
+    def create(self, playlist_name):
+        """Creates an empty playlist.
+
+        Args:
+            playlist_name: The name of the playlist, as it should be shown.
+
+        Returns:
+            The new Playlist, None if a playlist with that name exists.
+        """
+        key = playlist_name.casefold()
+        if key in self._playlists:
+            return None
+        playList = self._playlists[key] = Playlist(playlist_name)
+        bisect.insort(self._sorted_keys, key)
+        return playList
+
+    def remove(self, playlist_name):
+        """Deletes the playlist with the given name, ignoring case.
+
+        Returns:
+            The removed Playlist, None if there is no such playlist.
+        """
+        key = playlist_name.casefold()
+        playList = self._playlists.pop(key, None)
+        if playList is not None:
+            del self._sorted_keys[bisect.bisect_left(self._sorted_keys, key)]
+        return playList
+
+    def names(self):
+        """Returns the names of all playlists, sorted ignoring case."""
+        return [self._playlists[key].title for key in self._sorted_keys]
@@ -0,0 +1,102 @@
+"""The results returned by the video player commands."""
+
+from dataclasses import dataclass
+from enum import Enum
+from typing import NamedTuple, Optional, Sequence
+
+from .video import Video
+
+
+class Action(Enum):
+    """The player command a result belongs to."""
+    NUMBER_OF_VIDEOS = "NUMBER_OF_VIDEOS"
+    SHOW_ALL_VIDEOS = "SHOW_ALL_VIDEOS"
+    PLAY = "PLAY"
+    PLAY_RANDOM = "PLAY_RANDOM"
+    STOP = "STOP"
+    PAUSE = "PAUSE"
+    CONTINUE = "CONTINUE"
+    SHOW_PLAYING = "SHOW_PLAYING"
+    CREATE_PLAYLIST = "CREATE_PLAYLIST"
+    ADD_TO_PLAYLIST = "ADD_TO_PLAYLIST"
+    ADD_MANY_TO_PLAYLIST = "ADD_MANY_TO_PLAYLIST"
+    REMOVE_FROM_PLAYLIST = "REMOVE_FROM_PLAYLIST"
+    REMOVE_MANY_FROM_PLAYLIST = "REMOVE_MANY_FROM_PLAYLIST"
+    CLEAR_PLAYLIST = "CLEAR_PLAYLIST"
+    DELETE_PLAYLIST = "DELETE_PLAYLIST"
+    SHOW_PLAYLIST = "SHOW_PLAYLIST"
+    SHOW_ALL_PLAYLISTS = "SHOW_ALL_PLAYLISTS"
+    SEARCH_VIDEOS = "SEARCH_VIDEOS"
+    SEARCH_VIDEOS_WITH_TAG = "SEARCH_VIDEOS_WITH_TAG"
+    SEARCH_VIDEOS_WITH_TAGS = "SEARCH_VIDEOS_WITH_TAGS"
+    PLAY_SEARCH_RESULT = "PLAY_SEARCH_RESULT"
+    FLAG_VIDEO = "FLAG_VIDEO"
+    ALLOW_VIDEO = "ALLOW_VIDEO"
+
+
+class Status(Enum):
+    """Whether a command did what it was asked to."""
+    OK = "OK"
+    ERROR = "ERROR"
+
+
+class ErrorCode(Enum):
+    """Why a command failed."""
+    VIDEO_NOT_FOUND = "VIDEO_NOT_FOUND"
+    VIDEO_FLAGGED = "VIDEO_FLAGGED"
+    VIDEO_ALREADY_FLAGGED = "VIDEO_ALREADY_FLAGGED"
+    VIDEO_NOT_FLAGGED = "VIDEO_NOT_FLAGGED"
+    NO_VIDEOS_AVAILABLE = "NO_VIDEOS_AVAILABLE"
+    NOTHING_PLAYING = "NOTHING_PLAYING"
+    ALREADY_PAUSED = "ALREADY_PAUSED"
+    NOT_PAUSED = "NOT_PAUSED"
+    PLAYLIST_EXISTS = "PLAYLIST_EXISTS"
+    PLAYLIST_NOT_FOUND = "PLAYLIST_NOT_FOUND"
+    VIDEO_ALREADY_IN_PLAYLIST = "VIDEO_ALREADY_IN_PLAYLIST"
+    VIDEO_NOT_IN_PLAYLIST = "VIDEO_NOT_IN_PLAYLIST"
+    VIDEO_LISTED_TWICE = "VIDEO_LISTED_TWICE"
+    VIDEOS_REJECTED = "VIDEOS_REJECTED"
+    INVALID_QUERY = "INVALID_QUERY"
+    INVALID_PAGE_SIZE = "INVALID_PAGE_SIZE"
+    INVALID_PAGE_TOKEN = "INVALID_PAGE_TOKEN"
+
+
+class Rejection(NamedTuple):
+    """A video id a bulk command could not apply, and why."""
+    video_id: str
+    error: ErrorCode
+    video: Optional[Video] = None
+
+
+@dataclass
+class Result:
+    """A class used to represent the outcome of a player command.
+
+    Only the fields that matter to the action are set: `video` is the video
+    the command acted on, `playlist` the playlist name as the caller gave it,
+    `videos` the listed or found videos, `stopped` the videos stopped on the
+    way, `query` the search term and `reason` the flag reason or the reason
+    a query is invalid. Listings shown a page at a time set `page_size`, and
+    `next_page` to the token resuming after the page when there is more.
+    Bulk commands that change nothing because some ids are invalid list
+    them in `rejected`.
+    """
+    action: Action
+    error: Optional[ErrorCode] = None
+    video: Optional[Video] = None
+    playlist: Optional[str] = None
+    videos: Sequence[Video] = ()
+    playlists: Sequence[str] = ()
+    stopped: Sequence[Video] = ()
+    query: str = ""
+    reason: str = ""
+    count: int = 0
+    paused: bool = False
+    page_size: int = 0
+    next_page: Optional[str] = None
+    rejected: Sequence[Rejection] = ()
+
+    @property
+    def status(self) -> Status:
+        """Returns whether the command succeeded."""
+        return Status.OK if self.error is None else Status.ERROR
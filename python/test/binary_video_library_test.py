@@ -0,0 +1,117 @@
+import pytest
+
+from src.binary_video_library import BinaryVideoLibrary, convert_catalog
+from src.video_library import DEFAULT_VIDEO_FILE, VideoLibrary
+from src.video_player import VideoPlayer
+
+
+@pytest.fixture
+def binary_file(tmp_path):
+    path = tmp_path / "videos.bin"
+    convert_catalog(DEFAULT_VIDEO_FILE, path)
+    return path
+
+
+def test_binary_library_has_all_videos(binary_file):
+    library = BinaryVideoLibrary(binary_file)
+    video = library.get_video("amazing_cats_video_id")
+
+    assert len(library) == 5
+    assert video.title == "Amazing Cats"
+    assert video.tags == ("#cat", "#animal")
+    assert library.get_video("nothing_video_id").tags == ()
+    assert library.get_video("does_not_exist") is None
+
+
+def test_binary_library_shares_tag_strings(binary_file):
+    library = BinaryVideoLibrary(binary_file)
+    cats = library.get_video("amazing_cats_video_id")
+    dogs = library.get_video("funny_dogs_video_id")
+
+    assert cats.tags[1] is dogs.tags[1]
+
+
+def test_binary_library_sorted_videos(binary_file):
+    library = BinaryVideoLibrary(binary_file)
+    titles = [video.title for video in library.get_sorted_videos()]
+
+    assert titles == ["Amazing Cats", "Another Cat Video", "Funny Dogs",
+                      "Life at Google", "Video about nothing"]
+
+
+def test_converted_catalog_keeps_the_last_row_of_a_video(tmp_path):
+    video_file = tmp_path / "videos.txt"
+    video_file.write_text(
+        "zebra Stripes | zebra_video_id | #zebra\n"
+        "Old Cats | amazing_cats_video_id | #cat\n"
+        "Amazing Cats | amazing_cats_video_id | #cat , #animal\n"
+        "baby Goats | goats_video_id |\n")
+    binary_path = tmp_path / "videos.bin"
+    convert_catalog(video_file, binary_path)
+    library = BinaryVideoLibrary(binary_path)
+
+    assert [(video.title, video.video_id, video.tags)
+            for video in library.get_sorted_videos()] == [
+        (video.title, video.video_id, video.tags)
+        for video in VideoLibrary(video_file).get_sorted_videos()]
+    assert len(library) == 3
+    assert library.get_video("amazing_cats_video_id").tags == (
+        "#cat", "#animal")
+
+
+def test_binary_library_decodes_each_cached_record_once(binary_file,
+                                                         monkeypatch):
+    decoded = []
+    read_video = BinaryVideoLibrary._read_video
+    monkeypatch.setattr(BinaryVideoLibrary, "_read_video",
+                        lambda library, record: decoded.append(record)
+                        or read_video(library, record))
+    library = BinaryVideoLibrary(binary_file)
+    for _ in range(3):
+        library.get_sorted_videos()[:]
+    library.get_video("funny_dogs_video_id")
+
+    assert sorted(decoded) == [0, 1, 2, 3, 4]
+
+
+def test_binary_library_rejects_other_files(tmp_path):
+    path = tmp_path / "videos.bin"
+    path.write_bytes(b"\0" * 64)
+
+    with pytest.raises(ValueError):
+        BinaryVideoLibrary(path)
+
+
+def test_player_runs_on_binary_library(binary_file, capfd):
+    player = VideoPlayer(BinaryVideoLibrary(binary_file))
+    player.show_all_videos()
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 6
+    assert "Amazing Cats (amazing_cats_video_id) [#cat #animal]" in lines[1]
+    assert "Video about nothing (nothing_video_id) []" in lines[5]
+
+
+def test_binary_library_searches(binary_file):
+    library = BinaryVideoLibrary(binary_file)
+
+    assert [video.title for video in library.search_videos("cat")] == [
+        "Amazing Cats", "Another Cat Video"]
+    assert [video.title for video in library.search_videos_with_tag(
+        "#dog")] == ["Funny Dogs"]
+
+
+def test_converting_onto_an_open_catalog_leaves_it_whole(tmp_path):
+    video_file = tmp_path / "videos.txt"
+    video_file.write_text("".join(f"Video {number} | video_{number} | #tag\n"
+                                  for number in range(5_000)))
+    binary_path = tmp_path / "videos.bin"
+    convert_catalog(video_file, binary_path)
+    library = BinaryVideoLibrary(binary_path)
+
+    video_file.write_text("Baby Goats | goats_video_id | #goat\n")
+    convert_catalog(video_file, binary_path)
+
+    assert library.get_sorted_videos()[4_999].video_id == "video_999"
+    assert len(BinaryVideoLibrary(binary_path)) == 1
+    assert list(tmp_path.glob("*.tmp")) == []
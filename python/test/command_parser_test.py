@@ -0,0 +1,78 @@
+import pytest
+
+from src.command_parser import COMMANDS, CommandException, CommandParser
+from src.video_player import VideoPlayer
+
+
+def test_execute_command_ignores_case(capfd):
+    parser = CommandParser(VideoPlayer())
+    parser.execute_command(["play", "amazing_cats_video_id"])
+    parser.execute_command(["Show_Playing", "extra"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 2
+    assert "Playing video: Amazing Cats" in lines[0]
+    assert "Currently playing: Amazing Cats" in lines[1]
+
+
+def test_execute_command_checks_arguments():
+    parser = CommandParser(VideoPlayer())
+
+    with pytest.raises(CommandException, match="followed by video_id"):
+        parser.execute_command(["PLAY"])
+    with pytest.raises(CommandException, match="optional flag reason"):
+        parser.execute_command(["FLAG_VIDEO", "a", "b", "c"])
+    with pytest.raises(CommandException, match="valid command"):
+        parser.execute_command([])
+
+
+def test_execute_unknown_command(capfd):
+    parser = CommandParser(VideoPlayer())
+    parser.execute_command(["REWIND"])
+    out, err = capfd.readouterr()
+    assert "Please enter a valid command" in out
+
+
+def test_help_lists_every_command(capfd):
+    parser = CommandParser(VideoPlayer())
+    parser.execute_command(["HELP"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "Available commands:" in lines[1]
+    assert "    PLAY <video_id> - Plays specified video." in lines
+    for name in COMMANDS:
+        assert any(line.startswith(f"    {name} ") for line in lines)
+    assert "    EXIT - Terminates the program execution." in lines
+
+
+def test_execute_bulk_playlist_commands(capfd):
+    parser = CommandParser(VideoPlayer())
+    parser.execute_command(["CREATE_PLAYLIST", "my_playlist"])
+    parser.execute_command(["ADD_MANY_TO_PLAYLIST", "my_playlist",
+                            "amazing_cats_video_id", "funny_dogs_video_id",
+                            "nothing_video_id"])
+    parser.execute_command(["REMOVE_MANY_FROM_PLAYLIST", "my_playlist",
+                            "funny_dogs_video_id"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "Added 3 videos to my_playlist" in lines[1]
+    assert "Removed 1 videos from my_playlist" in lines[2]
+
+    with pytest.raises(CommandException, match="video_ids to add"):
+        parser.execute_command(["ADD_MANY_TO_PLAYLIST", "my_playlist"])
+
+
+def test_command_after_search_answers_it(capfd):
+    parser = CommandParser(VideoPlayer())
+    parser.execute_command(["SEARCH_VIDEOS", "cat"])
+    parser.execute_command([])
+    parser.execute_command(["SEARCH_VIDEOS_WITH_TAG", "#dog"])
+    parser.execute_command(["1"])
+    parser.execute_command(["SEARCH_VIDEOS", "cat"])
+    parser.execute_command(["PLAY", "funny_dogs_video_id"])
+    parser.execute_command(["SHOW_PLAYING"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "Playing video: Funny Dogs" in lines[9]
+    assert "Here are the results for cat:" in lines[10]
+    assert "No video is currently playing" in lines[-1]
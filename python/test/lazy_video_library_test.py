@@ -0,0 +1,128 @@
+import os
+import shutil
+
+import pytest
+
+from src import lazy_video_library
+from src.lazy_video_library import LazyVideoLibrary
+from src.video import Video
+from src.video_library import DEFAULT_VIDEO_FILE, ReadOnlyLibraryError
+from src.video_player import VideoPlayer
+
+
+@pytest.fixture
+def video_file(tmp_path):
+    path = tmp_path / "videos.txt"
+    shutil.copy(DEFAULT_VIDEO_FILE, path)
+    return path
+
+
+def test_lazy_library_has_all_videos(video_file):
+    library = LazyVideoLibrary(video_file)
+    video = library.get_video("amazing_cats_video_id")
+
+    assert len(library) == 5
+    assert video.title == "Amazing Cats"
+    assert set(video.tags) == {"#cat", "#animal"}
+    assert library.get_video("nothing_video_id").tags == ()
+    assert library.get_video("does_not_exist") is None
+
+
+def test_lazy_library_sorted_videos(video_file):
+    library = LazyVideoLibrary(video_file)
+    titles = [video.title for video in library.get_sorted_videos()]
+
+    assert titles == ["Amazing Cats", "Another Cat Video", "Funny Dogs",
+                      "Life at Google", "Video about nothing"]
+
+
+def test_lazy_library_keeps_video_identity_and_flags(video_file):
+    library = LazyVideoLibrary(video_file, cache_size=1)
+    cats = library.get_video("amazing_cats_video_id")
+    cats.flagVideo("dont_like_cats")
+    library.get_video("funny_dogs_video_id")
+    library.get_video("life_at_google_video_id")
+
+    assert library.get_video("amazing_cats_video_id") is cats
+    del cats
+    library.get_video("funny_dogs_video_id")
+    assert library.get_video("amazing_cats_video_id").flagged
+
+
+def test_lazy_library_reuses_and_refreshes_index(video_file):
+    LazyVideoLibrary(video_file)
+    index_path = f"{video_file}.idx"
+    index_mtime = os.stat(index_path).st_mtime_ns
+    LazyVideoLibrary(video_file)
+    assert os.stat(index_path).st_mtime_ns == index_mtime
+
+    with open(video_file, "a") as catalog:
+        catalog.write("\nBaby Goats | goats_video_id | #goat\n")
+    library = LazyVideoLibrary(video_file)
+    assert len(library) == 6
+    assert library.get_video("goats_video_id").title == "Baby Goats"
+
+
+def test_player_runs_on_lazy_library(video_file, capfd):
+    player = VideoPlayer(LazyVideoLibrary(video_file))
+    player.number_of_videos()
+    player.play_video("funny_dogs_video_id")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "5 videos in the library" in lines[0]
+    assert "Playing video: Funny Dogs" in lines[1]
+
+
+def test_lazy_library_iter_sorted_videos_reads_only_the_page(video_file):
+    library = LazyVideoLibrary(video_file, cache_size=10)
+    videos = library.iter_sorted_videos(("Funny Dogs", "funny_dogs_video_id"))
+    assert next(videos).title == "Life at Google"
+    assert len(library._cache) <= 4
+
+
+def test_lazy_library_parses_each_cached_row_once(video_file, monkeypatch):
+    library = LazyVideoLibrary(video_file)
+    parsed = []
+    video_from_line = lazy_video_library._video_from_line
+    monkeypatch.setattr(lazy_video_library, "_video_from_line",
+                        lambda line: parsed.append(line)
+                        or video_from_line(line))
+    for _ in range(3):
+        titles = [video.title for video in library.get_sorted_videos()]
+    library.iter_sorted_videos(("Funny Dogs", "funny_dogs_video_id"))
+    library.search_videos("cat")
+    library.get_video("funny_dogs_video_id")
+
+    assert len(titles) == 5
+    assert len(parsed) == 5
+
+
+def test_lazy_library_searches(video_file):
+    library = LazyVideoLibrary(video_file)
+    cats = library.search_videos("cat")
+    dogs = library.search_videos_with_tag("#DOG")
+
+    assert [video.title for video in cats] == ["Amazing Cats",
+                                               "Another Cat Video"]
+    assert [video.title for video in dogs] == ["Funny Dogs"]
+    assert cats[0] is library.get_video("amazing_cats_video_id")
+
+
+def test_lazy_library_rebuilds_partly_written_index(video_file, tmp_path):
+    LazyVideoLibrary(video_file)
+    index_path = tmp_path / "videos.txt.idx"
+    index_path.write_bytes(index_path.read_bytes()[:-5])
+
+    library = LazyVideoLibrary(video_file)
+    assert library.get_video("funny_dogs_video_id").title == "Funny Dogs"
+    assert list(tmp_path.glob("*.tmp")) == []
+
+
+def test_lazy_library_is_read_only(video_file):
+    library = LazyVideoLibrary(video_file)
+
+    with pytest.raises(ReadOnlyLibraryError):
+        library.add_video(Video("Baby Goats", "goats_video_id", ["#goat"]))
+    with pytest.raises(ReadOnlyLibraryError):
+        library.remove_video("amazing_cats_video_id")
+    assert len(library) == 5
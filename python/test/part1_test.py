@@ -23,6 +23,43 @@ def test_show_all_videos(capfd):
     assert "Video about nothing (nothing_video_id) []" in lines[5]
 
 
+def test_show_all_videos_in_pages(capfd):
+    player = VideoPlayer()
+    player.show_all_videos("2")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 4
+    assert "Here's a list of all available videos:" in lines[0]
+    assert "Amazing Cats (amazing_cats_video_id) [#cat #animal]" in lines[1]
+    assert "Another Cat Video (another_cat_video_id) [#cat #animal]" in lines[2]
+    assert lines[3].startswith("Next page: SHOW_ALL_VIDEOS 2 ")
+
+    token = lines[3].split()[-1]
+    player.show_all_videos("2", token)
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 4
+    assert "Funny Dogs (funny_dogs_video_id) [#dog #animal]" in lines[1]
+    assert "Life at Google (life_at_google_video_id) [#google #career]" in lines[2]
+
+    player.show_all_videos("2", lines[3].split()[-1])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 2
+    assert "Video about nothing (nothing_video_id) []" in lines[1]
+
+
+def test_show_all_videos_invalid_page(capfd):
+    player = VideoPlayer()
+    player.show_all_videos("0")
+    player.show_all_videos("2", "not a token")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 2
+    assert "Cannot show videos: Invalid page size" in lines[0]
+    assert "Cannot show videos: Invalid page token" in lines[1]
+
+
 def test_play_video(capfd):
     player = VideoPlayer()
     player.play_video("amazing_cats_video_id")
@@ -116,6 +116,45 @@ def test_show_playlist(capfd):
     assert "Amazing Cats (amazing_cats_video_id) [#cat #animal]" in lines[5]
 
 
+def test_show_playlist_in_pages(capfd):
+    player = VideoPlayer()
+    player.create_playlist("my_cool_playlist")
+    player.add_to_playlist("my_cool_playlist", "amazing_cats_video_id")
+    player.add_to_playlist("my_cool_playlist", "life_at_google_video_id")
+    player.add_to_playlist("my_cool_playlist", "funny_dogs_video_id")
+    capfd.readouterr()
+    player.show_playlist("my_cool_playlist", "2")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 4
+    assert "Showing playlist: my_cool_playlist" in lines[0]
+    assert "Amazing Cats (amazing_cats_video_id) [#cat #animal]" in lines[1]
+    assert "Life at Google (life_at_google_video_id) [#google #career]" in lines[2]
+    assert lines[3].startswith("Next page: SHOW_PLAYLIST my_cool_playlist 2 ")
+
+    player.show_playlist("my_cool_playlist", "2", lines[3].split()[-1])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 2
+    assert "Funny Dogs (funny_dogs_video_id) [#dog #animal]" in lines[1]
+
+
+def test_show_playlist_pages_survive_removed_videos(capfd):
+    player = VideoPlayer()
+    player.create_playlist("my_cool_playlist")
+    player.add_to_playlist("my_cool_playlist", "amazing_cats_video_id")
+    player.add_to_playlist("my_cool_playlist", "life_at_google_video_id")
+    player.add_to_playlist("my_cool_playlist", "funny_dogs_video_id")
+    result = player.show_playlist("my_cool_playlist", "2")
+    player.remove_from_playlist("my_cool_playlist", "amazing_cats_video_id")
+    capfd.readouterr()
+    player.show_playlist("my_cool_playlist", "2", result.next_page)
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 2
+    assert "Funny Dogs (funny_dogs_video_id) [#dog #animal]" in lines[1]
+
+
 def test_remove_from_playlist_then_re_add(capfd):
     player = VideoPlayer()
     player.create_playlist("MY_playlist")
@@ -235,3 +274,82 @@ def test_delete_playlist_nonexistent(capfd):
     lines = out.splitlines()
     assert len(lines) == 1
     assert "Cannot delete playlist my_cool_playlist: Playlist does not exist" in lines[0]
+
+
+def test_delete_playlist_show_all_playlists(capfd):
+    player = VideoPlayer()
+    player.create_playlist("my_cool_playlist")
+    player.create_playlist("another_playlist")
+    player.delete_playlist("MY_COOL_PLAYLIST")
+    player.show_all_playlists()
+    player.create_playlist("my_cool_playlist")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 6
+    assert "Deleted playlist: MY_COOL_PLAYLIST" in lines[2]
+    assert "Showing all playlists:" in lines[3]
+    assert "another_playlist" in lines[4]
+    assert "Successfully created new playlist: my_cool_playlist" in lines[5]
+
+
+def test_add_many_to_playlist(capfd):
+    player = VideoPlayer()
+    player.create_playlist("my_playlist")
+    player.add_many_to_playlist("MY_playlist", "life_at_google_video_id",
+                                "amazing_cats_video_id")
+    player.show_playlist("my_playlist")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 5
+    assert "Added 2 videos to MY_playlist" in lines[1]
+    assert "Life at Google (life_at_google_video_id) [#google #career]" in lines[3]
+    assert "Amazing Cats (amazing_cats_video_id) [#cat #animal]" in lines[4]
+
+
+def test_add_many_to_playlist_is_all_or_nothing(capfd):
+    player = VideoPlayer()
+    player.create_playlist("my_playlist")
+    player.add_to_playlist("my_playlist", "amazing_cats_video_id")
+    player.flag_video("funny_dogs_video_id", "dont_like_dogs")
+    player.add_many_to_playlist("my_playlist", "life_at_google_video_id",
+                                "amazing_cats_video_id", "does_not_exist",
+                                "funny_dogs_video_id", "nothing_video_id",
+                                "nothing_video_id")
+    player.show_playlist("my_playlist")
+    player.add_many_to_playlist("another_playlist", "amazing_cats_video_id")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 11
+    assert ("Cannot add videos to my_playlist: 4 of 6 videos are invalid, "
+            "no video was changed") in lines[3]
+    assert "amazing_cats_video_id: Video already added" in lines[4]
+    assert "does_not_exist: Video does not exist" in lines[5]
+    assert ("funny_dogs_video_id: Video is currently flagged "
+            "(reason: dont_like_dogs)") in lines[6]
+    assert "nothing_video_id: Video is listed more than once" in lines[7]
+    assert "Showing playlist: my_playlist" in lines[8]
+    assert "Amazing Cats (amazing_cats_video_id) [#cat #animal]" in lines[9]
+    assert ("Cannot add videos to another_playlist: Playlist does not exist"
+            in lines[10])
+
+
+def test_remove_many_from_playlist(capfd):
+    player = VideoPlayer()
+    player.create_playlist("my_playlist")
+    player.add_many_to_playlist("my_playlist", "amazing_cats_video_id",
+                                "life_at_google_video_id",
+                                "funny_dogs_video_id")
+    player.remove_many_from_playlist("my_playlist", "funny_dogs_video_id",
+                                     "nothing_video_id", "does_not_exist")
+    player.remove_many_from_playlist("my_playlist", "funny_dogs_video_id",
+                                     "amazing_cats_video_id")
+    player.show_playlist("my_playlist")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 8
+    assert ("Cannot remove videos from my_playlist: 2 of 3 videos are "
+            "invalid, no video was changed") in lines[2]
+    assert "nothing_video_id: Video is not in playlist" in lines[3]
+    assert "does_not_exist: Video does not exist" in lines[4]
+    assert "Removed 2 videos from my_playlist" in lines[5]
+    assert "Life at Google (life_at_google_video_id) [#google #career]" in lines[7]
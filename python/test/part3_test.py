@@ -1,11 +1,10 @@
 from src.video_player import VideoPlayer
-from unittest import mock
 
 
-@mock.patch('builtins.input', lambda *args: 'No')
 def test_search_videos_with_no_answer(capfd):
     player = VideoPlayer()
     player.search_videos("cat")
+    player.select_search_result('No')
     out, err = capfd.readouterr()
     lines = out.splitlines()
     assert len(lines) == 5
@@ -20,10 +19,10 @@ def test_search_videos_with_no_answer(capfd):
     assert "Playing video" not in out
 
 
-@mock.patch('builtins.input', lambda *args: '2')
 def test_search_videos_and_play_answer(capfd):
     player = VideoPlayer()
     player.search_videos("cat")
+    player.select_search_result('2')
 
     out, err = capfd.readouterr()
     lines = out.splitlines()
@@ -38,10 +37,10 @@ def test_search_videos_and_play_answer(capfd):
     assert "Playing video: Another Cat Video" in lines[5]
 
 
-@mock.patch('builtins.input', lambda *args: '6')
 def test_search_videos_number_out_of_bounds(capfd):
     player = VideoPlayer()
     player.search_videos("cat")
+    player.select_search_result('6')
 
     out, err = capfd.readouterr()
     lines = out.splitlines()
@@ -56,10 +55,23 @@ def test_search_videos_number_out_of_bounds(capfd):
     assert "Playing video" not in out
 
 
-@mock.patch('builtins.input', lambda *args: 'ab3g')
+def test_search_videos_number_below_one(capfd):
+    player = VideoPlayer()
+    for answer in ('0', '-1'):
+        player.search_videos("cat")
+        player.select_search_result(answer)
+
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 10
+    assert "Playing video" not in out
+    assert player.currentlyPlaying is None
+
+
 def test_search_videos_invalid_number(capfd):
     player = VideoPlayer()
     player.search_videos("cat")
+    player.select_search_result('ab3g')
 
     out, err = capfd.readouterr()
     lines = out.splitlines()
@@ -83,10 +95,10 @@ def test_search_videos_no_results(capfd):
     assert "No search results for blah" in lines[0]
 
 
-@mock.patch('builtins.input', lambda *args: 'No')
 def test_search_videos_with_tag_no_answer(capfd):
     player = VideoPlayer()
     player.search_videos_tag("#cat")
+    player.select_search_result('No')
     out, err = capfd.readouterr()
     lines = out.splitlines()
     assert len(lines) == 5
@@ -99,10 +111,10 @@ def test_search_videos_with_tag_no_answer(capfd):
             "it's a no.") in lines[4]
 
 
-@mock.patch('builtins.input', lambda *args: '1')
 def test_search_videos_with_tag_play_answered_number(capfd):
     player = VideoPlayer()
     player.search_videos_tag("#cat")
+    player.select_search_result('1')
     out, err = capfd.readouterr()
     lines = out.splitlines()
     assert len(lines) == 6
@@ -116,10 +128,10 @@ def test_search_videos_with_tag_play_answered_number(capfd):
     assert "Playing video: Amazing Cats" in lines[5]
 
 
-@mock.patch('builtins.input', lambda *args: '5')
 def test_search_videos_with_tag_number_out_of_bounds(capfd):
     player = VideoPlayer()
     player.search_videos_tag("#cat")
+    player.select_search_result('5')
     out, err = capfd.readouterr()
     lines = out.splitlines()
     assert len(lines) == 5
@@ -140,3 +152,42 @@ def test_search_videos_tag_no_results(capfd):
     lines = out.splitlines()
     assert len(lines) == 1
     assert "No search results for #blah" in lines[0]
+
+
+def test_search_videos_with_tags(capfd):
+    player = VideoPlayer()
+    player.search_videos_with_tags("#animal AND NOT (#dog OR #google)")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 3
+    assert "Here are the results for #animal AND NOT (#dog OR #google):" in lines[0]
+    assert "1) Amazing Cats (amazing_cats_video_id) [#cat #animal]" in lines[1]
+    assert "2) Another Cat Video (another_cat_video_id) [#cat #animal]" in lines[2]
+
+
+def test_search_videos_with_tags_only_negated(capfd):
+    player = VideoPlayer()
+    player.search_videos_with_tags("NOT #animal")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 3
+    assert "1) Life at Google (life_at_google_video_id) [#google #career]" in lines[1]
+    assert "2) Video about nothing (nothing_video_id) []" in lines[2]
+
+
+def test_search_videos_with_tags_no_results(capfd):
+    player = VideoPlayer()
+    player.search_videos_with_tags("#cat AND #dog")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 1
+    assert "No search results for #cat AND #dog" in lines[0]
+
+
+def test_search_videos_with_tags_invalid_query(capfd):
+    player = VideoPlayer()
+    player.search_videos_with_tags("#cat AND")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 1
+    assert "Cannot search videos: Query ends unexpectedly" in lines[0]
@@ -1,5 +1,3 @@
-from unittest import mock
-
 from src.video_player import VideoPlayer
 
 
@@ -133,11 +131,11 @@ def test_flag_video_show_all_videos(capfd):
     assert "Video about nothing (nothing_video_id) []" in lines[6]
 
 
-@mock.patch('builtins.input', lambda *args: 'No')
 def test_flag_video_search_videos(capfd):
     player = VideoPlayer()
     player.flag_video("amazing_cats_video_id", "dont_like_cats")
     player.search_videos("cat")
+    player.select_search_result('No')
     out, err = capfd.readouterr()
     lines = out.splitlines()
     assert len(lines) == 5
@@ -152,11 +150,11 @@ def test_flag_video_search_videos(capfd):
             "it's a no.") in lines[4]
 
 
-@mock.patch('builtins.input', lambda *args: 'No')
 def test_flag_video_search_videos_with_tag(capfd):
     player = VideoPlayer()
     player.flag_video("amazing_cats_video_id", "dont_like_cats")
     player.search_videos_tag("#cat")
+    player.select_search_result('No')
     out, err = capfd.readouterr()
     lines = out.splitlines()
     assert len(lines) == 5
@@ -0,0 +1,82 @@
+from src.player_journal import PlayerJournal
+from src.video_library import VideoLibrary
+from src.video_output import NullSink
+from src.video_player import VideoPlayer
+
+
+def _player(path, snapshot_every=10_000):
+    journal = PlayerJournal(path, snapshot_every)
+    return VideoPlayer(VideoLibrary(), NullSink(), journal), journal
+
+
+def test_player_state_survives_restart(tmp_path, capfd):
+    path = tmp_path / "player.journal"
+    player, journal = _player(path)
+    player.create_playlist("My_Playlist")
+    player.create_playlist("another_playlist")
+    player.add_many_to_playlist("my_playlist", "amazing_cats_video_id",
+                                "life_at_google_video_id",
+                                "funny_dogs_video_id")
+    player.remove_from_playlist("my_playlist", "life_at_google_video_id")
+    player.delete_playlist("another_playlist")
+    player.flag_video("nothing_video_id", "dont_like_nothing")
+    player.flag_video("funny_dogs_video_id")
+    player.allow_video("funny_dogs_video_id")
+    journal.close()
+
+    journal = PlayerJournal(path)
+    player = VideoPlayer(VideoLibrary(), journal=journal)
+    player.show_all_playlists()
+    player.show_playlist("my_playlist")
+    player.play_video("nothing_video_id")
+    player.play_video("funny_dogs_video_id")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 7
+    assert "My_Playlist" in lines[1]
+    assert "Amazing Cats (amazing_cats_video_id) [#cat #animal]" in lines[3]
+    assert "Funny Dogs (funny_dogs_video_id) [#dog #animal]" in lines[4]
+    assert ("Cannot play video: Video is currently flagged "
+            "(reason: dont_like_nothing)") in lines[5]
+    assert "Playing video: Funny Dogs" in lines[6]
+
+
+def test_journal_is_compacted_into_snapshot(tmp_path):
+    path = tmp_path / "player.journal"
+    player, journal = _player(path, snapshot_every=4)
+    player.create_playlist("my_playlist")
+    for _ in range(3):
+        player.add_to_playlist("my_playlist", "amazing_cats_video_id")
+        player.remove_from_playlist("my_playlist", "amazing_cats_video_id")
+    player.add_to_playlist("my_playlist", "life_at_google_video_id")
+    journal.close()
+
+    assert (tmp_path / "player.journal.snapshot").exists()
+    assert len(path.read_text().splitlines()) < 4
+
+    journal = PlayerJournal(path)
+    assert journal.recover() == (
+        [("my_playlist", ["life_at_google_video_id"])], {})
+
+
+def test_recovery_skips_changes_in_snapshot_and_torn_line(tmp_path):
+    path = tmp_path / "player.journal"
+    journal = PlayerJournal(path)
+    journal.recover()
+    journal.record("create", "my_playlist")
+    journal.record("add", "my_playlist", ["amazing_cats_video_id"])
+    lines = path.read_bytes()
+    journal.snapshot()
+    journal.close()
+
+    # As if the player crashed after the snapshot, before emptying the
+    # journal, and again while appending a change.
+    path.write_bytes(lines + b'[3, "clear", "my_pl')
+    journal = PlayerJournal(path)
+    assert journal.recover() == (
+        [("my_playlist", ["amazing_cats_video_id"])], {})
+    journal.record("flag", "nothing_video_id", "Not supplied")
+    journal.close()
+
+    assert path.read_bytes().endswith(
+        b'\n[3, "flag", "nothing_video_id", "Not supplied"]\n')
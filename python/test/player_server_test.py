@@ -0,0 +1,239 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import socket
+import threading
+
+import pytest
+
+from src import player_server
+from src.player_server import (PROMPT, PlayerSession, ThreadingPlayerServer,
+                               parse_address, start_server)
+from src.video import Video
+from src.video_library import VideoLibrary
+from src.video_output import ListSink
+
+
+def test_sessions_share_library_but_not_state():
+    library = VideoLibrary()
+    first, second = ListSink(), ListSink()
+    alice = PlayerSession(library, first)
+    bob = PlayerSession(library, second)
+
+    alice.execute("CREATE_PLAYLIST my_playlist")
+    alice.execute("PLAY amazing_cats_video_id")
+    alice.execute("FLAG_VIDEO funny_dogs_video_id")
+    bob.execute("SHOW_ALL_PLAYLISTS")
+    bob.execute("SHOW_PLAYING")
+    bob.execute("PLAY funny_dogs_video_id")
+    bob.execute("PLAY")
+
+    assert alice.player.videos is bob.player.videos
+    assert second.lines == [
+        "No playlists exist yet",
+        "No video is currently playing",
+        "Cannot play video: Video is currently flagged (reason: Not supplied)",
+        "Please enter PLAY command followed by video_id.",
+    ]
+    assert not alice.execute("exit")
+
+
+def test_sessions_interleave_searches():
+    library = VideoLibrary()
+    first, second = ListSink(), ListSink()
+    alice = PlayerSession(library, first)
+    bob = PlayerSession(library, second)
+
+    alice.execute("SEARCH_VIDEOS cat")
+    bob.execute("SEARCH_VIDEOS_WITH_TAG #dog")
+    bob.execute("1")
+    alice.execute("2")
+
+    assert first.lines[-1] == "Playing video: Another Cat Video"
+    assert second.lines[-1] == "Playing video: Funny Dogs"
+
+
+def test_parse_address():
+    assert parse_address("localhost:8080") == (
+        socket.AF_INET, ("localhost", 8080))
+    assert parse_address(":8080") == (socket.AF_INET, ("127.0.0.1", 8080))
+    assert parse_address("/tmp/yt.sock") == (socket.AF_UNIX, "/tmp/yt.sock")
+
+
+def _read_until_prompt(client):
+    data = b""
+    while not data.endswith(PROMPT.encode()):
+        chunk = client.recv(4096)
+        if not chunk:
+            break
+        data += chunk
+    return data.decode()
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"),
+                    reason="needs Unix sockets")
+def test_threading_server_serves_sessions(tmp_path):
+    address = str(tmp_path / "yt.sock")
+    with ThreadingPlayerServer(address, VideoLibrary()) as server:
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            with socket.socket(socket.AF_UNIX) as client:
+                client.connect(address)
+                assert "welcome to YouTube" in _read_until_prompt(client)
+
+                client.sendall(b"SEARCH_VIDEOS dogs\n")
+                reply = _read_until_prompt(client)
+                assert "Here are the results for dogs:" in reply
+                client.sendall(b"1\n")
+                assert "Playing video: Funny Dogs" in _read_until_prompt(client)
+
+                client.sendall(b"PLAY funny_dogs_video_id\nSHOW_PLAYING\n"
+                               b"EXIT\n")
+                reply = client.makefile().read()
+                assert "Currently playing: Funny Dogs" in reply
+                assert "Thank you and goodbye!" in reply
+        finally:
+            server.shutdown()
+
+
+async def _read_reply(reader):
+    return (await reader.readuntil(PROMPT.encode())).decode()
+
+
+def test_async_server_serves_concurrent_sessions():
+    async def client(port, number):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        await _read_reply(reader)
+        writer.write(f"CREATE_PLAYLIST list_{number}\n"
+                     "SHOW_ALL_PLAYLISTS\n".encode())
+        await _read_reply(reader)
+        playlists = await _read_reply(reader)
+        writer.write(b"SEARCH_VIDEOS_WITH_TAG #dog\n1\nEXIT\n")
+        await _read_reply(reader)
+        search = await _read_reply(reader)
+        goodbye = (await reader.read()).decode()
+        writer.close()
+        return playlists, search, goodbye
+
+    async def main():
+        server = await start_server("127.0.0.1:0", VideoLibrary())
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            return await asyncio.gather(
+                *(client(port, number) for number in range(20)))
+
+    for number, (playlists, search, goodbye) in enumerate(asyncio.run(main())):
+        assert playlists.splitlines()[1:-1] == [f"list_{number}"]
+        assert "Playing video: Funny Dogs" in search
+        assert "Thank you and goodbye!" in goodbye
+
+
+def test_async_server_applies_backpressure(monkeypatch):
+    monkeypatch.setattr(player_server, "WRITE_BUFFER_LIMIT", 1024)
+    executed = []
+    execute = PlayerSession.execute
+    monkeypatch.setattr(PlayerSession, "execute",
+                        lambda session, line: executed.append(line)
+                        or execute(session, line))
+
+    async def main():
+        server = await start_server("127.0.0.1:0", VideoLibrary())
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            # Send far more commands than the socket buffers can hold the
+            # output of, and do not read any of it yet.
+            writer.write(b"HELP\n" * 20_000 + b"EXIT\n")
+            await asyncio.sleep(0.5)
+            stalled = len(executed)
+
+            reply = bytearray()
+            chunk = await reader.read(1 << 16)
+            while chunk:
+                reply += chunk
+                chunk = await reader.read(1 << 16)
+            writer.close()
+            return stalled, reply.decode()
+
+    stalled, reply = asyncio.run(main())
+    assert stalled < 20_000
+    assert len(executed) == 20_001
+    assert reply.count("Available commands:") == 20_000
+    assert reply.endswith("Thank you and goodbye!\n")
+
+
+def test_async_server_streams_long_listings_off_the_event_loop(
+        tmp_path, monkeypatch):
+    monkeypatch.setattr(player_server, "WRITE_BUFFER_LIMIT", 1 << 14)
+    catalog = tmp_path / "videos.txt"
+    tag = "#" + "long" * 100
+    catalog.write_text("".join(f"Video {number} | video_{number} | {tag}\n"
+                               for number in range(50_000)))
+    rendered = []
+    render = Video._render
+    monkeypatch.setattr(Video, "_render", lambda video, flag:
+                        rendered.append(video) or render(video, flag))
+
+    async def main():
+        server = await start_server("127.0.0.1:0", VideoLibrary(catalog))
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            await _read_reply(reader)
+            writer.write(b"SHOW_ALL_VIDEOS\n")
+            await asyncio.sleep(0.3)
+
+            # The listing waits on its client, and another client is served.
+            other_reader, other_writer = await asyncio.open_connection(
+                "127.0.0.1", port)
+            await _read_reply(other_reader)
+            other_writer.write(b"NUMBER_OF_VIDEOS\n")
+            count = await asyncio.wait_for(_read_reply(other_reader), 5)
+            stalled = len(rendered)
+
+            listing = bytearray()
+            while not listing.endswith(PROMPT.encode()):
+                listing += await reader.read(1 << 16)
+            other_writer.close()
+            writer.close()
+            return count, stalled, listing.decode()
+
+    count, stalled, listing = asyncio.run(main())
+    assert "50000 videos in the library" in count
+    assert stalled < 50_000
+    assert listing.count(tag) == 50_000
+
+
+def test_async_server_serves_others_while_more_clients_stall_than_workers(
+        tmp_path, monkeypatch):
+    monkeypatch.setattr(player_server, "WRITE_BUFFER_LIMIT", 1 << 14)
+    catalog = tmp_path / "videos.txt"
+    tag = "#" + "long" * 100
+    catalog.write_text("".join(f"Video {number} | video_{number} | {tag}\n"
+                               for number in range(20_000)))
+
+    async def main():
+        asyncio.get_running_loop().set_default_executor(
+            ThreadPoolExecutor(max_workers=2))
+        server = await start_server("127.0.0.1:0", VideoLibrary(catalog))
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            # Clients that ask for the whole catalog and never read it.
+            stalled = []
+            for _ in range(4):
+                reader, writer = await asyncio.open_connection(
+                    "127.0.0.1", port)
+                await _read_reply(reader)
+                writer.write(b"SHOW_ALL_VIDEOS\n")
+                stalled.append(writer)
+            await asyncio.sleep(0.3)
+
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            await _read_reply(reader)
+            writer.write(b"NUMBER_OF_VIDEOS\n")
+            count = await asyncio.wait_for(_read_reply(reader), 5)
+            for stalled_writer in [*stalled, writer]:
+                stalled_writer.close()
+            return count
+
+    assert "20000 videos in the library" in asyncio.run(main())
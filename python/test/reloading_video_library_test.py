@@ -0,0 +1,140 @@
+import csv
+import os
+import shutil
+import time
+
+import pytest
+
+from src.reloading_video_library import ReloadingVideoLibrary
+from src.video import Video
+from src.video_index import VideoIndex
+from src.video_library import DEFAULT_VIDEO_FILE, ReadOnlyLibraryError
+
+
+@pytest.fixture
+def video_file(tmp_path):
+    path = tmp_path / "videos.txt"
+    shutil.copy(DEFAULT_VIDEO_FILE, path)
+    return path
+
+
+def _rewrite(path, text):
+    path.write_text(text)
+    # Some file systems keep mtimes coarse, make sure this one moves.
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_reload_swaps_in_the_changed_catalog(video_file):
+    library = ReloadingVideoLibrary(video_file)
+    cats = library.get_video("amazing_cats_video_id")
+    dogs = library.get_video("funny_dogs_video_id")
+    cats.flagVideo("dont_like_cats")
+    dogs.flagVideo("dont_like_dogs")
+    old = library.snapshot
+    listing = library.iter_sorted_videos()
+    next(listing)
+
+    catalog = video_file.read_text().replace("Funny Dogs", "Funnier Dogs")
+    _rewrite(video_file, catalog + "\nBaby Goats | goats_video_id | #goat\n")
+
+    assert library.reload()
+    assert not library.reload()
+    assert library.snapshot is not old
+    assert len(library) == 6 and len(old) == 5
+    assert library.get_video("amazing_cats_video_id") is cats
+    assert library.get_video("amazing_cats_video_id").flagged
+    new_dogs = library.get_video("funny_dogs_video_id")
+    assert new_dogs is not dogs
+    assert new_dogs.title == "Funnier Dogs"
+    assert new_dogs.flagReason == "dont_like_dogs"
+    assert [video.title for video in library.search_videos("dogs")] == [
+        "Funnier Dogs"]
+    assert [video.title for video in library.search_videos_with_tag(
+        "#goat")] == ["Baby Goats"]
+    # A listing started before the reload ends on the old catalog.
+    assert [video.title for video in listing] == [
+        "Another Cat Video", "Funny Dogs", "Life at Google",
+        "Video about nothing"]
+
+
+def test_catalog_changed_during_reload_is_read_again(video_file, tmp_path,
+                                                    monkeypatch):
+    index_path = tmp_path / "videos.txt.search"
+    library = ReloadingVideoLibrary(video_file, index_path)
+    load = VideoIndex.load
+    _rewrite(video_file, "Baby Goats | goats_video_id | #goat\n")
+
+    def load_after_rewrite(path, catalog_stamp):
+        _rewrite(video_file, "Cat Naps | cat_naps_video_id | #cat\n")
+        return load(path, catalog_stamp)
+    monkeypatch.setattr(VideoIndex, "load", load_after_rewrite)
+    assert not library.reload()
+    monkeypatch.setattr(VideoIndex, "load", load)
+
+    assert library.reload()
+    assert [video.title for video in library.search_videos_with_tag(
+        "#cat")] == ["Cat Naps"]
+    assert library.search_videos_with_tag("#goat") == []
+
+
+def test_unreadable_catalog_keeps_the_snapshot(video_file):
+    library = ReloadingVideoLibrary(video_file)
+    old = library.snapshot
+    _rewrite(video_file, "Broken | row\n")
+
+    with pytest.raises(ValueError):
+        library.reload()
+    assert not library.reload()
+    assert library.snapshot is old
+    assert len(library) == 5
+
+
+def test_catalog_the_csv_reader_rejects_keeps_the_watcher(video_file,
+                                                         capfd):
+    library = ReloadingVideoLibrary(video_file)
+    too_long = "x" * (csv.field_size_limit() + 1)
+    _rewrite(video_file, f"Long | {too_long} |\n")
+
+    with pytest.raises(csv.Error):
+        library.reload()
+    assert not library.reload()
+
+    library.start_watching(interval=0.01)
+    try:
+        _rewrite(video_file, f"Longer | {too_long}x |\n")
+        deadline = time.monotonic() + 5
+        while "Cannot reload" not in capfd.readouterr().err:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        _rewrite(video_file, "Baby Goats | goats_video_id | #goat\n")
+        while len(library) != 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        library.stop_watching()
+
+    assert library.get_video("goats_video_id").title == "Baby Goats"
+
+
+def test_watching_reloads_in_the_background(video_file):
+    library = ReloadingVideoLibrary(video_file)
+    library.start_watching(interval=0.01)
+    try:
+        _rewrite(video_file, "Baby Goats | goats_video_id | #goat\n")
+        deadline = time.monotonic() + 5
+        while len(library) != 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        library.stop_watching()
+
+    assert library.get_video("goats_video_id").title == "Baby Goats"
+    assert library.get_video("amazing_cats_video_id") is None
+
+
+def test_reloading_library_is_read_only(video_file):
+    library = ReloadingVideoLibrary(video_file)
+
+    with pytest.raises(ReadOnlyLibraryError):
+        library.add_video(Video("Baby Goats", "goats_video_id", ["#goat"]))
+    with pytest.raises(ReadOnlyLibraryError):
+        library.remove_video("amazing_cats_video_id")
@@ -0,0 +1,85 @@
+import asyncio
+import io
+import shutil
+
+import pytest
+
+from src import run
+from src.command_parser import CommandParser
+from src.run import main, run_script, serve
+from src.video_library import DEFAULT_VIDEO_FILE, VideoLibrary
+from src.video_output import ListSink
+from src.video_player import VideoPlayer
+
+
+def test_run_script():
+    script = io.StringIO("PLAY amazing_cats_video_id\n"
+                         "SEARCH_VIDEOS dogs\n"
+                         "1\n"
+                         "PLAY\n"
+                         "EXIT\n"
+                         "STOP\n")
+    output = ListSink()
+    executed = run_script(
+        CommandParser(VideoPlayer(output=output)), script, output)
+    lines = output.lines
+
+    assert executed == 4
+    assert len(lines) == 7
+    assert "Playing video: Amazing Cats" in lines[0]
+    assert "Here are the results for dogs:" in lines[1]
+    assert "Playing video: Funny Dogs" in lines[5]
+    assert "Please enter PLAY command followed by video_id." in lines[6]
+
+
+def test_serve_answers_until_cancelled():
+    async def main():
+        task = asyncio.create_task(serve("127.0.0.1:0", VideoLibrary()))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(main())
+
+
+@pytest.fixture
+def video_file(tmp_path, monkeypatch):
+    # main() saves the search index next to the catalog, so it gets a copy.
+    path = tmp_path / "videos.txt"
+    shutil.copy(DEFAULT_VIDEO_FILE, path)
+    monkeypatch.setattr(run, "DEFAULT_VIDEO_FILE", path)
+    return path
+
+
+def test_script_runs_are_repeatable_without_state(tmp_path, video_file,
+                                                   monkeypatch, capfd):
+    script = tmp_path / "commands.txt"
+    script.write_text("CREATE_PLAYLIST my_playlist\n"
+                      "FLAG_VIDEO amazing_cats_video_id\n"
+                      "SHOW_ALL_PLAYLISTS\n")
+    monkeypatch.setattr("sys.argv", ["run.py", "--script", str(script)])
+
+    main()
+    first, _ = capfd.readouterr()
+    main()
+    second, _ = capfd.readouterr()
+
+    assert "Successfully created new playlist: my_playlist" in first
+    assert second == first
+    assert (tmp_path / "videos.txt.search").exists()
+
+
+@pytest.mark.parametrize("arguments", [
+    ["--threads"],
+    ["--threads", "--script", "-"],
+    ["--serve", "127.0.0.1:0", "--state", "player.journal"],
+])
+def test_main_rejects_options_that_do_nothing(video_file, monkeypatch,
+                                               capfd, arguments):
+    monkeypatch.setattr("sys.argv", ["run.py", *arguments])
+
+    with pytest.raises(SystemExit) as exit_info:
+        main()
+    assert exit_info.value.code == 2
+    assert "--" in capfd.readouterr().err
@@ -0,0 +1,47 @@
+import threading
+
+from src.rw_lock import ReadWriteLock
+
+
+def test_readers_share_the_lock():
+    lock = ReadWriteLock()
+    both_reading = threading.Barrier(2, timeout=5)
+
+    def read():
+        with lock.read():
+            both_reading.wait()
+
+    thread = threading.Thread(target=read)
+    thread.start()
+    read()
+    thread.join()
+
+
+def test_writer_excludes_readers_and_goes_first():
+    lock = ReadWriteLock()
+    events = []
+    writer_waiting = threading.Event()
+
+    def write():
+        writer_waiting.set()
+        with lock.write():
+            events.append("write")
+
+    def read():
+        with lock.read():
+            events.append("read")
+
+    with lock.read():
+        writer = threading.Thread(target=write)
+        writer.start()
+        writer_waiting.wait()
+        while not lock._waiting_writers:
+            pass
+        reader = threading.Thread(target=read)
+        reader.start()
+        reader.join(0.05)
+        assert events == []
+    writer.join()
+    reader.join()
+
+    assert events == ["write", "read"]
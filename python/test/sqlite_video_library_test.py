@@ -0,0 +1,135 @@
+import threading
+
+import pytest
+
+from src.sqlite_video_library import SqlitePlayerStore, SqliteVideoLibrary
+from src.video import Video
+from src.video_library import DEFAULT_VIDEO_FILE
+from src.video_player import VideoPlayer
+
+
+@pytest.fixture
+def database(tmp_path):
+    return tmp_path / "videos.db"
+
+
+def _player(database, output=None):
+    library = SqliteVideoLibrary(database, DEFAULT_VIDEO_FILE)
+    store = SqlitePlayerStore(library)
+    return VideoPlayer(library, output, store, store.playlists), library
+
+
+def test_sqlite_library_has_all_videos(database):
+    library = SqliteVideoLibrary(database, DEFAULT_VIDEO_FILE)
+    titles = [video.title for video in library.get_sorted_videos()]
+
+    assert len(library) == 5
+    assert titles == ["Amazing Cats", "Another Cat Video", "Funny Dogs",
+                      "Life at Google", "Video about nothing"]
+    assert library.get_sorted_videos()[-1].title == "Video about nothing"
+    assert library.get_video("amazing_cats_video_id").tags == (
+        "#cat", "#animal")
+    assert library.get_video("nothing_video_id").tags == ()
+    assert library.get_video("does_not_exist") is None
+    assert (library.get_video("funny_dogs_video_id")
+            is library.get_video("funny_dogs_video_id"))
+
+
+def test_sqlite_library_searches(database):
+    library = SqliteVideoLibrary(database, DEFAULT_VIDEO_FILE)
+
+    assert [video.title for video in library.search_videos("CAT")] == [
+        "Amazing Cats", "Another Cat Video"]
+    assert [video.title for video in library.search_videos_with_tag(
+        "#ANIMAL")] == ["Amazing Cats", "Another Cat Video", "Funny Dogs"]
+    assert [video.title for video in library.search_videos_with_tag_query(
+        "#animal AND NOT (#cat OR #google)")] == ["Funny Dogs"]
+    assert [video.title for video in library.search_videos_with_tag_query(
+        "NOT #animal")] == ["Life at Google", "Video about nothing"]
+
+
+def test_sqlite_library_add_remove_and_resume(database):
+    library = SqliteVideoLibrary(database, DEFAULT_VIDEO_FILE)
+    library.add_video(Video("Baby Cats", "baby_cats_video_id", ["#cat"]))
+    library.remove_video("funny_dogs_video_id")
+    library.close()
+
+    library = SqliteVideoLibrary(database)
+    assert len(library) == 5
+    resumed = library.iter_sorted_videos(("Another Cat Video",
+                                          "another_cat_video_id"))
+    assert [video.title for video in resumed] == [
+        "Baby Cats", "Life at Google", "Video about nothing"]
+    assert [video.title for video in library.search_videos_with_tag(
+        "#cat")] == ["Amazing Cats", "Another Cat Video", "Baby Cats"]
+
+
+def test_player_state_is_kept_in_database(database, capfd):
+    player, library = _player(database)
+    player.create_playlist("My_Playlist")
+    player.add_many_to_playlist("my_playlist", "life_at_google_video_id",
+                                "amazing_cats_video_id",
+                                "funny_dogs_video_id")
+    player.remove_from_playlist("my_playlist", "amazing_cats_video_id")
+    player.flag_video("funny_dogs_video_id", "dont_like_dogs")
+    library.close()
+    capfd.readouterr()
+
+    player, library = _player(database)
+    player.show_all_playlists()
+    player.show_playlist("MY_PLAYLIST")
+    player.add_to_playlist("my_playlist", "life_at_google_video_id")
+    player.play_video("funny_dogs_video_id")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 7
+    assert "My_Playlist" in lines[1]
+    assert "Showing playlist: MY_PLAYLIST" in lines[2]
+    assert "Life at Google (life_at_google_video_id) [#google #career]" in lines[3]
+    assert ("Funny Dogs (funny_dogs_video_id) [#dog #animal] - FLAGGED "
+            "(reason: dont_like_dogs)") in lines[4]
+    assert "Cannot add video to my_playlist: Video already added" in lines[5]
+    assert ("Cannot play video: Video is currently flagged "
+            "(reason: dont_like_dogs)") in lines[6]
+
+
+def test_sqlite_library_is_shared_by_threads(database):
+    _, library = _player(database)
+    errors = []
+
+    def use_library(number):
+        try:
+            for _ in range(50):
+                library.add_video(Video(f"Cat {number}", f"cat_{number}",
+                                        ["#cat"]))
+                assert library.get_video(f"cat_{number}") is not None
+                library.search_videos_with_tag("#cat")
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=use_library, args=(number,))
+               for number in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(library) == 9
+    assert len(library.search_videos_with_tag("#cat")) == 6
+
+
+def test_sqlite_import_keeps_the_last_row_of_a_video(database, tmp_path):
+    catalog = tmp_path / "videos.txt"
+    catalog.write_text("Cats | cats_id | #cat , #pet\n"
+                       "Dogs | dogs_id |\n"
+                       "More Cats | cats_id | #Cat\n")
+    library = SqliteVideoLibrary(database, catalog)
+
+    assert len(library) == 2
+    assert library.get_video("cats_id").title == "More Cats"
+    assert library.get_video("cats_id").tags == ("#Cat",)
+    assert library.get_video("dogs_id").tags == ()
+    assert library.search_videos_with_tag("#pet") == []
+    assert [video.title for video in library.search_videos_with_tag(
+        "#cat")] == ["More Cats"]
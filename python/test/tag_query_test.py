@@ -0,0 +1,28 @@
+import pytest
+
+from src.tag_query import TagQueryError, parse_tag_query
+
+
+def test_parse_single_tag():
+    assert parse_tag_query("#cat") == ("tag", "#cat")
+
+
+def test_parse_operator_precedence():
+    query = parse_tag_query("#cat and #animal OR not #dog")
+
+    assert query == ("or", [("and", [("tag", "#cat"), ("tag", "#animal")]),
+                            ("not", ("tag", "#dog"))])
+
+
+def test_parse_parentheses():
+    query = parse_tag_query("#cat AND (#animal OR #pet)")
+
+    assert query == ("and", [("tag", "#cat"),
+                             ("or", [("tag", "#animal"), ("tag", "#pet")])])
+
+
+@pytest.mark.parametrize("text", ["", "#cat AND", "(#cat", "#cat)",
+                                  "#cat #dog", "OR #cat"])
+def test_parse_invalid_queries(text):
+    with pytest.raises(TagQueryError):
+        parse_tag_query(text)
@@ -0,0 +1,31 @@
+import pytest
+
+from src.video import Video
+from src.video_catalog import (catalog_rows, position_after, sort_key,
+                               video_from_row)
+
+
+def test_catalog_rows_strip_fields_and_tags():
+    rows = list(catalog_rows(["Amazing Cats | amazing_cats_video_id |  #cat , "
+                              "#animal\n",
+                              "Video about nothing | nothing_video_id |\n"]))
+
+    assert rows == [
+        ("Amazing Cats", "amazing_cats_video_id", ["#cat", "#animal"]),
+        ("Video about nothing", "nothing_video_id", [])]
+    assert video_from_row(rows[0]).tags == ("#cat", "#animal")
+
+
+def test_catalog_rows_reject_rows_missing_fields():
+    with pytest.raises(ValueError):
+        list(catalog_rows(["Broken | row\n"]))
+
+
+def test_position_after_follows_sort_key():
+    videos = sorted([Video("b", "2", []), Video("B", "1", []),
+                     Video("a", "3", [])], key=sort_key)
+
+    assert [video.video_id for video in videos] == ["3", "1", "2"]
+    assert position_after(videos, ("b", "1")) == 2
+    assert position_after(videos, ("a", "4")) == 1
+    assert position_after(videos, ("c", "")) == 3
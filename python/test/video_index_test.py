@@ -0,0 +1,98 @@
+from src.tag_query import parse_tag_query
+from src.video import Video
+from src.video_index import VideoIndex
+
+
+def test_title_candidates_contain_all_matches():
+    index = VideoIndex()
+    index.add(Video("Amazing Cats", "amazing_cats_video_id", []))
+    index.add(Video("Funny Dogs", "funny_dogs_video_id", []))
+
+    assert index.title_candidates("zing c") == ["amazing_cats_video_id"]
+    assert index.title_candidates("FUNNY") == ["funny_dogs_video_id"]
+    assert index.title_candidates("birds") == []
+
+
+def test_title_candidates_need_a_long_enough_term():
+    index = VideoIndex()
+    index.add(Video("Amazing Cats", "amazing_cats_video_id", []))
+
+    assert index.title_candidates("ca") is None
+
+
+def test_title_candidates_skip_removed_videos():
+    index = VideoIndex()
+    index.add(Video("Amazing Cats", "amazing_cats_video_id", []))
+    index.remove("amazing_cats_video_id")
+
+    assert index.title_candidates("cats") == []
+
+
+def test_tag_video_ids_ignore_case():
+    index = VideoIndex()
+    index.add(Video("Amazing Cats", "amazing_cats_video_id", ["#Cat"]))
+    index.add(Video("Funny Dogs", "funny_dogs_video_id", ["#dog"]))
+    index.remove("funny_dogs_video_id")
+
+    assert index.tag_video_ids("#CAT") == ["amazing_cats_video_id"]
+    assert index.tag_video_ids("#dog") == []
+
+
+def test_tag_query_video_ids():
+    index = VideoIndex()
+    for number in range(100):
+        tags = [f"#div{divisor}" for divisor in (2, 3, 5)
+                if number % divisor == 0]
+        index.add(Video(f"Video {number}", f"video_{number}_id", tags))
+    index.remove("video_30_id")
+    query = parse_tag_query("#div2 AND #div3 AND NOT #div5 OR #DIV5 AND #div3")
+
+    assert index.tag_query_video_ids(query) == [
+        f"video_{number}_id" for number in range(100)
+        if number % 3 == 0 and (number % 2 == 0 or number % 5 == 0)
+        and number != 30]
+
+
+def test_saved_index_round_trips(tmp_path):
+    path = tmp_path / "videos.txt.search"
+    index = VideoIndex()
+    index.add(Video("Amazing Cats", "amazing_cats_video_id", ["#Cat"]))
+    index.add(Video("Funny Dogs", "funny_dogs_video_id", ["#dog"]))
+    index.remove("funny_dogs_video_id")
+    index.save(path, (10, 20))
+
+    loaded, unchanged = VideoIndex.load(path, (10, 20))
+    assert unchanged
+    assert loaded.title_candidates("cats") == ["amazing_cats_video_id"]
+    assert loaded.tag_video_ids("#cat") == ["amazing_cats_video_id"]
+    assert loaded.tag_video_ids("#dog") == []
+    assert not VideoIndex.load(path, (10, 21))[1]
+
+
+def test_unreadable_saved_index_is_ignored(tmp_path):
+    path = tmp_path / "videos.txt.search"
+    index = VideoIndex()
+    index.add(Video("Amazing Cats", "amazing_cats_video_id", ["#cat"]))
+    index.save(path, (10, 20))
+    saved = path.read_bytes()
+
+    for data in (b"", b"\x80\x05garbage", saved[:-3],
+                 saved.replace(b'"#cat"', b'["#c"]')):
+        path.write_bytes(data)
+        assert VideoIndex.load(path, (10, 20)) == (None, False)
+
+
+def test_removed_videos_do_not_pile_up():
+    index = VideoIndex()
+    for number in range(10):
+        index.add(Video(f"Video {number}", f"video_{number}_id", ["#tag"]))
+    for edit in range(100):
+        number = edit % 10
+        index.add(Video(f"Edit {edit}", f"video_{number}_id", ["#tag"]))
+    index.remove("video_0_id")
+
+    assert len(index._video_ids) <= 2 * 9
+    assert index.title_candidates("edit 99") == ["video_9_id"]
+    assert index.title_candidates("video") == []
+    assert sorted(index.tag_query_video_ids(parse_tag_query(
+        "NOT #other"))) == [f"video_{number}_id" for number in range(1, 10)]
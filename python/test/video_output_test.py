@@ -0,0 +1,57 @@
+import io
+
+from src.video_output import CallbackSink, DeferredSink, ListSink, StreamSink
+from src.video_player import VideoPlayer
+
+
+def test_stream_sink_writes_in_chunks():
+    stream = io.StringIO()
+    sink = StreamSink(stream, buffer_size=10)
+    sink.write("abc")
+    sink.write("def")
+    assert stream.getvalue() == ""
+
+    sink.write("ghi")
+    sink.write("j")
+    assert stream.getvalue() == "abc\ndef\nghi\n"
+
+    sink.flush()
+    assert stream.getvalue() == "abc\ndef\nghi\nj\n"
+
+
+def test_player_writes_to_list_sink(capfd):
+    sink = ListSink()
+    player = VideoPlayer(output=sink)
+    player.play_video("amazing_cats_video_id")
+    player.stop_video()
+    out, err = capfd.readouterr()
+
+    assert out == ""
+    assert sink.lines == ["Playing video: Amazing Cats",
+                          "Stopping video: Amazing Cats"]
+
+
+def test_player_writes_to_callback_sink():
+    lines = []
+    player = VideoPlayer(output=CallbackSink(lines.append))
+    player.number_of_videos()
+
+    assert lines == ["5 videos in the library"]
+
+
+def test_deferred_sink_renders_as_lines_are_taken():
+    sink = DeferredSink()
+    player = VideoPlayer(output=sink)
+    sink.write("Hello")
+    player.show_all_videos()
+    player.number_of_videos()
+
+    assert sink.take(20) == (
+        "Hello\nHere's a list of all available videos:\n")
+    assert sink.take(1) == (
+        "Amazing Cats (amazing_cats_video_id) [#cat #animal]\n")
+    rest = sink.take(1 << 16)
+    assert rest.endswith("\n5 videos in the library\n")
+    assert len(rest.splitlines()) == 5
+    assert sink.take(1 << 16) == ""
+    assert not sink.pending
@@ -0,0 +1,56 @@
+from src.video import Video
+from src.video_playlist import Playlist, PlaylistRegistry
+
+
+def test_playlist_keeps_order_and_membership():
+    playList = Playlist("my_playlist")
+    videos = [Video(f"Video {i}", f"video_{i}_id", []) for i in range(5)]
+    for video in reversed(videos):
+        playList.addToPlaylist(video)
+
+    playList.removeFromPlaylist(videos[2])
+    assert "video_2_id" not in playList
+    assert playList.get("video_3_id") is videos[3]
+    assert len(playList) == 4
+    assert [video.video_id for video in playList.getPlayList()] == [
+        "video_4_id", "video_3_id", "video_1_id", "video_0_id"]
+
+    playList.addToPlaylist(videos[2])
+    assert list(playList.getPlayList())[-1] is videos[2]
+
+
+def test_playlist_iter_after_resumes_past_removed_videos():
+    playList = Playlist("my_playlist")
+    videos = [Video(f"Video {i}", f"video_{i}_id", []) for i in range(6)]
+    playList.addManyToPlaylist(videos)
+    page = list(playList.iter_after())[:2]
+    last, _ = page[-1]
+
+    playList.removeManyFromPlaylist(videos[:4])
+    playList.addToPlaylist(videos[0])
+    assert len(playList._order) <= 2 * len(playList)
+    assert [video.video_id for _, video in playList.iter_after(last)] == [
+        "video_4_id", "video_5_id", "video_0_id"]
+
+
+def test_registry_ignores_case():
+    playlists = PlaylistRegistry()
+    created = playlists.create("My_Playlist")
+
+    assert created.title == "My_Playlist"
+    assert playlists.get("my_playlist") is created
+    assert "MY_PLAYLIST" in playlists
+    assert playlists.create("MY_playlist") is None
+    assert len(playlists) == 1
+
+
+def test_registry_keeps_names_sorted():
+    playlists = PlaylistRegistry()
+    for name in ["delta", "Alpha", "charlie", "BRAVO"]:
+        playlists.create(name)
+    assert playlists.names() == ["Alpha", "BRAVO", "charlie", "delta"]
+
+    assert playlists.remove("bravo").title == "BRAVO"
+    assert playlists.remove("bravo") is None
+    playlists.create("echo")
+    assert playlists.names() == ["Alpha", "charlie", "delta", "echo"]
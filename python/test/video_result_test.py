@@ -0,0 +1,91 @@
+from src.result_renderer import render
+from src.video_output import NullSink
+from src.video_player import VideoPlayer
+from src.video_result import Action, ErrorCode, Result, Status
+
+
+def test_play_returns_result(capfd):
+    player = VideoPlayer(output=NullSink())
+    result = player.play_video("amazing_cats_video_id")
+    out, err = capfd.readouterr()
+
+    assert out == ""
+    assert result.action is Action.PLAY
+    assert result.status is Status.OK
+    assert result.error is None
+    assert result.video.video_id == "amazing_cats_video_id"
+    assert list(result.stopped) == []
+
+
+def test_play_reports_stopped_videos():
+    player = VideoPlayer(output=NullSink())
+    player.play_video("amazing_cats_video_id")
+    result = player.play_video("life_at_google_video_id")
+
+    assert [video.title for video in result.stopped] == ["Amazing Cats"]
+    assert result.video.title == "Life at Google"
+
+
+def test_errors_have_codes():
+    player = VideoPlayer(output=NullSink())
+
+    result = player.play_video("does_not_exist")
+    assert result.status is Status.ERROR
+    assert result.error is ErrorCode.VIDEO_NOT_FOUND
+
+    assert player.stop_video().error is ErrorCode.NOTHING_PLAYING
+    assert player.pause_video().error is ErrorCode.NOTHING_PLAYING
+
+    player.create_playlist("my_PLAYlist")
+    result = player.create_playlist("MY_playlist")
+    assert result.error is ErrorCode.PLAYLIST_EXISTS
+    assert result.playlist == "MY_playlist"
+
+    result = player.add_to_playlist("another_playlist",
+                                    "amazing_cats_video_id")
+    assert result.error is ErrorCode.PLAYLIST_NOT_FOUND
+
+
+def test_flag_playing_video_reports_stop():
+    player = VideoPlayer(output=NullSink())
+    player.play_video("amazing_cats_video_id")
+    result = player.flag_video("amazing_cats_video_id", "dont_like_cats")
+
+    assert result.status is Status.OK
+    assert result.reason == "dont_like_cats"
+    assert [video.title for video in result.stopped] == ["Amazing Cats"]
+    assert player.play_video("amazing_cats_video_id").error is (
+        ErrorCode.VIDEO_FLAGGED)
+
+
+def test_invalid_tag_query_result():
+    player = VideoPlayer(output=NullSink())
+    result = player.search_videos_with_tags("#cat AND")
+
+    assert result.error is ErrorCode.INVALID_QUERY
+    assert result.reason == "Query ends unexpectedly"
+
+
+def test_search_leaves_selection_pending():
+    player = VideoPlayer(output=NullSink())
+    result = player.search_videos("cat")
+
+    assert result.action is Action.SEARCH_VIDEOS
+    assert [video.title for video in result.videos] == [
+        "Amazing Cats", "Another Cat Video"]
+    assert player.pendingSelection == list(result.videos)
+
+    result = player.select_search_result("2")
+    assert result.action is Action.PLAY_SEARCH_RESULT
+    assert result.video.title == "Another Cat Video"
+    assert player.pendingSelection is None
+    assert player.select_search_result("1").video is None
+
+
+def test_render_result():
+    player = VideoPlayer(output=NullSink())
+    result = player.show_playing()
+
+    assert list(render(result)) == ["No video is currently playing"]
+    assert list(render(Result(Action.NUMBER_OF_VIDEOS, count=3))) == [
+        "3 videos in the library"]
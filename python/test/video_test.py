@@ -0,0 +1,117 @@
+import threading
+import time
+
+from src.video import Video
+from src.video_library import VideoLibrary
+from src.video_output import NullSink
+from src.video_player import VideoPlayer
+from src.video_result import Status
+
+
+def test_video_properties():
+    video = Video("Amazing Cats", "amazing_cats_video_id", ["#cat", "#animal"])
+
+    assert video.title == "Amazing Cats"
+    assert video.video_id == "amazing_cats_video_id"
+    assert video.tags == ("#cat", "#animal")
+    assert not video.flagged
+
+
+def test_video_has_no_instance_dict():
+    video = Video("Amazing Cats", "amazing_cats_video_id", ["#cat"])
+
+    assert not hasattr(video, "__dict__")
+
+
+def test_videos_share_tags():
+    cats = Video("Amazing Cats", "amazing_cats_video_id",
+                 ["".join(["#c", "at"]), "#animal"])
+    more_cats = Video("Another Cat Video", "another_cat_video_id",
+                      ["#cat", "#animal"])
+    dogs = Video("Funny Dogs", "funny_dogs_video_id", ["#dog", "#animal"])
+
+    assert cats.tags is more_cats.tags
+    assert cats.tags[1] is dogs.tags[1]
+
+
+def test_video_str_is_updated_by_flags():
+    video = Video("Amazing Cats", "amazing_cats_video_id", ["#cat", "#animal"])
+    assert str(video) == "Amazing Cats (amazing_cats_video_id) [#cat #animal]"
+
+    video.flagVideo("dont_like_cats")
+    assert str(video) == ("Amazing Cats (amazing_cats_video_id) "
+                          "[#cat #animal] - FLAGGED (reason: dont_like_cats)")
+
+    video.allowVideo()
+    assert str(video) == "Amazing Cats (amazing_cats_video_id) [#cat #animal]"
+
+
+def test_cached_video_str_lists_faster():
+    videos = [Video(f"Video {i}", f"video_{i}_id", ["#cat", "#animal"])
+              for i in range(20_000)]
+
+    def listing_time(render):
+        # The best of a few runs, to keep scheduling noise out.
+        times = []
+        for _ in range(5):
+            start = time.perf_counter()
+            for video in videos:
+                render(video)
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    # Rendering every time is how __str__ worked before caching the line.
+    uncached = listing_time(lambda video: video._render(video._flag))
+    cached = listing_time(str)
+    print(f"listing {len(videos)} videos: {len(videos) / uncached:.0f} "
+          f"lines/sec uncached, {len(videos) / cached:.0f} lines/sec cached")
+
+    assert cached < uncached
+
+
+class _RecordedChanges(list):
+    """A journal that only remembers the changes recorded."""
+
+    def recover(self):
+        return [], {}
+
+    def record(self, change, *arguments):
+        self.append((change, *arguments))
+
+
+class _SlowlyReadVideo(Video):
+    """A video whose flag takes a while to read, so a check of the flag and
+    the flagging that follows it are far apart.
+    """
+
+    @property
+    def flagged(self):
+        flagged = super().flagged
+        time.sleep(0.01)
+        return flagged
+
+
+def test_racing_flag_video_calls_flag_once():
+    library = VideoLibrary()
+    library.add_video(_SlowlyReadVideo("Baby Goats", "goats_video_id",
+                                       ["#goat"]))
+    journal = _RecordedChanges()
+    players = [VideoPlayer(library, NullSink(), journal) for _ in range(2)]
+    start = threading.Barrier(len(players))
+    results = []
+
+    def flag(player, reason):
+        start.wait()
+        results.append(player.flag_video("goats_video_id", reason))
+
+    threads = [threading.Thread(target=flag, args=(player, f"reason_{i}"))
+               for i, player in enumerate(players)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    flagged = [result for result in results if result.status == Status.OK]
+    assert len(flagged) == 1
+    assert library.get_video("goats_video_id").flagReason == flagged[0].reason
+    assert journal == [("flag", "goats_video_id", flagged[0].reason)]
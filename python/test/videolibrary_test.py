@@ -1,4 +1,9 @@
-from src.video_library import VideoLibrary
+import shutil
+import threading
+
+from src.video import Video
+from src.video_index import VideoIndex
+from src.video_library import DEFAULT_VIDEO_FILE, VideoLibrary
 
 
 def test_library_has_all_videos():
@@ -24,3 +29,189 @@ def test_parses_video_correctly_without_tags():
     assert video.title == "Video about nothing"
     assert video.video_id == "nothing_video_id"
     assert video.tags == ()
+
+
+def test_sorted_videos_are_ordered_by_title():
+    library = VideoLibrary()
+    titles = [video.title for video in library.get_sorted_videos()]
+
+    assert titles == ["Amazing Cats", "Another Cat Video", "Funny Dogs",
+                      "Life at Google", "Video about nothing"]
+
+
+def test_sorted_videos_keep_videos_sharing_a_title():
+    library = VideoLibrary()
+    library.add_video(Video("amazing cats", "cats_again_video_id", []))
+    sorted_ids = [video.video_id for video in library.get_sorted_videos()]
+
+    assert sorted_ids[:2] == ["amazing_cats_video_id", "cats_again_video_id"]
+    assert len(sorted_ids) == 6
+
+
+def test_sorted_videos_follow_added_and_removed_videos():
+    library = VideoLibrary()
+    library.get_sorted_videos()
+    library.add_video(Video("Baby Goats", "goats_video_id", ["#goat"]))
+    removed = library.remove_video("funny_dogs_video_id")
+    titles = [video.title for video in library.get_sorted_videos()]
+
+    assert removed.title == "Funny Dogs"
+    assert library.get_video("funny_dogs_video_id") is None
+    assert titles == ["Amazing Cats", "Another Cat Video", "Baby Goats",
+                      "Life at Google", "Video about nothing"]
+    assert len(library) == 5
+
+
+def test_search_videos_by_title():
+    library = VideoLibrary()
+    titles = [video.title for video in library.search_videos("CAT")]
+
+    assert titles == ["Amazing Cats", "Another Cat Video"]
+    assert [video.title for video in library.search_videos("at")] == [
+        "Amazing Cats", "Another Cat Video", "Life at Google"]
+    assert library.search_videos("blah") == []
+
+
+def test_search_videos_follows_added_and_removed_videos():
+    library = VideoLibrary()
+    library.add_video(Video("Cat Naps", "cat_naps_video_id", ["#cat"]))
+    library.remove_video("amazing_cats_video_id")
+    titles = [video.title for video in library.search_videos("cat")]
+
+    assert titles == ["Another Cat Video", "Cat Naps"]
+
+
+def test_search_videos_with_tag():
+    library = VideoLibrary()
+    titles = [video.title for video in library.search_videos_with_tag("#CAT")]
+
+    assert titles == ["Amazing Cats", "Another Cat Video"]
+    assert library.search_videos_with_tag("#cat #animal") == []
+    assert library.search_videos_with_tag("#blah") == []
+
+
+def test_search_videos_with_tag_follows_added_and_removed_videos():
+    library = VideoLibrary()
+    library.add_video(Video("Cat Naps", "cat_naps_video_id", ["#Cat"]))
+    library.remove_video("another_cat_video_id")
+    titles = [video.title for video in library.search_videos_with_tag("#cat")]
+
+    assert titles == ["Amazing Cats", "Cat Naps"]
+
+
+def test_search_index_is_saved_and_reloaded(tmp_path, monkeypatch):
+    video_file = tmp_path / "videos.txt"
+    shutil.copy(DEFAULT_VIDEO_FILE, video_file)
+    index_path = tmp_path / "videos.txt.search"
+    VideoLibrary(video_file, index_path)
+
+    def build(videos):
+        raise AssertionError("the saved index should be reused")
+    monkeypatch.setattr(VideoIndex, "build", build)
+    library = VideoLibrary(video_file, index_path)
+
+    assert index_path.exists()
+    assert len(library.search_videos("cat")) == 2
+
+
+def test_search_index_is_patched_when_catalog_changes(tmp_path, monkeypatch):
+    video_file = tmp_path / "videos.txt"
+    rows = [f"Video {number} | video_{number}_id | #tag{number}"
+            for number in range(50)]
+    video_file.write_text("\n".join(rows))
+    index_path = tmp_path / "videos.txt.search"
+    VideoLibrary(video_file, index_path)
+
+    rows[3] = "Cat Video | video_3_id | #cat"
+    video_file.write_text("\n".join(rows[:-1]))
+    monkeypatch.setattr(VideoIndex, "build", None)
+    library = VideoLibrary(video_file, index_path)
+
+    assert [video.video_id for video in library.search_videos("cat")] == [
+        "video_3_id"]
+    assert library.search_videos_with_tag("#tag3") == []
+    assert library.search_videos_with_tag("#tag49") == []
+    assert len(library.search_videos_with_tag("#tag4")) == 1
+
+
+def test_patched_search_index_does_not_grow_across_restarts(tmp_path):
+    video_file = tmp_path / "videos.txt"
+    rows = [f"Video {number} | video_{number}_id | #tag{number}"
+            for number in range(100)]
+    index_path = tmp_path / "videos.txt.search"
+    for start in range(60):
+        for number in range(5 * start, 5 * start + 5):
+            rows[number % 100] = (f"Edit {start} | video_{number % 100}_id | "
+                                  f"#tag{number % 100}")
+        video_file.write_text("\n".join(rows))
+        library = VideoLibrary(video_file, index_path)
+        assert len(library.search_videos(f"Edit {start}")) == 5
+
+    stat = video_file.stat()
+    index, unchanged = VideoIndex.load(
+        index_path, (stat.st_size, stat.st_mtime_ns))
+    assert unchanged
+    assert len(index._video_ids) <= 2 * 100
+
+
+def test_search_index_ignores_catalog_rewritten_while_loading(
+        tmp_path, monkeypatch):
+    video_file = tmp_path / "videos.txt"
+    shutil.copy(DEFAULT_VIDEO_FILE, video_file)
+    index_path = tmp_path / "videos.txt.search"
+    build = VideoIndex.build
+
+    def build_after_rewrite(videos):
+        video_file.write_text("Baby Goats | goats_video_id | #goat\n")
+        return build(videos)
+    monkeypatch.setattr(VideoIndex, "build", build_after_rewrite)
+    VideoLibrary(video_file, index_path)
+    monkeypatch.setattr(VideoIndex, "build", build)
+    library = VideoLibrary(video_file, index_path)
+
+    assert library.search_videos_with_tag("#cat") == []
+    assert [video.title for video in library.search_videos_with_tag(
+        "#goat")] == ["Baby Goats"]
+    assert list(tmp_path.glob("*.tmp")) == []
+
+
+def test_iter_sorted_videos_resumes_after_video():
+    library = VideoLibrary()
+    titles = [video.title for video in library.iter_sorted_videos()]
+    assert titles == [video.title for video in library.get_sorted_videos()]
+
+    resumed = library.iter_sorted_videos(("another cat video",
+                                          "another_cat_video_id"))
+    assert [video.title for video in resumed] == titles[2:]
+
+    library.remove_video("another_cat_video_id")
+    resumed = library.iter_sorted_videos(("Another Cat Video",
+                                          "another_cat_video_id"))
+    assert [video.title for video in resumed] == titles[2:]
+
+
+def test_searches_run_alongside_added_and_removed_videos():
+    library = VideoLibrary()
+    listing = library.get_sorted_videos()
+    done = threading.Event()
+
+    def change_library():
+        for number in range(2000):
+            library.add_video(
+                Video(f"Cat Nap {number}", f"cat_nap_{number}", ["#cat"]))
+            library.remove_video(f"cat_nap_{number}")
+        done.set()
+
+    thread = threading.Thread(target=change_library)
+    thread.start()
+    while not done.is_set():
+        cats = library.search_videos("cat")
+        tagged = library.search_videos_with_tag("#cat")
+        assert len(cats) in (2, 3) and len(tagged) in (2, 3)
+        assert all(video is not None for video in tagged)
+    thread.join()
+
+    assert [video.title for video in listing] == [
+        "Amazing Cats", "Another Cat Video", "Funny Dogs", "Life at Google",
+        "Video about nothing"]
+    assert len(library.get_sorted_videos()) == 5